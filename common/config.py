@@ -1,8 +1,15 @@
 # Configuration for EduPlan AI Platform
+import os
 
 # Database Settings
+QDRANT_MODE = os.getenv("QDRANT_MODE", "server")  # "server", "local" (embedded on QDRANT_LOCAL_PATH) or "memory"
+QDRANT_LOCAL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "qdrant_local_mvp")
 QDRANT_HOST = "localhost"
 QDRANT_PORT = 6333
+QDRANT_GRPC_PORT = 6334
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_TRANSPORT", "rest").lower() == "grpc"  # Opt in to shipping vectors over gRPC (port 6334)
+QDRANT_TIMEOUT = 30  # Request timeout in seconds
+QDRANT_KEEPALIVE_SECONDS = 60
 QDRANT_COLLECTION_NAME = "lesson_plans"
 QDRANT_VECTOR_SIZE = 384  # all-MiniLM-L6-v2 dimension
 
@@ -1,6 +1,5 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import numpy as np
-from qdrant_client import QdrantClient
 from qdrant_client.http import models
 import sys
 import os
@@ -8,28 +7,46 @@ import os
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from .. import config
+from src.database.client import create_client
 
 class QdrantDB:
     """
     Qdrant vector database connector for storing and retrieving embeddings
     """
     
-    def __init__(self, host: str = None, port: int = None, collection_name: str = None):
+    def __init__(self, host: str = None, port: int = None, collection_name: str = None,
+                 prefer_grpc: bool = None, timeout: int = None, mode: str = None):
         """
         Initialize the Qdrant client
         
         Args:
             host: Qdrant server host
-            port: Qdrant server port
+            port: Qdrant server REST port
             collection_name: Collection to store embeddings
+            prefer_grpc: Use gRPC instead of REST (default: config.QDRANT_PREFER_GRPC)
+            timeout: Request timeout in seconds (default: config.QDRANT_TIMEOUT)
+            mode: "server", "local" or "memory" (default: config.QDRANT_MODE)
         """
         self.host = host or config.QDRANT_HOST
         self.port = port or config.QDRANT_PORT
         self.collection_name = collection_name or config.QDRANT_COLLECTION_NAME
         self.vector_size = config.QDRANT_VECTOR_SIZE
+        self.prefer_grpc = config.QDRANT_PREFER_GRPC if prefer_grpc is None else prefer_grpc
+        self.mode = (mode or config.QDRANT_MODE).lower()
         
-        # Connect to Qdrant
-        self.client = QdrantClient(host=self.host, port=self.port)
+        # Connect to Qdrant through the shared factory: same transport options
+        # as the main pipeline, and embedded modes reuse the process-wide
+        # client for a path (embedded storage is locked by whoever opens it)
+        self.client = create_client(
+            host=self.host,
+            port=self.port,
+            grpc_port=config.QDRANT_GRPC_PORT,
+            transport="grpc" if self.prefer_grpc else "rest",
+            timeout=config.QDRANT_TIMEOUT if timeout is None else timeout,
+            keepalive_seconds=config.QDRANT_KEEPALIVE_SECONDS,
+            path=config.QDRANT_LOCAL_PATH if self.mode == "local" else None,
+            mode=self.mode
+        )
         
     def create_collection(self) -> None:
         """Create collection if it doesn't exist"""
@@ -123,44 +140,88 @@ class QdrantDB:
         if top_k is None:
             top_k = config.TOP_K_RESULTS
             
-        # Prepare filter
-        filter_dict = {}
-        if filter_class:
-            filter_dict["class"] = filter_class
-            
-        # Search with filters if needed
-        search_filter = models.Filter(
-            must=[
-                models.FieldCondition(
-                    key=key,
-                    match=models.MatchValue(value=value)
-                )
-                for key, value in filter_dict.items()
-            ]
-        ) if filter_dict else None
-        
         # Search for similar documents
         search_results = self.client.search(
             collection_name=self.collection_name,
             query_vector=query_embedding,
             limit=top_k,
-            query_filter=search_filter,
+            query_filter=self._build_filter(filter_class),
             with_payload=True,
             with_vectors=False,
         )
         
-        # Format results
-        results = []
-        for result in search_results:
-            results.append({
-                "id": result.id,
-                "text": result.payload.get("text", ""),
-                "score": result.score,
-                "class": result.payload.get("class", ""),
-                "subject": result.payload.get("subject", ""),
-                "topic": result.payload.get("topic", ""),
-                "difficulty": result.payload.get("difficulty", ""),
-                "filename": result.payload.get("filename", "")
-            })
+        return [self._format_result(result) for result in search_results]
+    
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = None,
+        filter_classes: List[Optional[str]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for many query embeddings in a single request
         
-        return results
+        Args:
+            query_embeddings: Embeddings of the queries
+            top_k: Number of results to return per query
+            filter_classes: Optional class filter per query
+            
+        Returns:
+            One list of search results per query, in input order
+            
+        Raises:
+            ValueError: If filter_classes does not match query_embeddings in length
+        """
+        if top_k is None:
+            top_k = config.TOP_K_RESULTS
+        if filter_classes is None:
+            filter_classes = [None] * len(query_embeddings)
+        if len(filter_classes) != len(query_embeddings):
+            raise ValueError("search_batch needs one filter class per query embedding")
+            
+        requests = [
+            models.SearchRequest(
+                vector=embedding,
+                filter=self._build_filter(filter_class),
+                limit=top_k,
+                with_payload=True,
+                with_vector=False,
+            )
+            for embedding, filter_class in zip(query_embeddings, filter_classes)
+        ]
+        
+        batch_results = self.client.search_batch(
+            collection_name=self.collection_name,
+            requests=requests
+        )
+        
+        return [[self._format_result(result) for result in results] for results in batch_results]
+    
+    @staticmethod
+    def _build_filter(filter_class: str = None) -> Optional[models.Filter]:
+        """Build a class filter (None if unfiltered)"""
+        if not filter_class:
+            return None
+            
+        return models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="class",
+                    match=models.MatchValue(value=filter_class)
+                )
+            ]
+        )
+    
+    @staticmethod
+    def _format_result(result: Any) -> Dict[str, Any]:
+        """Convert a Qdrant hit into a search result dictionary"""
+        return {
+            "id": result.id,
+            "text": result.payload.get("text", ""),
+            "score": result.score,
+            "class": result.payload.get("class", ""),
+            "subject": result.payload.get("subject", ""),
+            "topic": result.payload.get("topic", ""),
+            "difficulty": result.payload.get("difficulty", ""),
+            "filename": result.payload.get("filename", "")
+        }
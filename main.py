@@ -7,12 +7,21 @@ Educational AI Platform for RAG-based lesson plan generation
 import sys
 import os
 import argparse
+import runpy
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
+def run_script(relative_path):
+    """Run a project script in this interpreter instead of spawning a new one"""
+    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), relative_path)
+    runpy.run_path(script_path, run_name='__main__')
+
 def main():
     """Main entry point for EduPlan AI"""
+    from common.config import API_HOST, API_PORT
+    default_server = f"http://{API_HOST}:{API_PORT}"
+    
     parser = argparse.ArgumentParser(description='EduPlan AI - Educational AI Platform')
     
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
@@ -26,6 +35,18 @@ def main():
     generate_parser.add_argument('topic', help='Lesson plan topic')
     generate_parser.add_argument('--chapter', help='Filter by chapter (e.g., Chapter 3)')
     generate_parser.add_argument('--subject', default='General', help='Filter by subject')
+    generate_parser.add_argument('--server', nargs='?', const=default_server,
+                                 help=f'Use a running lesson plan service (default: {default_server})')
+    
+    # Batch command
+    batch_parser = subparsers.add_parser('batch', help='Generate lesson plans for a file of topics')
+    batch_parser.add_argument('topics_file', help='Topics file (.json list, .jsonl, or one topic per line)')
+    batch_parser.add_argument('--concurrency', type=int, help='Concurrent LLM calls (default: LLM_CONCURRENCY)')
+    
+    # Serve command
+    serve_parser = subparsers.add_parser('serve', help='Run the lesson plan service with a warm model')
+    serve_parser.add_argument('--host', default=API_HOST, help='Interface to bind')
+    serve_parser.add_argument('--port', type=int, default=API_PORT, help='Port to listen on')
     
     # Check command
     check_parser = subparsers.add_parser('check', help='Check database status')
@@ -34,18 +55,29 @@ def main():
     
     if args.command == 'setup':
         print("🚀 Running EduPlan AI Setup...")
-        os.system('python scripts/run_mvp_pipeline.py')
+        run_script('scripts/run_mvp_pipeline.py')
         
     elif args.command == 'generate':
         print(f"📝 Generating lesson plan for: {args.topic}")
-        from src.generators.lesson_plan_generator import LessonPlanGenerator
         
-        generator = LessonPlanGenerator()
-        lesson_plan = generator.generate_lesson_plan(
-            query=args.topic,
-            filter_chapter=args.chapter,
-            filter_subject=args.subject
-        )
+        if args.server:
+            # Thin client: the service already holds the model and DB client
+            from src.service.client import request_lesson_plan
+            lesson_plan = request_lesson_plan(
+                topic=args.topic,
+                chapter=args.chapter,
+                subject=args.subject,
+                base_url=args.server
+            )
+        else:
+            from src.generators.lesson_plan_generator import LessonPlanGenerator
+            
+            generator = LessonPlanGenerator()
+            lesson_plan = generator.generate_lesson_plan(
+                query=args.topic,
+                filter_chapter=args.chapter,
+                filter_subject=args.subject
+            )
         
         # Save lesson plan
         import json
@@ -57,9 +89,22 @@ def main():
             
         print(f"✅ Lesson plan saved to: {output_path}")
         
+    elif args.command == 'batch':
+        from src.generation.batch import BatchLessonPlanGenerator, load_topics
+        
+        topics = load_topics(args.topics_file)
+        print(f"📝 Generating lesson plans for {len(topics)} topics from {args.topics_file}")
+        
+        batch = BatchLessonPlanGenerator(**({'concurrency': args.concurrency} if args.concurrency else {}))
+        batch.generate(topics)
+        
+    elif args.command == 'serve':
+        from src.service.lesson_plan_service import run_server
+        run_server(host=args.host, port=args.port)
+        
     elif args.command == 'check':
         print("🔍 Checking database status...")
-        os.system('python scripts/check_database.py')
+        run_script('scripts/check_database.py')
         
     else:
         parser.print_help()
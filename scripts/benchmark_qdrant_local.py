@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark embedded Qdrant (local directory and in-memory) against the server.
+Uses random vectors at the stored dimension for a range of corpus sizes, so
+single-node installs can see where the embedded mode's exact search stops
+beating the HTTP/gRPC hop to an HNSW index.
+"""
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+import argparse
+from typing import Dict, List
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from qdrant_client.http import models
+from src.database.client import create_client
+from src.core.config import QDRANT_HOST, QDRANT_PORT, QDRANT_VECTOR_SIZE
+
+COLLECTION_NAME = "benchmark_qdrant_local"
+
+def fill_and_search(client: QdrantClient, vectors: np.ndarray, queries: np.ndarray,
+                    batch_size: int) -> Dict[str, float]:
+    """
+    Create the collection, upsert vectors and time single and batched searches.
+    
+    Returns:
+        Dictionary with upsert throughput and search latency
+    """
+    if COLLECTION_NAME in [c.name for c in client.get_collections().collections]:
+        client.delete_collection(COLLECTION_NAME)
+    client.create_collection(
+        collection_name=COLLECTION_NAME,
+        vectors_config=models.VectorParams(size=vectors.shape[1], distance=models.Distance.COSINE)
+    )
+    
+    start_time = time.time()
+    for i in range(0, len(vectors), batch_size):
+        batch = vectors[i:i+batch_size]
+        ids = list(range(i, i + len(batch)))
+        client.upsert(
+            collection_name=COLLECTION_NAME,
+            points=models.Batch(
+                ids=ids,
+                vectors=batch.tolist(),
+                payloads=[{"metadata": {"chunk_index": j}} for j in ids]
+            ),
+            wait=True
+        )
+    upsert_time = time.time() - start_time
+    
+    latencies = []
+    for query in queries:
+        start_time = time.perf_counter()
+        client.search(collection_name=COLLECTION_NAME, query_vector=query.tolist(), limit=5)
+        latencies.append(time.perf_counter() - start_time)
+    
+    start_time = time.perf_counter()
+    client.search_batch(
+        collection_name=COLLECTION_NAME,
+        requests=[models.SearchRequest(vector=query.tolist(), limit=5) for query in queries]
+    )
+    batch_time = time.perf_counter() - start_time
+    
+    return {
+        "upsert_points_per_sec": len(vectors) / upsert_time,
+        "search_p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "search_p95_ms": float(np.percentile(latencies, 95)) * 1000,
+        "batch_queries_per_sec": len(queries) / batch_time
+    }
+
+def benchmark_mode(mode: str, vectors: np.ndarray, queries: np.ndarray, batch_size: int,
+                   host: str, port: int) -> Dict[str, float]:
+    """Run the benchmark for one mode ("server", "local" or "memory")"""
+    if mode == "server":
+        client = create_client(host=host, port=port, mode="server")
+        try:
+            return fill_and_search(client, vectors, queries, batch_size)
+        finally:
+            client.delete_collection(COLLECTION_NAME)
+            client.close()
+    
+    # Own clients rather than the shared ones from create_client, so each
+    # run starts empty and the cold start from disk can be timed
+    if mode == "memory":
+        client = QdrantClient(location=":memory:")
+        try:
+            return fill_and_search(client, vectors, queries, batch_size)
+        finally:
+            client.close()
+    
+    workdir = tempfile.mkdtemp(prefix="benchmark_qdrant_local_")
+    try:
+        client = QdrantClient(path=workdir)
+        try:
+            stats = fill_and_search(client, vectors, queries, batch_size)
+        finally:
+            client.close()
+        
+        # Startup cost of a CLI run: reopen the directory and answer one query
+        start_time = time.time()
+        client = QdrantClient(path=workdir)
+        client.search(collection_name=COLLECTION_NAME, query_vector=queries[0].tolist(), limit=5)
+        stats["open_seconds"] = time.time() - start_time
+        client.close()
+        return stats
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main():
+    """Run the benchmark for every mode and corpus size and print a comparison"""
+    parser = argparse.ArgumentParser(description='Compare embedded Qdrant with the Qdrant server')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 10000], help='Corpus sizes (points)')
+    parser.add_argument('--queries', type=int, default=200, help='Number of searches to run')
+    parser.add_argument('--dim', type=int, default=QDRANT_VECTOR_SIZE, help='Vector dimension')
+    parser.add_argument('--batch-size', type=int, default=256, help='Points per upsert request')
+    parser.add_argument('--modes', nargs='+', default=["server", "local", "memory"],
+                        choices=["server", "local", "memory"])
+    parser.add_argument('--host', default=QDRANT_HOST)
+    parser.add_argument('--port', type=int, default=QDRANT_PORT)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    
+    rows: List[tuple] = []
+    for size in args.sizes:
+        vectors = rng.standard_normal((size, args.dim), dtype=np.float32)
+        print(f"📊 {size} points / {args.queries} queries at {args.dim} dims")
+        for mode in args.modes:
+            print(f"🔄 Running {mode}...")
+            rows.append((size, mode, benchmark_mode(mode, vectors, queries, args.batch_size, args.host, args.port)))
+    
+    print(f"\n{'Points':>7} {'Mode':<8} {'Upsert pts/s':>13} {'p50 ms':>8} {'p95 ms':>8} {'Batch q/s':>10} {'Open s':>7}")
+    for size, mode, stats in rows:
+        open_seconds = f"{stats['open_seconds']:.2f}" if "open_seconds" in stats else "-"
+        print(f"{size:>7} {mode:<8} {stats['upsert_points_per_sec']:>13.1f} {stats['search_p50_ms']:>8.2f} "
+              f"{stats['search_p95_ms']:>8.2f} {stats['batch_queries_per_sec']:>10.1f} {open_seconds:>7}")
+
+if __name__ == "__main__":
+    main()
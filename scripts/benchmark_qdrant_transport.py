@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark Qdrant transports (REST vs gRPC) for upsert and search throughput.
+Uses random vectors at the embedding dimension so results reflect the cost
+of shipping 4096-float vectors rather than model time.
+"""
+
+import sys
+import os
+import time
+import argparse
+from typing import Dict
+
+import numpy as np
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from qdrant_client.http import models
+from src.database.client import create_client, TRANSPORTS
+from src.core.config import QDRANT_HOST, QDRANT_PORT, QDRANT_VECTOR_SIZE
+
+def benchmark_transport(transport: str, vectors: np.ndarray, queries: np.ndarray,
+                        batch_size: int, host: str, port: int) -> Dict[str, float]:
+    """
+    Upsert vectors and run searches over one transport.
+    
+    Returns:
+        Dictionary with upsert and search throughput
+    """
+    client = create_client(host=host, port=port, transport=transport)
+    collection_name = f"benchmark_transport_{transport}"
+    
+    if collection_name in [c.name for c in client.get_collections().collections]:
+        client.delete_collection(collection_name)
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=models.VectorParams(size=vectors.shape[1], distance=models.Distance.COSINE)
+    )
+    
+    try:
+        # Upsert
+        start_time = time.time()
+        for i in range(0, len(vectors), batch_size):
+            batch = vectors[i:i+batch_size]
+            client.upsert(
+                collection_name=collection_name,
+                points=[
+                    models.PointStruct(id=i + j, vector=vector.tolist(), payload={"n": i + j})
+                    for j, vector in enumerate(batch)
+                ],
+                wait=True
+            )
+        upsert_time = time.time() - start_time
+        
+        # Search
+        start_time = time.time()
+        for query in queries:
+            client.search(collection_name=collection_name, query_vector=query.tolist(), limit=5)
+        search_time = time.time() - start_time
+    finally:
+        client.delete_collection(collection_name)
+        client.close()
+    
+    return {
+        "upsert_points_per_sec": len(vectors) / upsert_time,
+        "search_queries_per_sec": len(queries) / search_time,
+        "upsert_seconds": upsert_time,
+        "search_seconds": search_time
+    }
+
+def main():
+    """Run the benchmark for every transport and print a comparison"""
+    parser = argparse.ArgumentParser(description='Compare Qdrant REST and gRPC throughput')
+    parser.add_argument('--points', type=int, default=2000, help='Number of points to upsert')
+    parser.add_argument('--queries', type=int, default=200, help='Number of searches to run')
+    parser.add_argument('--dim', type=int, default=QDRANT_VECTOR_SIZE, help='Vector dimension')
+    parser.add_argument('--batch-size', type=int, default=64, help='Points per upsert request')
+    parser.add_argument('--host', default=QDRANT_HOST)
+    parser.add_argument('--port', type=int, default=QDRANT_PORT)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.points, args.dim), dtype=np.float32)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    
+    print(f"📊 Benchmarking {args.points} points / {args.queries} queries at {args.dim} dims")
+    
+    results = {}
+    for transport in TRANSPORTS:
+        print(f"🔄 Running {transport.upper()}...")
+        results[transport] = benchmark_transport(
+            transport, vectors, queries, args.batch_size, args.host, args.port
+        )
+    
+    print(f"\n{'Transport':<10} {'Upsert pts/s':>14} {'Search q/s':>12}")
+    for transport, stats in results.items():
+        print(f"{transport.upper():<10} {stats['upsert_points_per_sec']:>14.1f} {stats['search_queries_per_sec']:>12.1f}")
+    
+    speedup = results["grpc"]["upsert_points_per_sec"] / results["rest"]["upsert_points_per_sec"]
+    print(f"\ngRPC upsert speedup over REST: {speedup:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -6,44 +6,35 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.core.vector_database import QdrantDB
+from src.database.vector_store import canonical_payload
 
 def check_qdrant_data():
     connector = QdrantDB()
-    print('📊 Checking Qdrant collection info...')
+    store = connector.store
+    print(f'📊 Checking {connector.backend} collection info...')
     
-    info = connector.client.get_collection('lesson_plans')
-    print(f'Total points: {info.points_count}')
-    print(f'Vector size: {info.config.params.vectors.size}')
+    print(f'Total points: {store.count_documents()}')
+    print(f'Vector size: {store.get_vector_size()}')
 
     # Get sample points to check metadata
-    scroll_result = connector.client.scroll(
-        collection_name='lesson_plans',
-        limit=5,
-        with_payload=True
-    )
+    texts = store.get_payload_values("text") or {}
     
     print('\n🔍 Sample documents in database:')
-    for i, point in enumerate(scroll_result[0]):
+    for i, point_id in enumerate(list(texts)[:5]):
+        point = store.get_document(point_id)
+        payload = canonical_payload(point.payload if point else None)
+        metadata = payload["metadata"]
         print(f'\nDocument {i+1}:')
-        print(f'  Chapter: {point.payload.get("chapter", "N/A")}')
-        print(f'  Subject: {point.payload.get("subject", "N/A")}')
-        print(f'  Difficulty: {point.payload.get("difficulty", "N/A")}')
-        print(f'  Source File: {point.payload.get("source_file", "N/A")}')
-        print(f'  Text Preview: {point.payload.get("text", "N/A")[:100]}...')
+        print(f'  Chapter: {metadata.get("chapter", "N/A")}')
+        print(f'  Subject: {metadata.get("subject", "N/A")}')
+        print(f'  Difficulty: {metadata.get("difficulty", "N/A")}')
+        print(f'  Source File: {metadata.get("source_file", "N/A")}')
+        print(f'  Text Preview: {(payload["text"] or "N/A")[:100]}...')
     
     # Check unique chapters and subjects
     print('\n📈 Getting unique chapters and subjects...')
-    all_points = connector.client.scroll(
-        collection_name='lesson_plans',
-        limit=1000,
-        with_payload=True
-    )
-    
-    chapters = set()
-    subjects = set()
-    for point in all_points[0]:
-        chapters.add(point.payload.get("chapter", "unknown"))
-        subjects.add(point.payload.get("subject", "unknown"))
+    chapters = {value or "unknown" for value in (store.get_payload_values("metadata.chapter") or {}).values()}
+    subjects = {value or "unknown" for value in (store.get_payload_values("metadata.subject") or {}).values()}
     
     print(f'Unique chapters: {sorted(chapters)}')
     print(f'Unique subjects: {sorted(subjects)}')
@@ -41,7 +41,12 @@ def compare_extractions():
     
     # New text sample  
     print('\nNEW (first 200 chars):')
-    new_text = new_data['full_text'][:200]
+    new_text = new_data.get('full_text', '')
+    if not new_text and new_data['sections']:
+        # Compact extractions have no full_text; use the first section
+        first_section = new_data['sections'][0]
+        new_text = " ".join([first_section['title']] + first_section['content'])
+    new_text = new_text[:200]
     print(repr(new_text))
     
     # Show structured content
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Fit and evaluate embedding projections for EduPlan AI.
+Embeds the processed corpus at full dimension (served from the embedding
+cache after the first run), fits a PCA basis, and reports how well
+truncated and PCA-reduced vectors preserve full-dimension nearest
+neighbours. Use --save to persist the PCA for EMBEDDING_PROJECTION=pca.
+"""
+
+import sys
+import os
+import time
+import argparse
+from typing import List
+
+import numpy as np
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.registry import get_embedding_model
+from src.models.projection import VectorProjection, l2_normalize
+from src.scripts.process_improved_data import load_improved_data, iter_documents
+from src.core.config import EMBEDDING_PROJECTION_DIM, EMBEDDING_PROJECTION_PATH
+
+def top_k_neighbours(corpus: np.ndarray, query_rows: np.ndarray, k: int) -> np.ndarray:
+    """Exact cosine top-k indices for corpus rows used as queries, excluding each query's own row."""
+    scores = corpus[query_rows] @ corpus.T
+    # Exclude the query by index; a duplicate vector may outscore it
+    scores[np.arange(len(query_rows)), query_rows] = -np.inf
+    top = np.argpartition(-scores, kth=k - 1, axis=1)[:, :k]
+    return np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+
+def recall_at_k(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Mean fraction of reference neighbours found by the candidate search."""
+    hits = [len(set(ref) & set(cand)) / len(ref) for ref, cand in zip(reference, candidate)]
+    return float(np.mean(hits))
+
+def report(name: str, reduced: np.ndarray, query_rows: np.ndarray, reference: np.ndarray,
+           full_dim: int, k: int) -> None:
+    """Print recall, memory and search time for one reduced corpus."""
+    start_time = time.time()
+    neighbours = top_k_neighbours(reduced, query_rows, k)
+    search_time = time.time() - start_time
+    
+    dim = reduced.shape[1]
+    print(f"{name:<14} {dim:>6} {recall_at_k(reference, neighbours):>10.3f} "
+          f"{dim * 4 / 1024:>10.1f} {full_dim / dim:>8.1f}x {search_time * 1000:>10.1f}")
+
+def main():
+    """Fit projections and print a recall report"""
+    parser = argparse.ArgumentParser(description='Fit a PCA projection and compare reduced-dimension recall')
+    parser.add_argument('--dims', type=int, nargs='+', default=[256, 512, 1024],
+                        help='Reduced dimensions to evaluate')
+    parser.add_argument('--queries', type=int, default=200, help='Corpus vectors used as queries')
+    parser.add_argument('--k', type=int, default=10, help='Neighbours compared per query')
+    parser.add_argument('--save', action='store_true',
+                        help=f'Save the PCA fitted at EMBEDDING_PROJECTION_DIM ({EMBEDDING_PROJECTION_DIM})')
+    parser.add_argument('--output', default=EMBEDDING_PROJECTION_PATH, help='Where to save the PCA')
+    args = parser.parse_args()
+    
+    texts = [text for text, _ in iter_documents(load_improved_data())]
+    if len(texts) <= args.k:
+        print(f"❌ Need more than {args.k} chunks to evaluate recall, found {len(texts)}")
+        sys.exit(1)
+    
+    print(f"🔄 Embedding {len(texts)} chunks at full dimension...")
+    model = get_embedding_model()
+    full = l2_normalize(model.embed_texts(texts, project=False))
+    
+    rng = np.random.default_rng(0)
+    query_rows = rng.choice(len(full), size=min(args.queries, len(full)), replace=False)
+    reference = top_k_neighbours(full, query_rows, args.k)
+    
+    dims: List[int] = sorted(set(args.dims + ([EMBEDDING_PROJECTION_DIM] if args.save else [])))
+    print(f"\n📊 Recall@{args.k} against {full.shape[1]}-dim search ({len(query_rows)} queries)")
+    print(f"{'Projection':<14} {'Dims':>6} {'Recall':>10} {'KiB/vec':>10} {'Smaller':>9} {'Search ms':>10}")
+    report("full", full, query_rows, reference, full.shape[1], args.k)
+    
+    # One covariance decomposition serves every evaluated dimension
+    dims = [dim for dim in dims if dim < full.shape[1]]
+    pcas = VectorProjection.fit_pca_dims(full, dims)
+    saved = False
+    for dim in dims:
+        report("truncate", VectorProjection("truncate", dim, input_dim=full.shape[1]).transform(full),
+               query_rows, reference, full.shape[1], args.k)
+        
+        pca = pcas[dim]
+        report(f"pca ({pca.explained_variance:.0%} var)", pca.transform(full),
+               query_rows, reference, full.shape[1], args.k)
+        
+        if args.save and dim == EMBEDDING_PROJECTION_DIM:
+            pca.save(args.output)
+            saved = True
+    
+    if args.save and not saved:
+        print(f"\n❌ EMBEDDING_PROJECTION_DIM ({EMBEDDING_PROJECTION_DIM}) is not below the "
+              f"{full.shape[1]}-dim embeddings; nothing was saved")
+        sys.exit(1)
+    if saved:
+        print(f"\n✅ Saved PCA projection to {args.output}")
+        print("   Set EMBEDDING_PROJECTION=pca and rebuild with: python src/scripts/process_improved_data.py --rebuild")
+
+if __name__ == "__main__":
+    main()
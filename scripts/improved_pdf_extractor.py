@@ -7,17 +7,339 @@ This script addresses issues with the current JSON extraction approach
 import fitz  # PyMuPDF
 import re
 import json
+import hashlib
 import os
-from typing import List, Dict, Any
-import sys
+import math
+import tempfile
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Tuple, Iterator, Callable, Optional, TextIO
+
+# Large PDFs are split into page ranges of about this size for the process pool
+PAGES_PER_TASK = 16
+
+# Bump whenever a change alters the extracted JSON, so the skip cache
+# re-extracts every PDF on the next run
+EXTRACTOR_VERSION = 1
+
+MANIFEST_FILENAME = "extraction_manifest.json"
+
+# Cleaning rules as one alternation, applied in a single substitution pass.
+# The page-number rule comes first so it sees the start of a line before the
+# whitespace rules rewrite it; the lower/upper split precedes the repetition
+# rule so "aMMMM" still becomes "a M".
+_CLEAN_PATTERN = re.compile(
+    r'(?P<page_number>^\d+\s*$)'         # Standalone page numbers
+    r'|(?P<newlines>\n+)'                 # Newline runs
+    r'|(?P<spaces> +)'                    # Space runs
+    r'|(?P<case_split>(?<=[a-z])(?=[A-Z]))'  # Missing space between lowercase and uppercase
+    r'|(?P<repeated>(?P<letter>[A-Z])(?P=letter){3,})',  # Character repetitions (like MMMMM OOOOO SSSSS)
+    re.MULTILINE
+)
+
+# Broken chapter headers; its trailing \s* can swallow lines emptied by the
+# page-number rule, so it runs on the result of the pass above
+_CHAPTER_PATTERN = re.compile(r'^C\s*hapter\s*$', re.MULTILINE)
+
+_CLEAN_REPLACEMENTS = {
+    'page_number': lambda m: '',
+    'newlines': lambda m: '\n',
+    'spaces': lambda m: ' ',
+    'case_split': lambda m: ' ',
+    'repeated': lambda m: m.group('letter')
+}
+
+def _clean_replacement(match: re.Match) -> str:
+    return _CLEAN_REPLACEMENTS[match.lastgroup](match)
+
+_CHAPTER_INFO_PATTERN = re.compile(r'Chapter\s*(\d+)\s*[:\-]?\s*(.+?)(?:\n|$)', re.IGNORECASE)
+
+def _extract_page_range(options: Dict[str, Any], pdf_path: str, start: int, end: int) -> Tuple[List[Dict[str, Any]], float]:
+    """Process-pool task: extract pages [start, end) of one PDF and time it"""
+    start_time = time.time()
+    pages = ImprovedPDFExtractor(**options).extract_pages(pdf_path, start, end)
+    return pages, time.time() - start_time
+
+def _stream_pdf(options: Dict[str, Any], pdf_path: str) -> Tuple[bool, float]:
+    """Process-pool task: stream one whole PDF to its JSON file and time it"""
+    start_time = time.time()
+    success = ImprovedPDFExtractor(**options).stream_single_pdf(pdf_path)
+    return success, time.time() - start_time
+
+class SectionBuilder:
+    """
+    Group structured blocks into sections as they arrive
+    
+    Only the section being built is held; add() hands back the previous
+    section once a heading closes it.
+    """
+    
+    def __init__(self, optimize: Callable[[Dict[str, Any]], None]):
+        """
+        Args:
+            optimize: Called on each section before it is handed back
+        """
+        self.optimize = optimize
+        self.current_section = None
+    
+    def add(self, content: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Add one structured block
+        
+        Returns:
+            The section this block completed, if it starts a new one
+        """
+        content_type = content['type']
+        text = content['text']
+        completed = None
+        
+        if content_type in ['chapter_title', 'heading']:
+            # Start new section
+            if self.current_section:
+                # Ensure content chunks are properly sized for embeddings
+                self.optimize(self.current_section)
+                completed = self.current_section
+            
+            self.current_section = {
+                'title': text,
+                'type': content_type,
+                'content': [],
+                'activities': [],
+                'questions': []
+            }
+        elif self.current_section:
+            # Add to current section
+            if content_type == 'activity':
+                self.current_section['activities'].append(text)
+            elif content_type == 'question':
+                self.current_section['questions'].append(text)
+            else:
+                self.current_section['content'].append(text)
+        
+        return completed
+    
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """Close and return the last section, if any"""
+        completed = self.current_section
+        if completed:
+            self.optimize(completed)
+        self.current_section = None
+        return completed
+
+class ChapterInfoScanner:
+    """
+    Find the first chapter heading in page texts fed one at a time
+    
+    Each page is searched together with the next one, so a heading that runs
+    over a page break is still found; only the previous page is kept.
+    """
+    
+    def __init__(self):
+        self.previous = None
+        self.info = None
+    
+    def _search(self, text: str, next_text: Optional[str]) -> Optional[Dict[str, str]]:
+        window = text if next_text is None else text + " " + next_text
+        chapter_match = _CHAPTER_INFO_PATTERN.search(window)
+        if chapter_match and chapter_match.start() < len(text):
+            return {'number': chapter_match.group(1), 'title': chapter_match.group(2).strip()}
+        return None
+    
+    def feed(self, cleaned_text: str) -> None:
+        """Add the cleaned text of the next page"""
+        if self.info is not None:
+            return
+        if self.previous is not None:
+            self.info = self._search(self.previous, cleaned_text)
+        self.previous = cleaned_text if self.info is None else None
+    
+    def result(self) -> Dict[str, str]:
+        """Chapter number and title (empty strings when none was found)"""
+        if self.info is None and self.previous is not None:
+            self.info = self._search(self.previous, None)
+            self.previous = None
+        return self.info or {'number': '', 'title': ''}
+
+class StreamingExtractionWriter:
+    """
+    Write an improved JSON file section by section
+    
+    Sections are written as they complete and the metadata (known only once
+    every page is seen) goes last. The file is written under a temporary
+    name and moved into place on close, so an interrupted run never leaves
+    a truncated JSON behind.
+    """
+    
+    def __init__(self, output_path: str, compact: bool = False):
+        """
+        Args:
+            output_path: Final path of the JSON file
+            compact: Write without indentation or spaces
+        """
+        self.output_path = output_path
+        self.compact = compact
+        self.section_count = 0
+        self._temp_path = output_path + ".partial"
+        self._file = open(self._temp_path, 'w', encoding='utf-8')
+        self._file.write('{"sections":[' if compact else '{\n  "sections": [')
+    
+    def _dumps(self, value: Any) -> str:
+        if self.compact:
+            return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+        # Indented to sit inside the top-level object like json.dump(indent=2)
+        return json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+    
+    def write_section(self, section: Dict[str, Any]) -> None:
+        """Append one completed section"""
+        if self.compact:
+            self._file.write((',' if self.section_count else '') + self._dumps(section))
+        else:
+            self._file.write((',' if self.section_count else '') + '\n    ' + self._dumps(section))
+        self.section_count += 1
+    
+    def close(self, metadata: Dict[str, Any], full_text: Optional[TextIO] = None) -> None:
+        """
+        Write the metadata (and full_text, copied from a spool file) and move
+        the file into place
+        
+        Args:
+            metadata: Document metadata
+            full_text: File whose contents become the full_text string
+        """
+        if self.compact:
+            self._file.write('],"metadata":' + self._dumps(metadata))
+        else:
+            self._file.write(('\n  ' if self.section_count else '') + '],\n  "metadata": '
+                             + self._dumps(metadata).replace('\n    ', '\n  '))
+        
+        if full_text is not None:
+            self._file.write(',"full_text":"' if self.compact else ',\n  "full_text": "')
+            full_text.seek(0)
+            for chunk in iter(lambda: full_text.read(1024 * 1024), ''):
+                # Escaping is per character, so chunks can be escaped separately
+                self._file.write(json.dumps(chunk, ensure_ascii=False)[1:-1])
+            self._file.write('"')
+        
+        self._file.write('}' if self.compact else '\n}')
+        self._file.close()
+        os.replace(self._temp_path, self.output_path)
+    
+    def abort(self) -> None:
+        """Drop the partial file"""
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+def _file_sha256(path: str) -> str:
+    """Hex SHA-256 of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ExtractionManifest:
+    """
+    Skip cache for process_all_pdfs
+    
+    Records each extracted PDF's size, mtime and SHA-256 together with the
+    extractor version and the options that shape its output. A PDF is
+    current when its output file exists and the version and options match.
+    Size and mtime are checked first and the file is only hashed when the
+    mtime moved (e.g. after a copy), so unchanged files cost one stat.
+    """
+    
+    def __init__(self, output_dir: str, options: Dict[str, Any]):
+        """
+        Args:
+            output_dir: Output directory holding the improved JSON files and the manifest
+            options: Extractor settings that affect the output (see ImprovedPDFExtractor.output_options)
+        """
+        self.path = os.path.join(output_dir, MANIFEST_FILENAME)
+        self.options = dict(options)
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('files', {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: Ignoring unreadable manifest {self.path}: {e}")
+    
+    def is_current(self, pdf_path: str, output_path: str) -> bool:
+        """True if the output for this PDF was made from the same content with this version and these options"""
+        entry = self.entries.get(os.path.basename(pdf_path))
+        if (not entry or entry.get('extractor_version') != EXTRACTOR_VERSION
+                or entry.get('options') != self.options or not os.path.exists(output_path)):
+            return False
+        
+        stat = os.stat(pdf_path)
+        if stat.st_size != entry['size']:
+            return False
+        if stat.st_mtime_ns == entry['mtime_ns']:
+            return True
+        
+        # Touched but possibly unchanged: compare content and remember the new mtime
+        if _file_sha256(pdf_path) != entry['sha256']:
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+        self.save()
+        return True
+    
+    def record(self, pdf_path: str, output_path: str) -> None:
+        """Remember a successful extraction and save the manifest"""
+        stat = os.stat(pdf_path)
+        self.entries[os.path.basename(pdf_path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': _file_sha256(pdf_path),
+            'extractor_version': EXTRACTOR_VERSION,
+            'options': self.options,
+            'output': os.path.basename(output_path)
+        }
+        self.save()
+    
+    def save(self) -> None:
+        """Write the manifest atomically"""
+        temp_path = self.path + ".partial"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.entries}, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
 
 class ImprovedPDFExtractor:
     """Improved PDF text extraction with better structure and quality"""
     
-    def __init__(self):
-        self.output_dir = "data/processed_improved"
+    def __init__(self, output_dir: str = "data/processed_improved", single_pass: bool = False,
+                 compact: bool = False, streaming: bool = False):
+        """
+        Args:
+            output_dir: Directory for the improved JSON files
+            single_pass: Parse each page once (dict output) instead of twice (text + dict);
+                faster, but raw_text is rebuilt from the dict lines, so its
+                line breaks and spacing can differ from get_text("text")
+            compact: Keep lean page records (plain text + block offsets) and
+                write compact JSON without full_text; always parses once
+            streaming: Build and write sections page by page instead of
+                holding every page of a document (see stream_single_pdf)
+        """
+        self.output_dir = output_dir
+        self.single_pass = single_pass
+        self.compact = compact
+        self.streaming = streaming
         os.makedirs(self.output_dir, exist_ok=True)
     
+    def output_options(self) -> Dict[str, Any]:
+        """Settings that change the extracted JSON (the skip cache re-extracts when they differ)"""
+        return {'single_pass': self.single_pass, 'compact': self.compact, 'streaming': self.streaming}
+    
+    def _worker_options(self) -> Dict[str, Any]:
+        """Constructor arguments that recreate this extractor in a worker process"""
+        return {'output_dir': self.output_dir, **self.output_options()}
+    
+    def _output_path(self, filename: str) -> str:
+        """Path of the improved JSON for a PDF file name"""
+        return os.path.join(self.output_dir, f"{os.path.splitext(filename)[0]}_improved.json")
+    
     def extract_text_from_pdf(self, pdf_path: str) -> Dict[str, Any]:
         """Extract structured text from PDF using PyMuPDF"""
         try:
@@ -25,36 +347,9 @@ class ImprovedPDFExtractor:
             extracted_data = {
                 'filename': os.path.basename(pdf_path),
                 'total_pages': len(doc),
-                'pages': []
+                'pages': self._extract_pages(doc, pdf_path, 0, len(doc))
             }
             
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                
-                # Extract text with better formatting
-                text = page.get_text("text")  # Plain text
-                
-                # Clean and process text
-                cleaned_text = self.clean_text(text)
-                
-                # Extract text blocks for better structure
-                blocks = page.get_text("dict")
-                structured_text = self.extract_structured_text(blocks)
-                
-                page_data = {
-                    'page_number': page_num + 1,
-                    'raw_text': text,
-                    'cleaned_text': cleaned_text,
-                    'structured_text': structured_text,
-                    'word_count': len(cleaned_text.split()) if cleaned_text else 0
-                }
-                
-                # Only add pages with meaningful content
-                if cleaned_text and len(cleaned_text.strip()) > 50:
-                    extracted_data['pages'].append(page_data)
-                else:
-                    print(f"Warning: Page {page_num + 1} in {pdf_path} has insufficient text content")
-            
             doc.close()
             return extracted_data
             
@@ -62,40 +357,162 @@ class ImprovedPDFExtractor:
             print(f"Error processing {pdf_path}: {e}")
             return None
     
-    def clean_text(self, text: str) -> str:
-        """Clean and normalize extracted text"""
-        if not text:
-            return ""
+    def extract_pages(self, pdf_path: str, start: int, end: int) -> List[Dict[str, Any]]:
+        """Extract pages [start, end) of a PDF (one process-pool task)"""
+        doc = fitz.open(pdf_path)
+        try:
+            return self._extract_pages(doc, pdf_path, start, end)
+        finally:
+            doc.close()
+    
+    def _extract_pages(self, doc: Any, pdf_path: str, start: int, end: int) -> List[Dict[str, Any]]:
+        """Extract a page range from an open document, skipping pages without meaningful text"""
+        return [page_data for page_data, _ in self._iter_pages(doc, pdf_path, start, end)]
+    
+    def _iter_pages(self, doc: Any, pdf_path: str, start: int, end: int) -> Iterator[Tuple[Dict[str, Any], str]]:
+        """Yield (page record, cleaned text) for a page range, skipping pages without meaningful text"""
+        for page_num in range(start, end):
+            page_data, cleaned_text = self._extract_page(doc[page_num], page_num)
+            
+            # Only add pages with meaningful content
+            if cleaned_text and len(cleaned_text.strip()) > 50:
+                yield page_data, cleaned_text
+            else:
+                print(f"Warning: Page {page_num + 1} in {pdf_path} has insufficient text content")
+    
+    def iter_pages(self, pdf_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the page records of a PDF one at a time
+        
+        Only the current page is held; the document is closed when the
+        generator finishes or is closed.
+        """
+        doc = fitz.open(pdf_path)
+        try:
+            for page_data, _ in self._iter_pages(doc, pdf_path, 0, len(doc)):
+                yield page_data
+        finally:
+            doc.close()
+    
+    def extract_page(self, page: Any, page_num: int) -> Dict[str, Any]:
+        """Extract plain, cleaned and structured text from one page"""
+        return self._extract_page(page, page_num)[0]
+    
+    def _extract_page(self, page: Any, page_num: int) -> Tuple[Dict[str, Any], str]:
+        """Extract one page record along with its cleaned text"""
+        if self.compact:
+            return self._extract_compact_page(page, page_num)
+        
+        if self.single_pass:
+            # One parse: plain and structured text both come from the dict
+            # output, and text-only flags skip decoding images
+            blocks = page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)
+            text, structured_text = self.parse_blocks(blocks)
+        else:
+            # Extract text with better formatting
+            text = page.get_text("text")  # Plain text
+            
+            # Extract text blocks for better structure
+            blocks = page.get_text("dict")
+            structured_text = self.extract_structured_text(blocks)
         
-        # Remove excessive whitespace and newlines
-        text = re.sub(r'\n+', '\n', text)
-        text = re.sub(r' +', ' ', text)
+        # Clean and process text
+        cleaned_text = self.clean_text(text)
         
-        # Remove weird character repetitions (like MMMMM OOOOO SSSSS)
-        text = re.sub(r'([A-Z])\1{3,}', r'\1', text)
+        return {
+            'page_number': page_num + 1,
+            'raw_text': text,
+            'cleaned_text': cleaned_text,
+            'structured_text': structured_text,
+            'word_count': len(cleaned_text.split()) if cleaned_text else 0
+        }, cleaned_text
+    
+    def _extract_compact_page(self, page: Any, page_num: int) -> Tuple[Dict[str, Any], str]:
+        """
+        Extract one page as a lean record
         
-        # Fix common OCR errors
-        text = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', text)  # Add space between lowercase and uppercase
+        The plain text is stored once; structured blocks are (type, start, end,
+        bbox) tuples pointing into it, and the cleaned text is only returned
+        for filtering, then rebuilt on demand by page_cleaned_text().
+        """
+        blocks = page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)
+        text, block_offsets = self.parse_blocks(blocks, offsets=True)
+        cleaned_text = self.clean_text(text)
         
-        # Remove page headers/footers patterns
-        text = re.sub(r'^\d+\s*$', '', text, flags=re.MULTILINE)  # Remove standalone page numbers
+        return {
+            'page_number': page_num + 1,
+            'text': text,
+            'blocks': block_offsets,
+            'word_count': len(cleaned_text.split()) if cleaned_text else 0
+        }, cleaned_text
+    
+    @staticmethod
+    def page_text(page: Dict[str, Any]) -> str:
+        """Plain text of a full or compact page record"""
+        return page['text'] if 'text' in page else page['raw_text']
+    
+    def page_cleaned_text(self, page: Dict[str, Any]) -> str:
+        """Cleaned text of a full or compact page record"""
+        if 'cleaned_text' in page:
+            return page['cleaned_text']
+        return self.clean_text(page['text'])
+    
+    @staticmethod
+    def page_blocks(page: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Structured blocks of a full or compact page record"""
+        if 'blocks' not in page:
+            yield from page.get('structured_text', [])
+            return
         
-        # Clean up chapter headers
-        text = re.sub(r'^C\s*hapter\s*$', 'Chapter', text, flags=re.MULTILINE)
+        text = page['text']
+        for content_type, start, end, bbox in page['blocks']:
+            yield {
+                'text': text[start:end].replace("\n", " ").strip(),
+                'type': content_type,
+                'bbox': bbox
+            }
+    
+    def clean_text(self, text: str) -> str:
+        """Clean and normalize extracted text"""
+        if not text:
+            return ""
+        
+        # Whitespace runs, character repetitions, lower/upper splits and page
+        # numbers in one pass, then broken chapter headers
+        text = _CLEAN_PATTERN.sub(_clean_replacement, text)
+        if 'hapter' in text:
+            text = _CHAPTER_PATTERN.sub('Chapter', text)
         
         return text.strip()
     
     def extract_structured_text(self, blocks_dict: Dict) -> List[Dict[str, Any]]:
         """Extract structured text from text blocks"""
+        return self.parse_blocks(blocks_dict)[1]
+    
+    def parse_blocks(self, blocks_dict: Dict, offsets: bool = False) -> Tuple[str, List[Any]]:
+        """
+        Walk the text blocks of a page once
+        
+        Args:
+            blocks_dict: get_text("dict") output of a page
+            offsets: Return blocks as (type, start, end, bbox) tuples into the
+                plain text instead of dicts carrying their own text
+        
+        Returns:
+            Tuple of (plain text with one line per text line, structured blocks)
+        """
+        plain_lines = []
         structured_content = []
+        position = 0
         
         if 'blocks' not in blocks_dict:
-            return structured_content
+            return "", structured_content
         
         for block in blocks_dict['blocks']:
             if 'lines' in block:
                 block_text = ""
                 font_info = []
+                block_start = position
                 
                 for line in block['lines']:
                     line_text = ""
@@ -108,18 +525,26 @@ class ImprovedPDFExtractor:
                             'flags': span.get('flags', 0)
                         })
                     block_text += line_text + " "
+                    plain_lines.append(line_text)
+                    position += len(line_text) + 1
                 
                 if block_text.strip():
                     # Determine content type based on font info
                     content_type = self.classify_content_type(block_text, font_info)
                     
+                    if offsets:
+                        # Lines are newline-separated in the plain text, so the
+                        # block ends just before the last line's newline
+                        structured_content.append((content_type, block_start, position - 1, tuple(block.get('bbox', ()))))
+                        continue
+                    
                     structured_content.append({
                         'text': block_text.strip(),
                         'type': content_type,
                         'bbox': block.get('bbox', [])
                     })
         
-        return structured_content
+        return "".join(line + "\n" for line in plain_lines), structured_content
     
     def classify_content_type(self, text: str, font_info: List[Dict]) -> str:
         """Classify content type based on text and font information"""
@@ -148,50 +573,43 @@ class ImprovedPDFExtractor:
         chapter_info = {'number': '', 'title': ''}
         
         # Look for chapter patterns
-        chapter_match = re.search(r'Chapter\s*(\d+)\s*[:\-]?\s*(.+?)(?:\n|$)', text, re.IGNORECASE)
+        chapter_match = _CHAPTER_INFO_PATTERN.search(text)
         if chapter_match:
             chapter_info['number'] = chapter_match.group(1)
             chapter_info['title'] = chapter_match.group(2).strip()
         
         return chapter_info
     
+    def find_chapter_info(self, pages: List[Dict]) -> Dict[str, str]:
+        """
+        Chapter number and title from page records without joining every page
+        
+        Each page is searched together with the next one, so a heading that
+        runs over a page break is still found; the first match wins.
+        """
+        scanner = ChapterInfoScanner()
+        for page in pages:
+            scanner.feed(self.page_cleaned_text(page))
+            if scanner.info is not None:
+                break
+        
+        return scanner.result()
+    
     def split_into_sections(self, pages: List[Dict]) -> List[Dict[str, Any]]:
         """Split content into logical sections with appropriate chunk sizes for embeddings"""
         sections = []
-        current_section = None
+        builder = SectionBuilder(self._optimize_section_chunks)
         
         for page in pages:
-            for content in page.get('structured_text', []):
-                content_type = content['type']
-                text = content['text']
-                
-                if content_type in ['chapter_title', 'heading']:
-                    # Start new section
-                    if current_section:
-                        # Ensure content chunks are properly sized for embeddings
-                        self._optimize_section_chunks(current_section)
-                        sections.append(current_section)
-                    
-                    current_section = {
-                        'title': text,
-                        'type': content_type,
-                        'content': [],
-                        'activities': [],
-                        'questions': []
-                    }
-                elif current_section:
-                    # Add to current section
-                    if content_type == 'activity':
-                        current_section['activities'].append(text)
-                    elif content_type == 'question':
-                        current_section['questions'].append(text)
-                    else:
-                        current_section['content'].append(text)
+            for content in self.page_blocks(page):
+                section = builder.add(content)
+                if section:
+                    sections.append(section)
         
         # Add last section
-        if current_section:
-            self._optimize_section_chunks(current_section)
-            sections.append(current_section)
+        section = builder.finish()
+        if section:
+            sections.append(section)
         
         return sections
     
@@ -264,17 +682,32 @@ class ImprovedPDFExtractor:
             
             section['questions'] = new_questions
     
-    def process_single_pdf(self, pdf_path: str) -> bool:
-        """Process a single PDF file"""
+    def process_single_pdf(self, pdf_path: str, workers: int = 1) -> bool:
+        """Process a single PDF file (split into page ranges across processes when workers > 1)"""
+        if workers > 1:
+            return len(self.process_parallel([pdf_path], workers)) == 1
+        
+        if self.streaming:
+            return self.stream_single_pdf(pdf_path)
+        
         print(f"Processing {pdf_path}...")
         
         extracted_data = self.extract_text_from_pdf(pdf_path)
         if not extracted_data:
             return False
         
-        # Extract chapter information
-        all_text = " ".join([page['cleaned_text'] for page in extracted_data['pages']])
-        chapter_info = self.extract_chapter_info(all_text)
+        return self.save_extraction(extracted_data)
+    
+    def save_extraction(self, extracted_data: Dict[str, Any]) -> bool:
+        """Build sections from extracted pages and save the improved JSON"""
+        # Extract chapter information (compact output has no full_text, so
+        # the pages are never joined into one string)
+        if self.compact:
+            all_text = None
+            chapter_info = self.find_chapter_info(extracted_data['pages'])
+        else:
+            all_text = " ".join([page['cleaned_text'] for page in extracted_data['pages']])
+            chapter_info = self.extract_chapter_info(all_text)
         
         # Split into sections
         sections = self.split_into_sections(extracted_data['pages'])
@@ -289,26 +722,235 @@ class ImprovedPDFExtractor:
                 'processed_pages': len(extracted_data['pages']),
                 'total_word_count': sum(page['word_count'] for page in extracted_data['pages'])
             },
-            'sections': sections,
-            'full_text': all_text
+            'sections': sections
         }
+        if all_text is not None:
+            final_data['full_text'] = all_text
         
         # Save to JSON
-        output_filename = f"{os.path.splitext(extracted_data['filename'])[0]}_improved.json"
-        output_path = os.path.join(self.output_dir, output_filename)
+        output_path = self._output_path(extracted_data['filename'])
         
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(final_data, f, indent=2, ensure_ascii=False)
+            if self.compact:
+                json.dump(final_data, f, separators=(',', ':'), ensure_ascii=False)
+            else:
+                json.dump(final_data, f, indent=2, ensure_ascii=False)
         
+        self._report_saved(output_path, final_data['metadata'], len(sections))
+        return True
+    
+    @staticmethod
+    def _report_saved(output_path: str, metadata: Dict[str, Any], section_count: int) -> None:
         print(f"✅ Saved improved extraction to {output_path}")
-        print(f"   - Pages processed: {len(extracted_data['pages'])}")
-        print(f"   - Sections found: {len(sections)}")
-        print(f"   - Total words: {final_data['metadata']['total_word_count']}")
+        print(f"   - Pages processed: {metadata['processed_pages']}")
+        print(f"   - Sections found: {section_count}")
+        print(f"   - Total words: {metadata['total_word_count']}")
+    
+    def stream_single_pdf(self, pdf_path: str) -> bool:
+        """
+        Extract a PDF page by page and write its sections as they complete
+        
+        Peak memory is one page plus the section being built. Chapter info
+        is found from consecutive page pairs, and in full (non-compact) mode
+        the cleaned page texts are spooled to a temporary file and copied
+        into full_text at the end. The result loads to the same data as
+        save_extraction() writes; only the key order differs.
+        
+        Args:
+            pdf_path: PDF file to process
+            
+        Returns:
+            True if the JSON file was written
+        """
+        print(f"Processing {pdf_path}...")
+        
+        filename = os.path.basename(pdf_path)
+        output_path = self._output_path(filename)
+        builder = SectionBuilder(self._optimize_section_chunks)
+        scanner = ChapterInfoScanner()
+        writer = None
+        doc = None
+        
+        # Cleaned page texts for full_text, kept on disk rather than in memory
+        spool = None if self.compact else tempfile.TemporaryFile('w+', encoding='utf-8')
+        try:
+            doc = fitz.open(pdf_path)
+            writer = StreamingExtractionWriter(output_path, compact=self.compact)
+            processed_pages = 0
+            total_word_count = 0
+            
+            for page_data, cleaned_text in self._iter_pages(doc, pdf_path, 0, len(doc)):
+                scanner.feed(cleaned_text)
+                if spool is not None:
+                    spool.write((" " if processed_pages else "") + cleaned_text)
+                processed_pages += 1
+                total_word_count += page_data['word_count']
+                
+                for content in self.page_blocks(page_data):
+                    section = builder.add(content)
+                    if section:
+                        writer.write_section(section)
+            
+            section = builder.finish()
+            if section:
+                writer.write_section(section)
+            
+            chapter_info = scanner.result()
+            metadata = {
+                'filename': filename,
+                'total_pages': len(doc),
+                'chapter_number': chapter_info['number'],
+                'chapter_title': chapter_info['title'],
+                'processed_pages': processed_pages,
+                'total_word_count': total_word_count
+            }
+            writer.close(metadata, full_text=spool)
+            
+        except Exception as e:
+            print(f"Error processing {pdf_path}: {e}")
+            if writer is not None:
+                writer.abort()
+            return False
+        
+        finally:
+            if doc is not None:
+                doc.close()
+            if spool is not None:
+                spool.close()
         
+        self._report_saved(output_path, metadata, writer.section_count)
         return True
     
-    def process_all_pdfs(self, pdf_directory: str = "data/raw"):
-        """Process all PDF files in the directory"""
+    @staticmethod
+    def _page_ranges(total_pages: int) -> List[Tuple[int, int]]:
+        """Split a page count into near-equal ranges of at most PAGES_PER_TASK pages"""
+        tasks = max(1, math.ceil(total_pages / PAGES_PER_TASK))
+        size = math.ceil(total_pages / tasks) if total_pages else 0
+        return [(start, min(start + size, total_pages)) for start in range(0, total_pages, size)] if size else [(0, 0)]
+    
+    def process_parallel(self, pdf_paths: List[str], workers: int) -> List[str]:
+        """
+        Extract PDFs across a process pool
+        
+        Every file is split into page ranges so large chapters are shared
+        between workers; ranges are merged back in page order and each file
+        is saved as soon as its last range finishes.
+        
+        Args:
+            pdf_paths: PDF files to process
+            workers: Number of worker processes
+            
+        Returns:
+            Paths of the files processed successfully
+        """
+        if self.streaming:
+            return self._process_parallel_streaming(pdf_paths, workers)
+        
+        start_time = time.time()
+        files = {}
+        tasks = []
+        # Largest files first so their ranges do not straggle at the end
+        for pdf_path in sorted(pdf_paths, key=os.path.getsize, reverse=True):
+            try:
+                doc = fitz.open(pdf_path)
+                total_pages = len(doc)
+                doc.close()
+            except Exception as e:
+                print(f"Error processing {pdf_path}: {e}")
+                continue
+            
+            ranges = self._page_ranges(total_pages)
+            files[pdf_path] = {
+                'total_pages': total_pages,
+                'ranges': [None] * len(ranges),
+                'remaining': len(ranges),
+                'seconds': 0.0,
+                'failed': False
+            }
+            tasks.extend((pdf_path, i, start, end) for i, (start, end) in enumerate(ranges))
+        
+        print(f"Extracting {len(files)} PDFs as {len(tasks)} page-range tasks on {workers} processes...")
+        
+        succeeded = []
+        timings = []
+        options = self._worker_options()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_extract_page_range, options, pdf_path, start, end): (pdf_path, i)
+                for pdf_path, i, start, end in tasks
+            }
+            for future in as_completed(futures):
+                pdf_path, i = futures[future]
+                state = files[pdf_path]
+                state['remaining'] -= 1
+                try:
+                    state['ranges'][i], seconds = future.result()
+                    state['seconds'] += seconds
+                except Exception as e:
+                    print(f"Error processing {pdf_path}: {e}")
+                    state['failed'] = True
+                
+                if state['remaining'] or state['failed']:
+                    continue
+                
+                extracted_data = {
+                    'filename': os.path.basename(pdf_path),
+                    'total_pages': state['total_pages'],
+                    'pages': [page for pages in state['ranges'] for page in pages]
+                }
+                if self.save_extraction(extracted_data):
+                    succeeded.append(pdf_path)
+                timings.append((pdf_path, state['total_pages'], len(state['ranges']), state['seconds'], time.time() - start_time))
+        
+        print(f"\n⏱️ Per-file timing ({time.time() - start_time:.2f}s wall clock):")
+        for pdf_path, total_pages, range_count, seconds, finished in timings:
+            print(f"   {os.path.basename(pdf_path)}: {total_pages} pages in {range_count} ranges, "
+                  f"{seconds:.2f}s extraction, done at {finished:.2f}s")
+        
+        return succeeded
+    
+    def _process_parallel_streaming(self, pdf_paths: List[str], workers: int) -> List[str]:
+        """
+        Stream whole PDFs across a process pool
+        
+        A streamed file is written in page order by one process, so files
+        rather than page ranges are the unit of work here.
+        """
+        start_time = time.time()
+        # Largest files first so they do not straggle at the end
+        pdf_paths = sorted(pdf_paths, key=os.path.getsize, reverse=True)
+        print(f"Streaming {len(pdf_paths)} PDFs on {workers} processes...")
+        
+        succeeded = []
+        timings = []
+        options = self._worker_options()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_stream_pdf, options, pdf_path): pdf_path for pdf_path in pdf_paths}
+            for future in as_completed(futures):
+                pdf_path = futures[future]
+                try:
+                    success, seconds = future.result()
+                except Exception as e:
+                    print(f"Error processing {pdf_path}: {e}")
+                    continue
+                
+                if success:
+                    succeeded.append(pdf_path)
+                timings.append((pdf_path, seconds, time.time() - start_time))
+        
+        print(f"\n⏱️ Per-file timing ({time.time() - start_time:.2f}s wall clock):")
+        for pdf_path, seconds, finished in timings:
+            print(f"   {os.path.basename(pdf_path)}: {seconds:.2f}s extraction, done at {finished:.2f}s")
+        
+        return succeeded
+    
+    def process_all_pdfs(self, pdf_directory: str = "data/raw", workers: int = 1, force: bool = False):
+        """
+        Process all PDF files in the directory (across a process pool when workers > 1)
+        
+        PDFs whose improved JSON is current according to the extraction
+        manifest are skipped unless force is set.
+        """
         if not os.path.exists(pdf_directory):
             print(f"Error: Directory {pdf_directory} not found!")
             return
@@ -321,26 +963,70 @@ class ImprovedPDFExtractor:
         
         print(f"Found {len(pdf_files)} PDF files to process...")
         
-        success_count = 0
-        for pdf_file in sorted(pdf_files):
-            pdf_path = os.path.join(pdf_directory, pdf_file)
-            if self.process_single_pdf(pdf_path):
-                success_count += 1
+        manifest = ExtractionManifest(self.output_dir, self.output_options())
+        if not force:
+            total_files = len(pdf_files)
+            pdf_files = [
+                pdf_file for pdf_file in pdf_files
+                if not manifest.is_current(os.path.join(pdf_directory, pdf_file), self._output_path(pdf_file))
+            ]
+            if len(pdf_files) < total_files:
+                print(f"⏭️ Skipping {total_files - len(pdf_files)} unchanged PDFs (use --force to re-extract)")
+            if not pdf_files:
+                print(f"\n🎉 Everything is up to date!")
+                return
+        
+        if workers > 1:
+            succeeded = self.process_parallel(
+                [os.path.join(pdf_directory, pdf_file) for pdf_file in pdf_files], workers
+            )
+        else:
+            succeeded = []
+            timings = []
+            for pdf_file in sorted(pdf_files):
+                pdf_path = os.path.join(pdf_directory, pdf_file)
+                start_time = time.time()
+                if self.process_single_pdf(pdf_path):
+                    succeeded.append(pdf_path)
+                timings.append((pdf_file, time.time() - start_time))
+            
+            print(f"\n⏱️ Per-file timing:")
+            for pdf_file, seconds in timings:
+                print(f"   {pdf_file}: {seconds:.2f}s")
+        
+        for pdf_path in succeeded:
+            manifest.record(pdf_path, self._output_path(os.path.basename(pdf_path)))
         
         print(f"\n🎉 Processing complete!")
-        print(f"Successfully processed: {success_count}/{len(pdf_files)} files")
+        print(f"Successfully processed: {len(succeeded)}/{len(pdf_files)} files")
 
 def main():
     """Main function"""
-    extractor = ImprovedPDFExtractor()
+    parser = argparse.ArgumentParser(description='Extract structured text from textbook PDFs')
+    parser.add_argument('pdf_path', nargs='?', help='PDF to process (default: every PDF in data/raw)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes; 0 uses every core (default: 1, serial)')
+    parser.add_argument('--single-pass', action='store_true',
+                        help='Parse every page once (faster); raw_text is rebuilt from text blocks, '
+                             'so its whitespace can differ from the default two-pass output')
+    parser.add_argument('--compact', action='store_true',
+                        help='Lean page records and compact JSON without full_text')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write sections page by page with bounded memory (for very long PDFs)')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-extract every PDF, even those unchanged since the last run')
+    args = parser.parse_args()
+    
+    workers = args.workers or os.cpu_count() or 1
+    extractor = ImprovedPDFExtractor(single_pass=args.single_pass, compact=args.compact,
+                                     streaming=args.stream)
     
-    if len(sys.argv) > 1:
+    if args.pdf_path:
         # Process specific file
-        pdf_path = sys.argv[1]
-        extractor.process_single_pdf(pdf_path)
+        extractor.process_single_pdf(args.pdf_path, workers=workers)
     else:
         # Process all files
-        extractor.process_all_pdfs()
+        extractor.process_all_pdfs(workers=workers, force=args.force)
 
 if __name__ == "__main__":
     main()
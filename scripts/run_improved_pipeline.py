@@ -9,7 +9,7 @@ import sys
 import os
 import json
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 from pathlib import Path
 
@@ -17,11 +17,10 @@ from pathlib import Path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import required modules
-from src.models.embedding_model import NVEmbedPipeline
-from src.database.qdrant_connector import QdrantConnector
+from src.models.registry import get_embedding_model
+from src.database.vector_store import create_vector_store
+from src.database.collection_params import METADATA_PAYLOAD_INDEXES
 from src.core.config import (
-    QDRANT_HOST, 
-    QDRANT_PORT, 
     QDRANT_COLLECTION_NAME,
     LESSON_PLANS_DIR
 )
@@ -39,15 +38,10 @@ class LessonPlanGenerator:
     def __init__(self):
         """Initialize the lesson plan generator."""
         # Initialize embedding model
-        self.embedder = NVEmbedPipeline()
-        
-        # Initialize database connector
-        self.db = QdrantConnector(
-            host=QDRANT_HOST,
-            port=QDRANT_PORT,
-            collection_name=QDRANT_COLLECTION_NAME,
-            vector_size=4096
-        )
+        self.embedder = get_embedding_model()
+        
+        # Initialize the configured vector store backend
+        self.db = create_vector_store()
         
     def _build_filter(self, filters: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -58,6 +52,9 @@ class LessonPlanGenerator:
             
         Returns:
             Filter dictionary for Qdrant
+            
+        Raises:
+            ValueError: If a filter key has no payload index
         """
         if not filters:
             return None
@@ -65,12 +62,14 @@ class LessonPlanGenerator:
         must_conditions = []
         
         for key, value in filters.items():
-            if key in ["chapter", "subject"]:
-                # Handle metadata filters
-                must_conditions.append({
-                    "key": f"metadata.{key}",
-                    "match": {"value": value}
-                })
+            # Only indexed metadata fields can be filtered on
+            field = f"metadata.{key}"
+            if field not in METADATA_PAYLOAD_INDEXES:
+                raise ValueError(f"Cannot filter on '{key}': no payload index for '{field}'")
+            must_conditions.append({
+                "key": field,
+                "match": {"value": value}
+            })
                 
         if must_conditions:
             return {"must": must_conditions}
@@ -104,6 +103,33 @@ class LessonPlanGenerator:
         
         return results
         
+    def search_many(self, queries: List[str], filters: List[Dict[str, Any]] = None,
+                    limit: int = 5) -> List[List[Any]]:
+        """
+        Search for relevant documents for many queries at once.
+        
+        All queries are embedded in one model batch and sent to Qdrant
+        as a single batch search request.
+        
+        Args:
+            queries: Query texts
+            filters: Optional filters per query
+            limit: Maximum number of results per query
+            
+        Returns:
+            List of relevant documents per query, in input order
+        """
+        if filters is None:
+            filters = [None] * len(queries)
+        
+        query_embeddings = self.embedder.embed_queries(queries)
+        
+        return self.db.search_batch(
+            query_embeddings,
+            limit=limit,
+            filters=[self._build_filter(f) for f in filters]
+        )
+        
     def generate_lesson_plan(self, query: str, filters: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Generate a lesson plan based on a query.
@@ -118,6 +144,41 @@ class LessonPlanGenerator:
         # Search for relevant documents
         results = self.search(query, filters, limit=10)
         
+        return self._build_lesson_plan(query, filters, results)
+        
+    def generate_lesson_plans(self, queries: List[str], filters: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Generate lesson plans for many queries with one batched retrieval.
+        
+        Args:
+            queries: Query texts
+            filters: Optional filters per query
+            
+        Returns:
+            Generated lesson plans, in input order
+        """
+        if filters is None:
+            filters = [None] * len(queries)
+        
+        batch_results = self.search_many(queries, filters, limit=10)
+        
+        return [
+            self._build_lesson_plan(query, query_filters, results)
+            for query, query_filters, results in zip(queries, filters, batch_results)
+        ]
+        
+    def _build_lesson_plan(self, query: str, filters: Optional[Dict[str, Any]], results: List[Any]) -> Dict[str, Any]:
+        """
+        Build a lesson plan from search results.
+        
+        Args:
+            query: Query text
+            filters: Filters that were applied
+            results: Search results for the query
+            
+        Returns:
+            Generated lesson plan
+        """
         if not results:
             return {
                 "error": "No relevant documents found",
@@ -193,19 +254,13 @@ def check_qdrant_collection():
         True if collection exists and has documents, False otherwise
     """
     try:
-        # Initialize connector
-        db = QdrantConnector(
-            host=QDRANT_HOST,
-            port=QDRANT_PORT,
-            collection_name=QDRANT_COLLECTION_NAME
-        )
-        
-        # Get collection info
-        collection_info = db.get_collection_info()
+        # Initialize the configured vector store backend
+        db = create_vector_store()
         
         # Check if collection exists and has vectors
-        if collection_info and "vectors_count" in collection_info and collection_info["vectors_count"] > 0:
-            logger.info(f"✅ Qdrant collection '{QDRANT_COLLECTION_NAME}' exists with {collection_info['vectors_count']} vectors")
+        count = db.count_documents()
+        if count > 0:
+            logger.info(f"✅ Qdrant collection '{QDRANT_COLLECTION_NAME}' exists with {count} vectors")
             return True
         else:
             logger.warning(f"⚠️ Qdrant collection '{QDRANT_COLLECTION_NAME}' does not exist or has no vectors")
@@ -296,14 +351,12 @@ def main():
         "Algebra and equation solving"
     ]
     
-    # Generate and save lesson plans
-    for topic in example_topics:
-        logger.info(f"Generating lesson plan for topic: {topic}")
-        
-        # Generate the lesson plan
-        lesson_plan = generator.generate_lesson_plan(topic)
-        
-        # Save the lesson plan
+    # Generate all lesson plans with one batched retrieval
+    logger.info(f"Generating lesson plans for {len(example_topics)} topics")
+    lesson_plans = generator.generate_lesson_plans(example_topics)
+    
+    # Save the lesson plans
+    for topic, lesson_plan in zip(example_topics, lesson_plans):
         filename = f"lesson_plan_{topic.replace(' ', '_').lower()}.json"
         save_lesson_plan(lesson_plan, filename)
     
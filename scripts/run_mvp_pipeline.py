@@ -9,7 +9,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.processors.document_processor import DocumentProcessor
-from src.models.embedding_model import NVEmbedPipeline
+from src.models.registry import get_embedding_model
 from src.core.vector_database import QdrantDB
 from src.generators.lesson_plan_generator import LessonPlanGenerator
 
@@ -31,7 +31,7 @@ def setup_database():
     
     # Step 2: Generate embeddings
     print("\n🧠 Step 2: Generating embeddings...")
-    embedder = NVEmbedPipeline()
+    embedder = get_embedding_model()
     texts = [chunk['text'] for chunk in chunks]
     embeddings = embedder.embed_texts(texts)
     
@@ -57,10 +57,15 @@ def test_lesson_plan_generation():
         ("Chemical reactions and conservation laws", "Chapter 3", "Science")
     ]
     
-    for i, (query, chapter, subject) in enumerate(test_queries, 1):
+    # Retrieve context for every test query in one batch
+    results = generator.generate_lesson_plans([
+        {"query": query, "chapter": chapter, "subject": subject}
+        for query, chapter, subject in test_queries
+    ])
+    
+    for i, ((query, chapter, subject), result) in enumerate(zip(test_queries, results), 1):
         print(f"\n📝 Test {i}: {query}")
         print(f"   Chapter: {chapter}, Subject: {subject}")
-        result = generator.generate_lesson_plan(query, chapter, subject)
         print(f"✅ Generated lesson plan with {len(result['sources'])} source documents")
         
         # Save lesson plan
@@ -234,19 +234,15 @@ def search_with_query(query, embeddings, chunks, metadata):
         print(f"Error generating query embedding: {e}")
         return
     
-    # Normalize query vector
+    # Normalize query and chunk vectors
     query_norm = query_embedding / np.linalg.norm(query_embedding)
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
     
-    # Calculate similarities
-    similarities = []
-    for i, emb in enumerate(embeddings):
-        emb_array = np.array(emb)
-        emb_norm = emb_array / np.linalg.norm(emb_array)
-        similarity = np.dot(query_norm, emb_norm)
-        similarities.append((i, similarity))
-    
-    # Sort by similarity (highest first)
-    similarities.sort(key=lambda x: x[1], reverse=True)
+    # Calculate all similarities at once and keep the best three
+    scores = matrix @ query_norm
+    top = np.argpartition(-scores, min(3, len(scores)) - 1)[:3]
+    similarities = [(i, scores[i]) for i in top[np.argsort(-scores[top])]]
     
     # Print results
     print(f"\n🔍 Search results for: '{query}'")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Conformance checks and benchmark for the VectorStore backends.
+Runs the same scenario against each backend with random vectors: behavioural
+checks first (results must agree across backends), then insert and search
+throughput so backends can be compared for latency and memory trade-offs.
+"""
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+import argparse
+from typing import Dict, List, Callable, Tuple
+
+import numpy as np
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.vector_store import VectorStore, BACKENDS, create_vector_store, make_document, canonical_payload
+
+CHAPTERS = ("Chapter 1", "Chapter 2", "Chapter 3")
+
+def make_corpus(points: int, dim: int, seed: int = 0) -> Tuple[List[Dict], np.ndarray]:
+    """Build canonical documents and random unit vectors"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((points, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    documents = [
+        make_document(i, f"chunk {i}", {"chapter": CHAPTERS[i % len(CHAPTERS)], "subject": "Science", "chunk_index": i})
+        for i in range(points)
+    ]
+    return documents, vectors
+
+def ids(points) -> List:
+    return [point.id for point in points]
+
+def run_checks(store: VectorStore, documents: List[Dict], vectors: np.ndarray) -> List[Tuple[str, bool]]:
+    """
+    Run the behavioural checks on an empty store.
+    
+    Returns:
+        List of (check name, passed)
+    """
+    results = []
+    
+    def check(name: str, test: Callable[[], bool]) -> None:
+        try:
+            passed = bool(test())
+        except Exception as e:
+            print(f"   ⚠️ {name} raised {e}")
+            passed = False
+        results.append((name, passed))
+        print(f"   {'✅' if passed else '❌'} {name}")
+    
+    probes = list(range(0, len(documents), max(1, len(documents) // 10)))
+    
+    check("recreate_collection empties the collection",
+          lambda: store.recreate_collection() and store.count_documents() == 0)
+    check("insert_documents stores every point",
+          lambda: store.insert_documents(documents, vectors) and store.count_documents() == len(documents))
+    check("get_vector_size reports the stored dimension",
+          lambda: store.get_vector_size() == vectors.shape[1])
+    check("each point is its own nearest neighbour",
+          lambda: all(ids(store.search_documents(vectors[i], limit=1, exact=True)) == [documents[i]["id"]] for i in probes))
+    check("filtered search only returns matching points",
+          lambda: all(
+              canonical_payload(point.payload)["metadata"]["chapter"] == CHAPTERS[1]
+              for point in store.search_documents(
+                  vectors[0], limit=10, exact=True,
+                  filter={"must": [{"key": "metadata.chapter", "match": {"value": CHAPTERS[1]}}]}
+              )
+          ))
+    check("search_batch matches search_documents",
+          lambda: [ids(points) for points in store.search_batch(vectors[probes], limit=5, exact=True)]
+          == [ids(store.search_documents(vectors[i], limit=5, exact=True)) for i in probes])
+    check("get_document returns the canonical payload",
+          lambda: canonical_payload(store.get_document(documents[1]["id"]).payload)
+          == {"text": documents[1]["text"], "metadata": documents[1]["metadata"]})
+    check("get_payload_values reads nested fields",
+          lambda: store.get_payload_values("metadata.chapter")
+          == {doc["id"]: doc["metadata"]["chapter"] for doc in documents})
+    
+    replaced = make_document(documents[2]["id"], "replaced", documents[2]["metadata"])
+    check("re-inserting an id replaces the point",
+          lambda: store.insert_documents([replaced], vectors[2:3]) and store.count_documents() == len(documents)
+          and canonical_payload(store.get_document(replaced["id"]).payload)["text"] == "replaced")
+    check("delete_documents removes points",
+          lambda: store.delete_documents([documents[3]["id"]]) and store.count_documents() == len(documents) - 1
+          and store.get_document(documents[3]["id"]) is None
+          and documents[3]["id"] not in ids(store.search_documents(vectors[3], limit=5, exact=True)))
+    
+    return results
+
+def run_benchmark(store: VectorStore, documents: List[Dict], vectors: np.ndarray,
+                  queries: np.ndarray) -> Dict[str, float]:
+    """
+    Time a bulk insert, single searches and one batch search.
+    
+    Returns:
+        Dictionary with throughput and latency figures
+    """
+    store.recreate_collection()
+    
+    start_time = time.time()
+    store.insert_documents(documents, vectors)
+    insert_time = time.time() - start_time
+    
+    latencies = []
+    for query in queries:
+        start_time = time.perf_counter()
+        store.search_documents(query, limit=5)
+        latencies.append(time.perf_counter() - start_time)
+    
+    start_time = time.perf_counter()
+    store.search_batch(queries, limit=5)
+    batch_time = time.perf_counter() - start_time
+    
+    return {
+        "insert_points_per_sec": len(documents) / insert_time,
+        "search_p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "search_p95_ms": float(np.percentile(latencies, 95)) * 1000,
+        "batch_queries_per_sec": len(queries) / batch_time
+    }
+
+def drop(store: VectorStore) -> None:
+    """Remove the test collection from a Qdrant backend"""
+    client = getattr(store, "client", None)
+    if client is not None:
+        try:
+            client.delete_collection(store.collection_name)
+        except Exception:
+            pass
+
+def main():
+    """Run checks and benchmark for the selected backends"""
+    parser = argparse.ArgumentParser(description='Check and benchmark VectorStore backends')
+    parser.add_argument('--backends', nargs='+', default=["qdrant_local", "numpy"], choices=BACKENDS,
+                        help='Backends to test ("qdrant" needs a running server)')
+    parser.add_argument('--points', type=int, default=2000, help='Number of points to insert')
+    parser.add_argument('--queries', type=int, default=200, help='Number of searches to run')
+    parser.add_argument('--dim', type=int, default=256, help='Vector dimension')
+    parser.add_argument('--checks-only', action='store_true', help='Skip the benchmark')
+    args = parser.parse_args()
+    
+    documents, vectors = make_corpus(args.points, args.dim)
+    queries = make_corpus(args.queries, args.dim, seed=1)[1]
+    check_documents, check_vectors = make_corpus(min(args.points, 200), args.dim, seed=2)
+    
+    failures = 0
+    stats = {}
+    for backend in args.backends:
+        print(f"\n🔄 {backend}")
+        workdir = tempfile.mkdtemp(prefix=f"vector_store_{backend}_")
+        options = {} if backend == "qdrant" else {"path": workdir}
+        store = create_vector_store(backend, collection_name="vector_store_conformance", vector_size=args.dim, **options)
+        try:
+            failures += sum(not passed for _, passed in run_checks(store, check_documents, check_vectors))
+            if not args.checks_only:
+                stats[backend] = run_benchmark(store, documents, vectors, queries)
+        finally:
+            drop(store)
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    if stats:
+        print(f"\n📊 {args.points} points / {args.queries} queries at {args.dim} dims")
+        print(f"{'Backend':<14} {'Insert pts/s':>13} {'p50 ms':>8} {'p95 ms':>8} {'Batch q/s':>10}")
+        for backend, result in stats.items():
+            print(f"{backend:<14} {result['insert_points_per_sec']:>13.1f} {result['search_p50_ms']:>8.2f} "
+                  f"{result['search_p95_ms']:>8.2f} {result['batch_queries_per_sec']:>10.1f}")
+    
+    if failures:
+        print(f"\n❌ {failures} conformance checks failed")
+        sys.exit(1)
+    print("\n✅ All conformance checks passed")
+
+if __name__ == "__main__":
+    main()
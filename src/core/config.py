@@ -23,12 +23,65 @@ LESSON_PLANS_DIR = os.path.join(OUTPUTS_DIR, 'lesson_plans')
 EMBEDDING_MODEL = "nvidia/NV-Embed-v2"  # Using NV-Embed
 EMBEDDING_BATCH_SIZE = 2
 EMBEDDING_MAX_LENGTH = 512
+EMBEDDING_MAX_BATCH_TOKENS = 1024  # Padded tokens per batch (length-bucketed)
+EMBEDDING_DIM = 4096  # Native NV-Embed-v2 output dimension
+
+# Optional projection applied before vectors are stored or queried
+EMBEDDING_PROJECTION = os.getenv("EMBEDDING_PROJECTION", "none").lower()  # "none", "truncate" or "pca"
+EMBEDDING_PROJECTION_DIM = int(os.getenv("EMBEDDING_PROJECTION_DIM", "1024"))
+EMBEDDING_PROJECTION_PATH = os.path.join(DATA_DIR, 'embedding_projection.npz')  # Fitted PCA
+
+# Embedding cache configuration (content-addressed, persisted across runs)
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_DIR = os.path.join(DATA_DIR, 'embedding_cache')
+EMBEDDING_CACHE_MAX_ENTRIES = 20000  # ~16 KiB per 4096-dim vector
+
+# Query embedding cache (in-process, retrieval path)
+QUERY_CACHE_MAX_ENTRIES = 1024
+QUERY_CACHE_TTL_SECONDS = 3600
+
+# Retrieval configuration
+TOP_K_RESULTS = 5
+
+# LLM configuration (OpenAI-compatible or Groq endpoint)
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+LLM_API_KEY = os.getenv("LLM_API_KEY", "")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.openai.com/v1")
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))  # Concurrent LLM calls in batch mode
 
 # Vector database configuration
+QDRANT_MODE = os.getenv("QDRANT_MODE", "server")  # "server" (host/port), "local" (embedded on QDRANT_LOCAL_PATH) or "memory"
 QDRANT_HOST = "localhost"
 QDRANT_PORT = 6333
+QDRANT_GRPC_PORT = 6334
+QDRANT_TRANSPORT = os.getenv("QDRANT_TRANSPORT", "rest")  # "rest" (JSON, port 6333) or "grpc" (binary vectors, needs QDRANT_GRPC_PORT)
+QDRANT_TIMEOUT = 30  # Request timeout in seconds
+QDRANT_KEEPALIVE_SECONDS = 60  # Keep idle connections open between requests
+QDRANT_UPSERT_MAX_BATCH_BYTES = 8 * 1024 * 1024  # ~500 points of 4096 dims per request
+QDRANT_UPSERT_PARALLEL = 4  # Upsert requests in flight during bulk ingest
 QDRANT_COLLECTION_NAME = "science_9_collection"
-QDRANT_VECTOR_SIZE = 4096  # NV-Embed dimensions
+QDRANT_VECTOR_SIZE = EMBEDDING_DIM if EMBEDDING_PROJECTION == "none" else EMBEDDING_PROJECTION_DIM  # Stored dimensions
+
+# Collection storage and index tuning
+QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "none")  # "none", "scalar" (int8, 4x smaller) or "binary" (32x smaller)
+QDRANT_QUANTIZATION_ALWAYS_RAM = True  # Keep quantized vectors in RAM even when originals are on disk
+QDRANT_QUANTIZATION_OVERSAMPLING = 2.0  # Candidates fetched per result before rescoring
+QDRANT_QUANTIZATION_RESCORE = True  # Rescore candidates with the original vectors
+QDRANT_ON_DISK = False  # Store original vectors on disk (memory-mapped)
+QDRANT_HNSW_M = 16  # HNSW graph degree
+QDRANT_HNSW_EF_CONSTRUCT = 100  # HNSW build-time beam width
+QDRANT_SEARCH_EF = None  # HNSW search beam width (None: server default)
+
+# Vector store backend: "qdrant" (as QDRANT_MODE), "qdrant_local" (embedded, on disk) or "numpy" (in-process)
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "qdrant")
+QDRANT_LOCAL_PATH = os.getenv("QDRANT_LOCAL_PATH", os.path.join(DATA_DIR, 'qdrant_local'))  # Embedded Qdrant storage
+
+# In-process NumPy vector store (no Qdrant server)
+NUMPY_STORE_DIR = os.path.join(DATA_DIR, 'numpy_store')
+
+# Ingest pipeline
+INGEST_BATCH_SIZE = 64  # Chunks embedded and uploaded together
+INGEST_QUEUE_SIZE = 2  # Embedded batches buffered ahead of the uploader
 
 # Ensure directories exist
 os.makedirs(RAW_DATA_DIR, exist_ok=True)
@@ -1,60 +1,138 @@
-from typing import List, Dict, Any
-import numpy as np
-from qdrant_client import QdrantClient
+from typing import List, Dict, Any, Optional, Union
 from qdrant_client.http import models
-from .config import QDRANT_HOST, QDRANT_PORT, QDRANT_COLLECTION_NAME
+from .config import QDRANT_COLLECTION_NAME, QDRANT_VECTOR_SIZE, VECTOR_STORE_BACKEND
+from ..database.vector_store import create_vector_store, make_document, canonical_payload
 
 class QdrantDB:
-    """Qdrant vector database connector for storing and retrieving embeddings"""
+    """Vector database facade returning flat result dictionaries (backend chosen by VECTOR_STORE_BACKEND)"""
     
-    def __init__(self, vector_size: int = None):
-        self.host = QDRANT_HOST
-        self.port = QDRANT_PORT
+    def __init__(self, vector_size: int = None, transport: str = None, timeout: int = None,
+                 quantization: str = None, on_disk: bool = None, backend: str = None):
+        self.backend = backend or VECTOR_STORE_BACKEND
         self.collection_name = QDRANT_COLLECTION_NAME
         self.vector_size = vector_size  # Will be set dynamically based on embeddings
+        # Transport and storage options default to config; the NumPy backend ignores them
+        self.options = {
+            "transport": transport,
+            "timeout": timeout,
+            "quantization": quantization,
+            "on_disk": on_disk
+        }
         
-        # Connect to Qdrant
-        self.client = QdrantClient(host=self.host, port=self.port)
-        print(f"✅ Connected to Qdrant at {self.host}:{self.port}")
+        self.store = self._create_store(vector_size or QDRANT_VECTOR_SIZE)
+        print(f"✅ Connected to {self.backend} vector store")
+        self._warn_if_legacy_schema()
+    
+    @property
+    def client(self) -> Any:
+        """Underlying Qdrant client (None for the NumPy backend)"""
+        return getattr(self.store, "client", None)
+    
+    def _create_store(self, vector_size: int) -> Any:
+        """Create the backend store for a vector size"""
+        return create_vector_store(
+            backend=self.backend,
+            collection_name=self.collection_name,
+            vector_size=vector_size,
+            **{key: value for key, value in self.options.items() if value is not None}
+        )
+    
+    def _legacy_points(self, limit: int, offset: Any = None) -> Any:
+        """Scroll points still stored in the flat payload schema (no 'metadata' key)"""
+        return self.client.scroll(
+            collection_name=self.collection_name,
+            scroll_filter=models.Filter(must=[
+                models.IsEmptyCondition(is_empty=models.PayloadField(key="metadata"))
+            ]),
+            limit=limit,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False
+        )
+    
+    def _warn_if_legacy_schema(self) -> None:
+        """Warn when the collection holds points written by the old flat-schema QdrantDB"""
+        # Only Qdrant collections can predate the nested payload schema
+        if self.client is None or self.store.get_vector_size() is None:
+            return
+        try:
+            legacy, _ = self._legacy_points(limit=1)
+        except Exception as e:
+            print(f"⚠️ Could not check '{self.collection_name}' for flat-schema points: {e}")
+            return
+        if legacy:
+            print(f"⚠️ Collection '{self.collection_name}' has points in the old flat payload schema; "
+                  f"chapter/subject filters will not match them until QdrantDB.migrate_legacy_payloads() is run")
+    
+    def migrate_legacy_payloads(self, batch_size: int = 256) -> int:
+        """
+        Rewrite flat-schema payloads as ``{"text", "metadata"}`` in place
         
+        Points written by the old QdrantDB kept chapter and subject at the top
+        level, where the metadata.* filters used now cannot see them. Vectors
+        and IDs are left untouched, so no re-embedding is needed.
+        
+        Args:
+            batch_size: Points read per scroll request
+        
+        Returns:
+            Number of points migrated
+        """
+        if self.client is None:
+            print(f"✅ The {self.backend} backend has no flat-schema points to migrate")
+            return 0
+        
+        migrated = 0
+        offset = None
+        while True:
+            # Rewriting payloads does not move IDs, so paging by offset stays valid
+            points, offset = self._legacy_points(limit=batch_size, offset=offset)
+            for point in points:
+                if "metadata" in (point.payload or {}):
+                    continue
+                self.client.overwrite_payload(
+                    collection_name=self.collection_name,
+                    payload=canonical_payload(point.payload),
+                    points=[point.id]
+                )
+                migrated += 1
+            if offset is None:
+                break
+        
+        print(f"✅ Migrated {migrated} flat-schema points in '{self.collection_name}'")
+        return migrated
+    
     def create_collection(self, vector_size: int) -> None:
         """Create collection if it doesn't exist with dynamic vector size"""
         self.vector_size = vector_size
         try:
-            collections = self.client.get_collections().collections
-            collection_names = [collection.name for collection in collections]
+            if self.store.vector_size != vector_size:
+                self.store = self._create_store(vector_size)
             
-            if self.collection_name not in collection_names:
-                self.client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=models.VectorParams(
-                        size=self.vector_size,
-                        distance=models.Distance.COSINE,
-                    ),
-                )
-                print(f"✅ Collection '{self.collection_name}' created with vector size {self.vector_size}")
-            else:
+            exists = self.store.get_vector_size() is not None
+            # Also ensures payload indexes added after the collection was created
+            self.store.ensure_collection()
+            if exists:
                 print(f"✅ Collection '{self.collection_name}' already exists")
+            else:
+                print(f"✅ Collection '{self.collection_name}' created with vector size {self.vector_size}")
         except Exception as e:
             print(f"❌ Error creating collection: {e}")
     
     def insert_documents(self, embeddings: List[List[float]], documents: List[str], metadata: List[Dict[str, Any]]) -> List[str]:
-        """Insert document embeddings into Qdrant"""
+        """Insert document embeddings into the vector store"""
         # Create collection with correct vector size
-        if embeddings:
+        if len(embeddings):
             vector_size = len(embeddings[0])
             self.create_collection(vector_size)
         
-        points = []
-        for i, (embedding, document, meta) in enumerate(zip(embeddings, documents, metadata)):
-            point_id = i + 1000  # Simple ID generation
-            
-            points.append(
-                models.PointStruct(
-                    id=point_id,
-                    vector=embedding,
-                    payload={
-                        "text": document,
+        docs = []
+        for i, (document, meta) in enumerate(zip(documents, metadata)):
+            docs.append(
+                make_document(
+                    i + 1000,  # Simple ID generation
+                    document,
+                    {
                         "chapter": meta.get("chapter", "unknown"),
                         "subject": meta.get("subject", "unknown"),
                         "difficulty": meta.get("difficulty", "Basic"),
@@ -64,56 +142,87 @@ class QdrantDB:
                 )
             )
         
-        # Insert points in batches
-        batch_size = 100
-        for i in range(0, len(points), batch_size):
-            batch = points[i:i + batch_size]
-            self.client.upsert(collection_name=self.collection_name, points=batch)
+        if not self.store.insert_documents(docs, embeddings[:len(docs)]):
+            print(f"❌ Error inserting documents into '{self.collection_name}'")
+            return []
         
-        print(f"✅ Inserted {len(points)} documents into Qdrant")
-        return [str(point.id) for point in points]
+        print(f"✅ Inserted {len(docs)} documents into {self.backend} vector store")
+        return [str(doc["id"]) for doc in docs]
     
-    def search_documents(self, query_embedding: List[float], top_k: int = 5, filter_chapter: str = None, filter_subject: str = None) -> List[Dict[str, Any]]:
-        """Search for similar documents with chapter and subject filtering"""
-        # Prepare filter
-        filter_conditions = []
-        if filter_chapter:
-            filter_conditions.append(
-                models.FieldCondition(
-                    key="chapter",
-                    match=models.MatchValue(value=filter_chapter)
-                )
-            )
-        if filter_subject:
-            filter_conditions.append(
-                models.FieldCondition(
-                    key="subject", 
-                    match=models.MatchValue(value=filter_subject)
-                )
-            )
+    def search_documents(self, query_embedding: List[float], top_k: int = 5, filter_chapter: str = None, filter_subject: str = None,
+                         ef: int = None, exact: bool = False) -> List[Dict[str, Any]]:
+        """Search for similar documents with chapter and subject filtering (ef/exact tune recall vs latency)"""
+        search_results = self.store.search_documents(
+            query_vector=query_embedding,
+            limit=top_k,
+            filter=self._build_filter(filter_chapter, filter_subject),
+            ef=ef,
+            exact=exact
+        )
         
-        search_filter = models.Filter(must=filter_conditions) if filter_conditions else None
+        return [self._format_result(result) for result in search_results]
+    
+    def search_batch(self, query_embeddings: List[List[float]], top_k: Union[int, List[int]] = 5,
+                     filters: List[Optional[Dict[str, str]]] = None,
+                     ef: int = None, exact: bool = False) -> List[List[Dict[str, Any]]]:
+        """
+        Search for many query embeddings in a single request
         
-        # Search for similar documents
-        search_results = self.client.search(
-            collection_name=self.collection_name,
-            query_vector=query_embedding,
+        Args:
+            query_embeddings: Query embeddings (list of lists or 2-D numpy array)
+            top_k: Number of results per query, either one value or one per query
+            filters: Optional filter per query, e.g. {"chapter": "Chapter 3", "subject": "Science"}
+            ef: HNSW search beam width (default: QDRANT_SEARCH_EF)
+            exact: Search every vector instead of the HNSW index
+        
+        Returns:
+            One list of results per query, in input order
+            
+        Raises:
+            ValueError: If top_k or filters do not match query_embeddings in length
+        """
+        if isinstance(top_k, int):
+            top_k = [top_k] * len(query_embeddings)
+        if filters is None:
+            filters = [None] * len(query_embeddings)
+        if len(top_k) != len(query_embeddings) or len(filters) != len(query_embeddings):
+            raise ValueError("search_batch needs one top_k and one filter per query embedding")
+        
+        batch_results = self.store.search_batch(
+            query_embeddings,
             limit=top_k,
-            query_filter=search_filter,
-            with_payload=True,
+            filters=[
+                self._build_filter((query_filter or {}).get("chapter"), (query_filter or {}).get("subject"))
+                for query_filter in filters
+            ],
+            ef=ef,
+            exact=exact
         )
         
-        # Format results
-        results = []
-        for result in search_results:
-            results.append({
-                "id": result.id,
-                "text": result.payload.get("text", ""),
-                "score": result.score,
-                "chapter": result.payload.get("chapter", ""),
-                "subject": result.payload.get("subject", ""),
-                "difficulty": result.payload.get("difficulty", ""),
-                "source_file": result.payload.get("source_file", "")
-            })
+        return [[self._format_result(result) for result in results] for results in batch_results]
+    
+    @staticmethod
+    def _build_filter(filter_chapter: str = None, filter_subject: str = None) -> Optional[Dict[str, Any]]:
+        """Build a chapter/subject filter on the canonical payload (None if unfiltered)"""
+        filter_conditions = []
+        if filter_chapter:
+            filter_conditions.append({"key": "metadata.chapter", "match": {"value": filter_chapter}})
+        if filter_subject:
+            filter_conditions.append({"key": "metadata.subject", "match": {"value": filter_subject}})
         
-        return results
+        return {"must": filter_conditions} if filter_conditions else None
+    
+    @staticmethod
+    def _format_result(result: Any) -> Dict[str, Any]:
+        """Convert a search hit into a flat result dictionary"""
+        payload = canonical_payload(result.payload)
+        metadata = payload["metadata"]
+        return {
+            "id": result.id,
+            "text": payload["text"],
+            "score": result.score,
+            "chapter": metadata.get("chapter", ""),
+            "subject": metadata.get("subject", ""),
+            "difficulty": metadata.get("difficulty", ""),
+            "source_file": metadata.get("source_file", "")
+        }
@@ -0,0 +1,150 @@
+"""
+Qdrant client factory for EduPlan AI.
+This module builds QdrantClient instances with the configured transport
+(REST or gRPC), timeouts and connection keep-alive, or embedded clients
+that run Qdrant in-process on a local directory.
+"""
+
+import logging
+import os
+import threading
+from typing import Optional, Dict
+
+import httpx
+from qdrant_client import QdrantClient
+
+from ..core.config import (
+    QDRANT_MODE,
+    QDRANT_LOCAL_PATH,
+    QDRANT_HOST,
+    QDRANT_PORT,
+    QDRANT_GRPC_PORT,
+    QDRANT_TRANSPORT,
+    QDRANT_TIMEOUT,
+    QDRANT_KEEPALIVE_SECONDS
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ("rest", "grpc")
+MODES = ("server", "local", "memory")
+
+# Embedded storage is locked by the client that opens it, so share one per path
+_local_clients: Dict[str, QdrantClient] = {}
+_local_clients_lock = threading.Lock()
+
+def create_client(host: str = None, port: int = None, grpc_port: int = None,
+                  transport: str = None, timeout: Optional[int] = None,
+                  keepalive_seconds: Optional[int] = None,
+                  path: Optional[str] = None, mode: Optional[str] = None) -> QdrantClient:
+    """
+    Create a Qdrant client.
+    
+    gRPC sends vectors as packed binary floats instead of JSON text, which
+    matters for 4096-dim vectors; REST remains available for debugging and
+    for servers that only expose 6333.
+    
+    In "local" and "memory" mode Qdrant runs embedded in this process,
+    on a directory or purely in memory, and the server arguments are
+    ignored. That removes the HTTP hop and the docker service for
+    single-node installs; search is exact, so it suits collections of up
+    to a few tens of thousands of points. Embedded clients are shared per
+    path within the process.
+    
+    Args:
+        host: Qdrant server hostname (default: QDRANT_HOST)
+        port: REST port (default: QDRANT_PORT)
+        grpc_port: gRPC port (default: QDRANT_GRPC_PORT)
+        transport: "rest" or "grpc" (default: QDRANT_TRANSPORT)
+        timeout: Request timeout in seconds (default: QDRANT_TIMEOUT)
+        keepalive_seconds: Connection keep-alive in seconds (default: QDRANT_KEEPALIVE_SECONDS)
+        path: Embedded storage directory or ":memory:"; implies embedded mode
+        mode: "server", "local" or "memory" (default: QDRANT_MODE)
+        
+    Returns:
+        Configured QdrantClient
+    """
+    mode = (mode or QDRANT_MODE).lower()
+    if mode not in MODES:
+        raise ValueError(f"Unknown Qdrant mode '{mode}', expected one of {MODES}")
+    
+    if path or mode != "server":
+        return _create_local_client(path or (":memory:" if mode == "memory" else QDRANT_LOCAL_PATH))
+    
+    host = host or QDRANT_HOST
+    port = port or QDRANT_PORT
+    grpc_port = grpc_port or QDRANT_GRPC_PORT
+    transport = (transport or QDRANT_TRANSPORT).lower()
+    timeout = QDRANT_TIMEOUT if timeout is None else timeout
+    keepalive_seconds = QDRANT_KEEPALIVE_SECONDS if keepalive_seconds is None else keepalive_seconds
+    
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown Qdrant transport '{transport}', expected one of {TRANSPORTS}")
+    
+    if transport == "grpc":
+        client = QdrantClient(
+            host=host,
+            port=port,
+            grpc_port=grpc_port,
+            prefer_grpc=True,
+            timeout=timeout,
+            grpc_options={
+                "grpc.keepalive_time_ms": keepalive_seconds * 1000,
+                "grpc.keepalive_permit_without_calls": 1,
+                # Large upsert batches of 4096-dim vectors exceed the 4 MiB default
+                "grpc.max_send_message_length": -1,
+                "grpc.max_receive_message_length": -1
+            }
+        )
+    else:
+        client = QdrantClient(
+            host=host,
+            port=port,
+            timeout=timeout,
+            limits=httpx.Limits(keepalive_expiry=keepalive_seconds)
+        )
+    
+    logger.debug(f"Created Qdrant {transport} client for {host}:{grpc_port if transport == 'grpc' else port}")
+    return client
+
+def _create_local_client(path: str) -> QdrantClient:
+    """Return the process-wide embedded client for a storage path."""
+    key = path if path == ":memory:" else os.path.abspath(path)
+    with _local_clients_lock:
+        client = _local_clients.get(key)
+        if client is None:
+            if path == ":memory:":
+                client = QdrantClient(location=":memory:")
+            else:
+                os.makedirs(key, exist_ok=True)
+                client = QdrantClient(path=key)
+            _local_clients[key] = client
+            logger.debug(f"Created embedded Qdrant client for {key}")
+        return client
+
+def resolve_collection(client: QdrantClient, name: str) -> Optional[str]:
+    """
+    Resolve a collection name or alias to the collection it refers to.
+    
+    Readers query by alias so that rebuilds can swap collections underneath
+    them; this helper lets existence checks see through the alias.
+    
+    Args:
+        client: Qdrant client
+        name: Collection or alias name
+        
+    Returns:
+        Name of the underlying collection, or None if neither exists
+    """
+    if name in [collection.name for collection in client.get_collections().collections]:
+        return name
+    
+    for alias in client.get_aliases().aliases:
+        if alias.alias_name == name:
+            return alias.collection_name
+    return None
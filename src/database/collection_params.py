@@ -0,0 +1,188 @@
+"""
+Collection and search parameters for EduPlan AI.
+This module turns the storage settings in the config (quantization, on-disk
+vectors, HNSW tuning) into Qdrant models, declares the payload indexes that
+filters rely on, and validates filters against them, so every connector
+creates and searches collections the same way.
+"""
+
+import logging
+from typing import Dict, Any, Optional, Iterator
+
+from qdrant_client.http import models
+
+from ..core.config import (
+    QDRANT_QUANTIZATION,
+    QDRANT_QUANTIZATION_ALWAYS_RAM,
+    QDRANT_QUANTIZATION_OVERSAMPLING,
+    QDRANT_QUANTIZATION_RESCORE,
+    QDRANT_ON_DISK,
+    QDRANT_HNSW_M,
+    QDRANT_HNSW_EF_CONSTRUCT,
+    QDRANT_SEARCH_EF
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+
+# Filterable fields of the canonical {"text", "metadata"} payload (every VectorStore backend)
+METADATA_PAYLOAD_INDEXES = {
+    "metadata.chapter": models.PayloadSchemaType.KEYWORD,
+    "metadata.subject": models.PayloadSchemaType.KEYWORD,
+    "metadata.section": models.PayloadSchemaType.KEYWORD,
+    "metadata.type": models.PayloadSchemaType.KEYWORD,
+    "metadata.source": models.PayloadSchemaType.KEYWORD,
+    "metadata.difficulty": models.PayloadSchemaType.KEYWORD,
+    "metadata.chunk": models.PayloadSchemaType.INTEGER,
+    "metadata.index": models.PayloadSchemaType.INTEGER,
+    "metadata.chunk_index": models.PayloadSchemaType.INTEGER
+}
+
+def build_collection_params(vector_size: int, distance: models.Distance = models.Distance.COSINE,
+                            quantization: str = None, on_disk: bool = None,
+                            hnsw_m: int = None, hnsw_ef_construct: int = None) -> Dict[str, Any]:
+    """
+    Build keyword arguments for ``QdrantClient.create_collection``.
+    
+    A 4096-dim float32 vector takes 16 KiB; scalar (int8) quantization keeps
+    a 4 KiB copy in RAM and binary quantization a 512 byte one, while the
+    originals can move to disk and are only read to rescore candidates.
+    
+    Args:
+        vector_size: Dimensionality of the vectors
+        distance: Distance metric
+        quantization: "none", "scalar" or "binary" (default: QDRANT_QUANTIZATION)
+        on_disk: Store original vectors on disk (default: QDRANT_ON_DISK)
+        hnsw_m: HNSW graph degree (default: QDRANT_HNSW_M)
+        hnsw_ef_construct: HNSW build-time beam width (default: QDRANT_HNSW_EF_CONSTRUCT)
+        
+    Returns:
+        Dictionary with vectors_config, hnsw_config and quantization_config
+    """
+    quantization = (quantization or QDRANT_QUANTIZATION).lower()
+    on_disk = QDRANT_ON_DISK if on_disk is None else on_disk
+    
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATION_MODES}")
+    
+    quantization_config = None
+    if quantization == "scalar":
+        quantization_config = models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=QDRANT_QUANTIZATION_ALWAYS_RAM
+            )
+        )
+    elif quantization == "binary":
+        quantization_config = models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=QDRANT_QUANTIZATION_ALWAYS_RAM)
+        )
+    
+    logger.debug(f"Collection params: quantization={quantization}, on_disk={on_disk}, "
+                 f"m={hnsw_m or QDRANT_HNSW_M}, ef_construct={hnsw_ef_construct or QDRANT_HNSW_EF_CONSTRUCT}")
+    
+    return {
+        "vectors_config": models.VectorParams(size=vector_size, distance=distance, on_disk=on_disk),
+        "hnsw_config": models.HnswConfigDiff(
+            m=hnsw_m or QDRANT_HNSW_M,
+            ef_construct=hnsw_ef_construct or QDRANT_HNSW_EF_CONSTRUCT
+        ),
+        "quantization_config": quantization_config
+    }
+
+def build_search_params(ef: Optional[int] = None, exact: bool = False,
+                        quantization: str = None) -> Optional[models.SearchParams]:
+    """
+    Build search parameters for a query.
+    
+    Args:
+        ef: HNSW search beam width; higher trades latency for recall (default: QDRANT_SEARCH_EF)
+        exact: Skip the index and compare against every vector
+        quantization: Quantization mode of the collection (default: QDRANT_QUANTIZATION);
+            quantized collections oversample and rescore with the original vectors
+            
+    Returns:
+        SearchParams, or None when the server defaults apply
+    """
+    ef = QDRANT_SEARCH_EF if ef is None else ef
+    quantization = (quantization or QDRANT_QUANTIZATION).lower()
+    
+    quantization_params = None
+    if quantization != "none":
+        quantization_params = models.QuantizationSearchParams(
+            rescore=QDRANT_QUANTIZATION_RESCORE,
+            oversampling=QDRANT_QUANTIZATION_OVERSAMPLING
+        )
+    
+    if ef is None and not exact and quantization_params is None:
+        return None
+    
+    return models.SearchParams(hnsw_ef=ef, exact=exact, quantization=quantization_params)
+
+def create_payload_indexes(client: Any, collection_name: str,
+                           indexes: Dict[str, models.PayloadSchemaType]) -> None:
+    """
+    Create payload indexes so filtered searches do not scan every payload.
+    
+    Creating an index that already exists is a no-op on the server, so this
+    is safe to call on existing collections.
+    
+    Args:
+        client: Qdrant client
+        collection_name: Collection to index
+        indexes: Mapping of payload key to index type
+    """
+    for field_name, field_schema in indexes.items():
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=field_schema,
+            wait=True
+        )
+    logger.debug(f"Ensured {len(indexes)} payload indexes on '{collection_name}'")
+
+def _filter_keys(query_filter: models.Filter) -> Iterator[str]:
+    """Yield the payload keys used by a filter, including nested filters."""
+    for clause in (query_filter.must, query_filter.should, query_filter.must_not):
+        if clause is None:
+            continue
+        for condition in clause if isinstance(clause, list) else [clause]:
+            if isinstance(condition, models.Filter):
+                yield from _filter_keys(condition)
+            elif isinstance(condition, models.FieldCondition):
+                yield condition.key
+            elif isinstance(condition, models.IsEmptyCondition):
+                yield condition.is_empty.key
+
+def validate_filter(query_filter: Optional[models.Filter],
+                    indexes: Dict[str, models.PayloadSchemaType]) -> Optional[models.Filter]:
+    """
+    Check that a filter only uses indexed payload fields.
+    
+    Backends call this before searching and let the ValueError propagate,
+    so a bad filter is never mistaken for a search with no matches.
+    
+    Args:
+        query_filter: Filter to check (None passes)
+        indexes: Mapping of indexed payload key to index type
+        
+    Returns:
+        The filter, unchanged
+        
+    Raises:
+        ValueError: If the filter uses a field without a payload index
+    """
+    if query_filter is None:
+        return None
+    
+    unindexed = sorted({key for key in _filter_keys(query_filter) if key not in indexes})
+    if unindexed:
+        raise ValueError(f"Filter uses unindexed payload fields {unindexed}; indexed fields are {sorted(indexes)}")
+    return query_filter
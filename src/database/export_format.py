@@ -0,0 +1,224 @@
+"""
+Streaming export format for EduPlan AI collections.
+This module writes and reads collection exports as a directory that can be
+produced and consumed chunk by chunk, so memory stays bounded by the chunk
+size rather than the collection size:
+
+- ``vectors.npy``: one row per point (float32 or float16), memory-mappable
+- ``payloads.jsonl``: one ``{"id", "payload"}`` object per line, in row order
+- ``manifest.json``: collection name, dims, dtype, count and SHA-256 checksums
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Tuple, Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMAT = "eduplan-export"
+EXPORT_FORMAT_VERSION = 1
+EXPORT_DTYPES = ("float32", "float16")
+
+VECTORS_FILE = "vectors.npy"
+PAYLOADS_FILE = "payloads.jsonl"
+MANIFEST_FILE = "manifest.json"
+
+# Read size when checksumming files
+_HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """Hex SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExportWriter:
+    """
+    Append points to an export directory.
+    
+    The ``.npy`` header is written up front and rewritten with the final row
+    count on ``close``; rows are appended as they arrive, so nothing but the
+    current chunk is held in memory.
+    """
+    
+    def __init__(self, export_dir: str, collection_name: str, dim: int, dtype: str = "float32"):
+        """
+        Create the export directory and open its files.
+        
+        Args:
+            export_dir: Directory to write (created if missing)
+            collection_name: Name of the exported collection
+            dim: Vector dimensionality
+            dtype: "float32" or "float16" for stored vectors
+        """
+        if dtype not in EXPORT_DTYPES:
+            raise ValueError(f"Unknown export dtype '{dtype}', expected one of {EXPORT_DTYPES}")
+        
+        self.export_dir = export_dir
+        self.collection_name = collection_name
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        
+        os.makedirs(export_dir, exist_ok=True)
+        self._vectors = open(os.path.join(export_dir, VECTORS_FILE), "wb")
+        self._payloads = open(os.path.join(export_dir, PAYLOADS_FILE), "w", encoding="utf-8")
+        self._header_size = self._write_header()
+    
+    def _write_header(self) -> int:
+        """Write the .npy header for the current row count; returns its size."""
+        self._vectors.seek(0)
+        np.lib.format.write_array_header_1_0(self._vectors, {
+            "descr": np.lib.format.dtype_to_descr(self.dtype),
+            "fortran_order": False,
+            "shape": (self.count, self.dim)
+        })
+        return self._vectors.tell()
+    
+    def write(self, ids: List[Any], vectors: np.ndarray, payloads: List[Dict[str, Any]]) -> None:
+        """
+        Append one chunk of points.
+        
+        Args:
+            ids: Point IDs
+            vectors: Array of shape (len(ids), dim)
+            payloads: Point payloads
+        """
+        vectors = np.asarray(vectors, dtype=self.dtype).reshape(len(ids), self.dim)
+        self._vectors.write(np.ascontiguousarray(vectors).tobytes())
+        for point_id, payload in zip(ids, payloads):
+            self._payloads.write(json.dumps({"id": point_id, "payload": payload}, ensure_ascii=False) + "\n")
+        self.count += len(ids)
+    
+    def close(self) -> Dict[str, Any]:
+        """
+        Finalize the vector header, checksum the files and write the manifest.
+        
+        Returns:
+            The manifest
+        """
+        # The header is padded to 64 bytes, so any realistic count fits in place
+        end = self._vectors.tell()
+        if self._write_header() != self._header_size:
+            raise RuntimeError("Export vector header changed size; cannot finalize in place")
+        self._vectors.seek(end)
+        self._vectors.close()
+        self._payloads.close()
+        
+        manifest = {
+            "format": EXPORT_FORMAT,
+            "version": EXPORT_FORMAT_VERSION,
+            "collection_name": self.collection_name,
+            "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+            "count": self.count,
+            "dim": self.dim,
+            "dtype": self.dtype.name,
+            "distance": "Cosine",
+            "sha256": {
+                name: file_sha256(os.path.join(self.export_dir, name))
+                for name in (VECTORS_FILE, PAYLOADS_FILE)
+            }
+        }
+        with open(os.path.join(self.export_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+    
+    def __enter__(self) -> "ExportWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._vectors.close()
+            self._payloads.close()
+
+
+def read_manifest(export_dir: str) -> Dict[str, Any]:
+    """
+    Load and check an export manifest.
+    
+    Args:
+        export_dir: Export directory
+    
+    Returns:
+        The manifest
+    
+    Raises:
+        ValueError: If the directory is not a supported export
+    """
+    with open(os.path.join(export_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != EXPORT_FORMAT or manifest.get("version") != EXPORT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported export format in {export_dir}: "
+                         f"{manifest.get('format')} v{manifest.get('version')}")
+    return manifest
+
+
+def verify_export(export_dir: str, manifest: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Check file checksums and the vector shape against the manifest.
+    
+    Args:
+        export_dir: Export directory
+        manifest: Already loaded manifest (default: read it)
+    
+    Returns:
+        True if the export is intact
+    """
+    manifest = manifest or read_manifest(export_dir)
+    for name, expected in manifest["sha256"].items():
+        if file_sha256(os.path.join(export_dir, name)) != expected:
+            logger.error(f"Checksum mismatch for {name} in {export_dir}")
+            return False
+    
+    vectors = np.load(os.path.join(export_dir, VECTORS_FILE), mmap_mode="r")
+    if vectors.shape != (manifest["count"], manifest["dim"]):
+        logger.error(f"Vector shape {vectors.shape} does not match manifest "
+                     f"({manifest['count']}, {manifest['dim']})")
+        return False
+    return True
+
+
+def iter_export(export_dir: str, chunk_size: int = 1000) -> Iterator[Tuple[List[Any], np.ndarray, List[Dict[str, Any]]]]:
+    """
+    Read an export in chunks.
+    
+    Vectors are memory-mapped and converted to float32 one chunk at a time;
+    payload lines are read alongside them.
+    
+    Args:
+        export_dir: Export directory
+        chunk_size: Points per chunk
+    
+    Yields:
+        Tuples of (ids, float32 vectors, payloads)
+    """
+    vectors = np.load(os.path.join(export_dir, VECTORS_FILE), mmap_mode="r")
+    with open(os.path.join(export_dir, PAYLOADS_FILE), "r", encoding="utf-8") as f:
+        row = 0
+        ids, payloads = [], []
+        for line in f:
+            point = json.loads(line)
+            ids.append(point["id"])
+            payloads.append(point["payload"])
+            if len(ids) == chunk_size:
+                yield ids, np.asarray(vectors[row:row+len(ids)], dtype=np.float32), payloads
+                row += len(ids)
+                ids, payloads = [], []
+        if ids:
+            yield ids, np.asarray(vectors[row:row+len(ids)], dtype=np.float32), payloads
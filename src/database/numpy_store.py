@@ -0,0 +1,518 @@
+"""
+In-process NumPy vector store for EduPlan AI.
+This module provides a brute-force vector index with the same interface as
+QdrantConnector, for small deployments and tests that should not need a
+running Qdrant server.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import List, Dict, Any, Optional, Union
+
+import numpy as np
+from qdrant_client.http import models
+
+from .collection_params import validate_filter, METADATA_PAYLOAD_INDEXES
+from ..core.config import NUMPY_STORE_DIR
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Rows allocated up front; capacity doubles when full
+_INITIAL_CAPACITY = 1024
+
+# Append-only log of upserts and deletes, replayed on load
+_LOG_FILENAME = "points.jsonl"
+
+
+class NumpyVectorStore:
+    """
+    Brute-force cosine index over a contiguous float32 matrix.
+    
+    Vectors are L2-normalized on insert so a search is one matrix-vector
+    product followed by ``argpartition`` for the top k. Rows stay dense:
+    deleting a point moves the last row into its slot. With a ``path`` the
+    matrix is memory-mapped from ``<path>/<collection>/vectors.npy`` and
+    upserts and deletes are appended to ``points.jsonl`` next to it, so a
+    write costs the size of the batch rather than the collection. The log is
+    replayed on load and compacted once it grows to twice the live points;
+    without a ``path`` the store lives only in memory.
+    
+    Filters use the same dict/Filter syntax as QdrantConnector and are
+    limited to the indexed payload fields. Each (field, value) condition is
+    turned into a boolean row mask once and cached until the data changes.
+    """
+    
+    def __init__(self, path: Optional[str] = NUMPY_STORE_DIR, collection_name: str = "eduplan",
+                 vector_size: int = 4096, payload_indexes: Dict[str, models.PayloadSchemaType] = None):
+        """
+        Initialize the store.
+        
+        Args:
+            path: Directory holding one subdirectory per collection (None: in memory only)
+            collection_name: Name of the collection to use
+            vector_size: Dimensionality of the vectors to store
+            payload_indexes: Payload fields allowed in filters (default: METADATA_PAYLOAD_INDEXES)
+        """
+        self.path = path
+        self.collection_name = collection_name
+        self.vector_size = vector_size
+        self.payload_indexes = payload_indexes or METADATA_PAYLOAD_INDEXES
+        self._lock = threading.RLock()
+        self._load()
+    
+    @property
+    def _collection_dir(self) -> Optional[str]:
+        return os.path.join(self.path, self.collection_name) if self.path else None
+    
+    def _load(self) -> None:
+        """Open the collection from disk, or start empty."""
+        self._ids = []
+        self._payloads = []
+        self._rows = {}
+        self._mask_cache = {}
+        self._vectors = np.zeros((0, self.vector_size), dtype=np.float32)
+        self._log_entries = 0
+        self._exists = False
+        
+        if not self._collection_dir or not os.path.exists(os.path.join(self._collection_dir, _LOG_FILENAME)):
+            return
+        
+        with open(os.path.join(self._collection_dir, _LOG_FILENAME), 'r', encoding='utf-8') as f:
+            self.vector_size = json.loads(f.readline())["vector_size"]
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if "delete" in entry:
+                    self._remove_row(entry["delete"])
+                else:
+                    self._upsert_row(entry["id"], entry["payload"])
+                self._log_entries += 1
+        self._vectors = np.load(os.path.join(self._collection_dir, "vectors.npy"), mmap_mode="r+")
+        self._exists = True
+        logger.debug(f"Loaded {len(self._ids)} points from {self._collection_dir}")
+    
+    def _upsert_row(self, point_id: Union[str, int], payload: Dict[str, Any]) -> int:
+        """Record a point's payload, appending a row for a new ID, and return its row."""
+        row = self._rows.get(point_id)
+        if row is None:
+            row = len(self._ids)
+            self._rows[point_id] = row
+            self._ids.append(point_id)
+            self._payloads.append(payload)
+        else:
+            self._payloads[row] = payload
+        return row
+    
+    def _remove_row(self, point_id: Union[str, int]) -> Optional[int]:
+        """
+        Drop a point's ID and payload, moving the last point into its row.
+        
+        Returns:
+            The freed row (the caller moves the matching vector), or None if the ID is unknown
+        """
+        row = self._rows.pop(point_id, None)
+        if row is None:
+            return None
+        
+        # Keep rows dense: move the last point into the freed slot
+        last = len(self._ids) - 1
+        if row != last:
+            self._ids[row] = self._ids[last]
+            self._payloads[row] = self._payloads[last]
+            self._rows[self._ids[row]] = row
+        self._ids.pop()
+        self._payloads.pop()
+        return row
+    
+    def _append_log(self, entries: List[Dict[str, Any]]) -> None:
+        """Flush vectors, then append entries to the log (compacting it when it has grown)."""
+        if not self._collection_dir:
+            return
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+        
+        self._log_entries += len(entries)
+        if self._log_entries > 2 * len(self._ids) + _INITIAL_CAPACITY:
+            self._write_log()
+            return
+        with open(os.path.join(self._collection_dir, _LOG_FILENAME), 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in entries)
+    
+    def _write_log(self) -> None:
+        """Rewrite the log as one upsert per live point."""
+        if not self._collection_dir:
+            return
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+        
+        log_path = os.path.join(self._collection_dir, _LOG_FILENAME)
+        with open(log_path + ".tmp", 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"vector_size": self.vector_size}) + "\n")
+            f.writelines(
+                json.dumps({"id": point_id, "payload": payload}) + "\n"
+                for point_id, payload in zip(self._ids, self._payloads)
+            )
+        os.replace(log_path + ".tmp", log_path)
+        self._log_entries = len(self._ids)
+    
+    def _allocate(self, capacity: int) -> np.ndarray:
+        """Allocate a (capacity, vector_size) matrix, memory-mapped when persistent."""
+        if not self._collection_dir:
+            return np.zeros((capacity, self.vector_size), dtype=np.float32)
+        return np.lib.format.open_memmap(
+            os.path.join(self._collection_dir, "vectors.npy"),
+            mode="w+",
+            dtype=np.float32,
+            shape=(capacity, self.vector_size)
+        )
+    
+    def _reserve(self, count: int) -> None:
+        """Make room for ``count`` rows, doubling capacity as needed."""
+        if count <= len(self._vectors):
+            return
+        capacity = max(_INITIAL_CAPACITY, len(self._vectors))
+        while capacity < count:
+            capacity *= 2
+        
+        # Copy into RAM and release the old mapping before recreating the file
+        existing = np.array(self._vectors[:len(self._ids)])
+        self._vectors = None
+        self._vectors = self._allocate(capacity)
+        self._vectors[:len(existing)] = existing
+    
+    def recreate_collection(self) -> bool:
+        """
+        Delete collection if it exists and create a new one.
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        with self._lock:
+            if self._collection_dir:
+                os.makedirs(self._collection_dir, exist_ok=True)
+            self._ids = []
+            self._payloads = []
+            self._rows = {}
+            self._mask_cache = {}
+            self._vectors = self._allocate(_INITIAL_CAPACITY)
+            self._exists = True
+            self._write_log()
+        print(f"✅ Created new collection: {self.collection_name}")
+        return True
+    
+    def ensure_collection(self) -> bool:
+        """
+        Create the collection if it does not exist, keeping existing points.
+        
+        Returns:
+            True if the collection exists or was created
+        """
+        return True if self._exists else self.recreate_collection()
+    
+    def get_collection_info(self) -> Dict[str, Any]:
+        """
+        Get information about the collection.
+        
+        Returns:
+            Dictionary with point count, vector size and storage location
+        """
+        return {
+            "vectors_count": len(self._ids),
+            "points_count": len(self._ids),
+            "vector_size": self.vector_size,
+            "path": self._collection_dir
+        }
+    
+    def get_vector_size(self) -> Optional[int]:
+        """Get the dimensionality of the stored vectors (None if the collection does not exist)."""
+        return self.vector_size if self._exists else None
+    
+    def count_documents(self) -> int:
+        """Count the points in the collection."""
+        return len(self._ids)
+    
+    def insert_documents(self, documents: List[Dict], embeddings: List[List[float]],
+                         batch_size: Optional[int] = None, **kwargs) -> bool:
+        """
+        Insert documents with embeddings, replacing points with the same ID.
+        
+        Args:
+            documents: List of document dictionaries with 'id', 'text', and 'metadata'
+            embeddings: Embedding vectors (list of lists or 2-D numpy array, must match documents length)
+            batch_size: Accepted for QdrantConnector compatibility (unused)
+        
+        Returns:
+            True if insertion was successful
+        """
+        if len(documents) != len(embeddings):
+            logger.error(f"Document count ({len(documents)}) does not match embeddings count ({len(embeddings)})")
+            return False
+        if not len(documents):
+            return True
+        
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.vector_size:
+            logger.error(f"Expected vectors of size {self.vector_size}, got shape {vectors.shape}")
+            return False
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        
+        with self._lock:
+            self.ensure_collection()
+            
+            new_ids = {doc.get("id") for doc in documents if doc.get("id") not in self._rows}
+            self._reserve(len(self._ids) + len(new_ids))
+            
+            rows = []
+            entries = []
+            for doc in documents:
+                payload = {"text": doc.get("text", ""), "metadata": doc.get("metadata", {})}
+                rows.append(self._upsert_row(doc.get("id"), payload))
+                entries.append({"id": doc.get("id"), "payload": payload})
+            
+            self._vectors[rows] = vectors
+            self._mask_cache.clear()
+            self._append_log(entries)
+        
+        logger.info(f"Inserted {len(documents)} documents into '{self.collection_name}'")
+        return True
+    
+    def _field_values(self, key: str) -> List[Any]:
+        """Read one (possibly nested) payload field for every row."""
+        values = []
+        for payload in self._payloads:
+            value = payload
+            for part in key.split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            values.append(value)
+        return values
+    
+    def _condition_mask(self, condition: models.FieldCondition) -> np.ndarray:
+        """Boolean row mask for one field condition, cached per (field, match)."""
+        cache_key = (condition.key, repr(condition.match), repr(condition.range))
+        mask = self._mask_cache.get(cache_key)
+        if mask is not None:
+            return mask
+        
+        values = self._field_values(condition.key)
+        if condition.match is not None and hasattr(condition.match, "value"):
+            mask = np.array([value == condition.match.value for value in values], dtype=bool)
+        elif condition.match is not None and hasattr(condition.match, "any"):
+            allowed = set(condition.match.any)
+            mask = np.array([value in allowed for value in values], dtype=bool)
+        elif condition.range is not None:
+            bounds = condition.range
+            mask = np.array([
+                isinstance(value, (int, float))
+                and (bounds.gt is None or value > bounds.gt)
+                and (bounds.gte is None or value >= bounds.gte)
+                and (bounds.lt is None or value < bounds.lt)
+                and (bounds.lte is None or value <= bounds.lte)
+                for value in values
+            ], dtype=bool)
+        else:
+            raise ValueError(f"Unsupported condition on '{condition.key}' for the NumPy store")
+        
+        self._mask_cache[cache_key] = mask
+        return mask
+    
+    def _empty_mask(self, key: str) -> np.ndarray:
+        """Boolean row mask of points where a field is missing, null or an empty list, cached per field."""
+        cache_key = (key, "is_empty")
+        mask = self._mask_cache.get(cache_key)
+        if mask is None:
+            mask = np.array([value is None or value == [] for value in self._field_values(key)], dtype=bool)
+            self._mask_cache[cache_key] = mask
+        return mask
+    
+    def _filter_mask(self, query_filter: models.Filter) -> np.ndarray:
+        """Combine must/should/must_not clauses into one row mask."""
+        def clause_masks(clause):
+            if clause is None:
+                return []
+            masks = []
+            for condition in clause if isinstance(clause, list) else [clause]:
+                if isinstance(condition, models.Filter):
+                    masks.append(self._filter_mask(condition))
+                elif isinstance(condition, models.FieldCondition):
+                    masks.append(self._condition_mask(condition))
+                elif isinstance(condition, models.IsEmptyCondition):
+                    masks.append(self._empty_mask(condition.is_empty.key))
+                else:
+                    raise ValueError(f"Unsupported filter condition {type(condition).__name__} for the NumPy store")
+            return masks
+        
+        mask = np.ones(len(self._ids), dtype=bool)
+        for condition_mask in clause_masks(query_filter.must):
+            mask &= condition_mask
+        should = clause_masks(query_filter.should)
+        if should:
+            mask &= np.logical_or.reduce(should)
+        for condition_mask in clause_masks(query_filter.must_not):
+            mask &= ~condition_mask
+        return mask
+    
+    def _to_filter(self, filter: Optional[Union[Dict[str, Any], models.Filter]]) -> Optional[models.Filter]:
+        """Convert a dict filter into a Filter model and check it only uses indexed fields."""
+        if isinstance(filter, dict):
+            filter = models.Filter(**filter)
+        return validate_filter(filter, self.payload_indexes)
+    
+    def _top_k(self, scores: np.ndarray, limit: int, mask: Optional[np.ndarray]) -> List[models.ScoredPoint]:
+        """Select the best ``limit`` rows from a score vector."""
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            scores = scores[candidates]
+        else:
+            candidates = None
+        
+        limit = min(limit, len(scores))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        rows = candidates[top] if candidates is not None else top
+        
+        return [
+            models.ScoredPoint(id=self._ids[row], version=0, score=float(score), payload=self._payloads[row])
+            for row, score in zip(rows, scores[top])
+        ]
+    
+    def search_documents(self, query_vector: List[float], limit: int = 5,
+                         filter: Optional[Dict[str, Any]] = None,
+                         ef: Optional[int] = None, exact: bool = False) -> List[models.ScoredPoint]:
+        """
+        Search for similar documents in the collection.
+        
+        Args:
+            query_vector: Query embedding vector
+            limit: Maximum number of results to return
+            filter: Optional filter to apply to the search
+            ef: Accepted for QdrantConnector compatibility (search is always exact)
+            exact: Accepted for QdrantConnector compatibility (search is always exact)
+        
+        Returns:
+            List of matching documents
+        
+        Raises:
+            ValueError: If the filter uses a field without a payload index
+        """
+        return self.search_batch([query_vector], limit, [filter])[0]
+    
+    def search_batch(self, query_vectors: List[List[float]], limit: Union[int, List[int]] = 5,
+                     filters: Optional[List[Optional[Dict[str, Any]]]] = None,
+                     ef: Optional[int] = None, exact: bool = False) -> List[List[models.ScoredPoint]]:
+        """
+        Search for many query vectors with one matrix product.
+        
+        Args:
+            query_vectors: Query embedding vectors (list of lists or 2-D numpy array)
+            limit: Maximum results per query, either one value or one per query
+            filters: Optional filter per query (None entries mean unfiltered)
+            ef: Accepted for QdrantConnector compatibility (search is always exact)
+            exact: Accepted for QdrantConnector compatibility (search is always exact)
+        
+        Returns:
+            One list of matching documents per query, in input order
+        
+        Raises:
+            ValueError: If limit or filters do not match query_vectors in length,
+                or a filter uses a field without a payload index
+        """
+        if isinstance(limit, int):
+            limit = [limit] * len(query_vectors)
+        if filters is None:
+            filters = [None] * len(query_vectors)
+        
+        if len(limit) != len(query_vectors) or len(filters) != len(query_vectors):
+            raise ValueError("search_batch needs one limit and one filter per query vector")
+        if not len(query_vectors):
+            return []
+        
+        filters = [self._to_filter(query_filter) for query_filter in filters]
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        
+        with self._lock:
+            scores = queries @ self._vectors[:len(self._ids)].T
+            results = []
+            for query_scores, query_filter, query_limit in zip(scores, filters, limit):
+                mask = self._filter_mask(query_filter) if query_filter is not None else None
+                results.append(self._top_k(query_scores, query_limit, mask))
+        return results
+    
+    def delete_documents(self, document_ids: List[Union[str, int]], batch_size: int = 1000) -> bool:
+        """
+        Delete many documents from the collection.
+        
+        Args:
+            document_ids: IDs of the documents to delete
+            batch_size: Accepted for QdrantConnector compatibility (unused)
+        
+        Returns:
+            True if successful
+        """
+        with self._lock:
+            entries = []
+            for document_id in document_ids:
+                last = len(self._ids) - 1
+                row = self._remove_row(document_id)
+                if row is None:
+                    continue
+                if row != last:
+                    self._vectors[row] = self._vectors[last]
+                entries.append({"delete": document_id})
+            
+            self._mask_cache.clear()
+            if entries:
+                self._append_log(entries)
+        return True
+    
+    def delete_document(self, document_id: Union[str, int]) -> bool:
+        """
+        Delete a document from the collection.
+        
+        Args:
+            document_id: ID of the document to delete
+        
+        Returns:
+            True if successful
+        """
+        return self.delete_documents([document_id])
+    
+    def get_document(self, document_id: Union[str, int]) -> Optional[models.Record]:
+        """
+        Get a document from the collection by ID.
+        
+        Args:
+            document_id: ID of the document to get
+        
+        Returns:
+            Document if found, None otherwise
+        """
+        with self._lock:
+            row = self._rows.get(document_id)
+            if row is None:
+                return None
+            return models.Record(id=document_id, payload=self._payloads[row])
+    
+    def get_payload_values(self, key: str, batch_size: int = 1000) -> Optional[Dict[Union[str, int], Any]]:
+        """
+        Read one payload field for every point.
+        
+        Args:
+            key: Payload key, using dots for nested fields (e.g. "metadata.content_hash")
+            batch_size: Accepted for QdrantConnector compatibility (unused)
+        
+        Returns:
+            Mapping of point ID to the field value (None where unset)
+        """
+        with self._lock:
+            return dict(zip(self._ids, self._field_values(key)))
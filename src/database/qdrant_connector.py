@@ -3,13 +3,25 @@ Qdrant vector database connector for EduPlan AI.
 This module provides a connector for interacting with the Qdrant vector database.
 """
 
+import copy
+import json
 import logging
-import httpx
-from typing import List, Dict, Any, Optional, Union
-from qdrant_client import QdrantClient
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Optional, Union, Iterator, Callable
 from qdrant_client.http import models
 from qdrant_client.http.exceptions import UnexpectedResponse
 
+from .client import create_client, resolve_collection
+from .collection_params import (
+    build_collection_params,
+    build_search_params,
+    create_payload_indexes,
+    validate_filter,
+    METADATA_PAYLOAD_INDEXES
+)
+from ..core.config import QDRANT_UPSERT_MAX_BATCH_BYTES, QDRANT_UPSERT_PARALLEL
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -17,29 +29,65 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# verify_collection: points read back, hits searched, and how close to 1.0 an
+# identical vector's cosine score must be
+VERIFY_SAMPLE_POINTS = 8
+VERIFY_SEARCH_LIMIT = 10
+VERIFY_SCORE_TOLERANCE = 1e-3
+
 class QdrantConnector:
     """Connector for interacting with the Qdrant vector database."""
     
     def __init__(self, host: str = "localhost", port: int = 6333, 
-                 collection_name: str = "eduplan", vector_size: int = 4096):
+                 collection_name: str = "eduplan", vector_size: int = 4096,
+                 transport: str = None, grpc_port: int = None, timeout: int = None,
+                 quantization: str = None, on_disk: bool = None,
+                 hnsw_m: int = None, hnsw_ef_construct: int = None,
+                 payload_indexes: Dict[str, models.PayloadSchemaType] = None,
+                 path: str = None):
         """
         Initialize the Qdrant connector.
         
         Args:
             host: Qdrant server hostname
-            port: Qdrant server port
+            port: Qdrant server REST port
             collection_name: Name of the collection to use
             vector_size: Dimensionality of the vectors to store
+            transport: "grpc" or "rest" (default: QDRANT_TRANSPORT)
+            grpc_port: Qdrant server gRPC port (default: QDRANT_GRPC_PORT)
+            timeout: Request timeout in seconds (default: QDRANT_TIMEOUT)
+            quantization: "none", "scalar" or "binary" for new collections (default: QDRANT_QUANTIZATION)
+            on_disk: Store original vectors on disk in new collections (default: QDRANT_ON_DISK)
+            hnsw_m: HNSW graph degree for new collections (default: QDRANT_HNSW_M)
+            hnsw_ef_construct: HNSW build beam width for new collections (default: QDRANT_HNSW_EF_CONSTRUCT)
+            payload_indexes: Payload fields to index and allow in filters (default: METADATA_PAYLOAD_INDEXES)
+            path: Run Qdrant embedded on this directory (or ":memory:") instead of connecting to a server
         """
         self.host = host
         self.port = port
         self.collection_name = collection_name
         self.vector_size = vector_size
+        self.quantization = quantization
+        self.payload_indexes = payload_indexes or METADATA_PAYLOAD_INDEXES
+        self.collection_params = build_collection_params(
+            vector_size,
+            quantization=quantization,
+            on_disk=on_disk,
+            hnsw_m=hnsw_m,
+            hnsw_ef_construct=hnsw_ef_construct
+        )
         
         # Initialize client
         try:
-            self.client = QdrantClient(host=host, port=port)
-            logger.debug(f"Connected to Qdrant at {host}:{port}")
+            self.client = create_client(
+                host=host,
+                port=port,
+                grpc_port=grpc_port,
+                transport=transport,
+                timeout=timeout,
+                path=path
+            )
+            logger.debug(f"Connected to Qdrant at {path or f'{host}:{port}'}")
         except Exception as e:
             logger.error(f"Error connecting to Qdrant: {e}")
             raise
@@ -52,6 +100,10 @@ class QdrantConnector:
             True if successful, False otherwise
         """
         try:
+            if self.get_alias_target() is not None:
+                logger.error(f"'{self.collection_name}' is an alias; use blue_green_rebuild to rebuild it")
+                return False
+                
             # Check if collection exists
             collections = self.client.get_collections().collections
             collection_names = [collection.name for collection in collections]
@@ -64,11 +116,9 @@ class QdrantConnector:
             # Create new collection
             self.client.create_collection(
                 collection_name=self.collection_name,
-                vectors_config=models.VectorParams(
-                    size=self.vector_size,
-                    distance=models.Distance.COSINE
-                )
+                **self.collection_params
             )
+            create_payload_indexes(self.client, self.collection_name, self.payload_indexes)
             print(f"✅ Created new collection: {self.collection_name}")
             return True
             
@@ -76,6 +126,33 @@ class QdrantConnector:
             logger.error(f"Error recreating collection: {e}")
             return False
             
+    def ensure_collection(self) -> bool:
+        """
+        Create the collection if it does not exist, keeping existing points.
+        
+        Payload indexes are (re)ensured either way, so collections created
+        before an index was added pick it up on the next sync.
+        
+        Returns:
+            True if the collection exists or was created, False otherwise
+        """
+        try:
+            target = resolve_collection(self.client, self.collection_name)
+            if target is None:
+                target = self.collection_name
+                self.client.create_collection(
+                    collection_name=target,
+                    **self.collection_params
+                )
+                print(f"✅ Created new collection: {self.collection_name}")
+            
+            create_payload_indexes(self.client, target, self.payload_indexes)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error ensuring collection: {e}")
+            return False
+            
     def get_collection_info(self) -> Dict[str, Any]:
         """
         Get information about the collection.
@@ -84,19 +161,266 @@ class QdrantConnector:
             Dictionary containing collection information
         """
         try:
-            return self.client.get_collection(collection_name=self.collection_name)
+            collection_name = resolve_collection(self.client, self.collection_name) or self.collection_name
+            return self.client.get_collection(collection_name=collection_name)
         except Exception as e:
             logger.error(f"Error getting collection info: {e}")
             return {}
             
-    def insert_documents(self, documents: List[Dict], embeddings: List[List[float]], batch_size: int = 2) -> bool:
+    def get_vector_size(self) -> Optional[int]:
+        """
+        Get the dimensionality of the vectors stored in the collection.
+        
+        Returns:
+            Stored vector size, or None if the collection cannot be read
+        """
+        info = self.get_collection_info()
+        return info.config.params.vectors.size if info else None
+            
+    def count_documents(self) -> int:
+        """
+        Count the points in the collection exactly.
+        
+        Returns:
+            Number of points, or -1 on error
+        """
+        try:
+            return self.client.count(collection_name=self.collection_name, exact=True).count
+        except Exception as e:
+            logger.error(f"Error counting documents: {e}")
+            return -1
+            
+    def for_collection(self, collection_name: str) -> "QdrantConnector":
+        """
+        Return a connector for another collection sharing this client.
+        
+        Args:
+            collection_name: Collection the new connector should use
+            
+        Returns:
+            QdrantConnector bound to ``collection_name``
+        """
+        connector = copy.copy(self)
+        connector.collection_name = collection_name
+        return connector
+        
+    def get_alias_target(self) -> Optional[str]:
+        """
+        Get the collection the connector's name points to, if it is an alias.
+        
+        Returns:
+            Target collection name, or None if the name is not an alias
+        """
+        for alias in self.client.get_aliases().aliases:
+            if alias.alias_name == self.collection_name:
+                return alias.collection_name
+        return None
+        
+    def swap_alias(self, target_collection: str) -> bool:
+        """
+        Atomically point the connector's name (as an alias) at another collection.
+        
+        The delete and create operations are applied in one request, so
+        readers see either the old or the new collection and never a gap.
+        
+        Args:
+            target_collection: Collection the alias should point to
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            operations = []
+            if self.get_alias_target() is not None:
+                operations.append(models.DeleteAliasOperation(
+                    delete_alias=models.DeleteAlias(alias_name=self.collection_name)
+                ))
+            operations.append(models.CreateAliasOperation(
+                create_alias=models.CreateAlias(
+                    collection_name=target_collection,
+                    alias_name=self.collection_name
+                )
+            ))
+            self.client.update_collection_aliases(change_aliases_operations=operations)
+            print(f"🔀 Alias '{self.collection_name}' now points to '{target_collection}'")
+            return True
+        except Exception as e:
+            logger.error(f"Error swapping alias: {e}")
+            return False
+            
+    def verify_collection(self, expected_count: int) -> bool:
+        """
+        Check that the collection holds the expected points and answers queries.
+        
+        A stored vector is read back and searched for exactly (full vectors,
+        no HNSW, no quantization). It passes if it comes back among the top
+        hits or the best hit is an identical vector (score ~1.0), so
+        duplicate chunks and near-ties do not fail a good collection.
+        
+        Args:
+            expected_count: Number of points the collection should contain
+            
+        Returns:
+            True if the collection passed both checks
+        """
+        count = self.count_documents()
+        if count != expected_count:
+            logger.error(f"Collection '{self.collection_name}' has {count} points, expected {expected_count}")
+            return False
+        if count == 0:
+            return True
+            
+        try:
+            points, _ = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=VERIFY_SAMPLE_POINTS,
+                with_payload=False,
+                with_vectors=True
+            )
+            # Zero vectors (failed-embedding fallbacks) have no direction to search for
+            samples = [point for point in points if any(point.vector)]
+            if not samples:
+                logger.warning(f"Sampled points in '{self.collection_name}' all have zero vectors; "
+                               "skipping the sample query")
+                return True
+            sample = samples[0]
+            results = self.client.search(
+                collection_name=self.collection_name,
+                query_vector=sample.vector,
+                limit=VERIFY_SEARCH_LIMIT,
+                search_params=models.SearchParams(
+                    exact=True,
+                    quantization=models.QuantizationSearchParams(ignore=True)
+                )
+            )
+        except Exception as e:
+            logger.error(f"Error running sample query on '{self.collection_name}': {e}")
+            return False
+            
+        if not results or (sample.id not in [point.id for point in results]
+                           and results[0].score < 1.0 - VERIFY_SCORE_TOLERANCE):
+            logger.error(f"Sample query on '{self.collection_name}' did not return the sampled point")
+            return False
+        return True
+        
+    def blue_green_rebuild(self, populate: Callable[["QdrantConnector"], Optional[int]],
+                           keep_old: bool = False) -> bool:
+        """
+        Rebuild the collection behind an alias without interrupting searches.
+        
+        The connector's collection name is used as the alias. Data is loaded
+        into a new versioned collection, which is verified before the alias
+        is switched over to it; readers keep querying the old collection
+        until the swap. A pre-existing plain collection with the alias name
+        has to be dropped right before the first swap, so only that first
+        migration has a brief gap.
+        
+        Args:
+            populate: Callback that fills the given staging connector and
+                returns the number of points it stored (None on failure)
+            keep_old: Keep the previous collection instead of deleting it
+            
+        Returns:
+            True if the alias now points to the rebuilt collection
+        """
+        alias = self.collection_name
+        staging = self.for_collection(f"{alias}_{time.strftime('%Y%m%d_%H%M%S')}")
+        
+        try:
+            old_collection = self.get_alias_target()
+            
+            if not staging.recreate_collection():
+                return False
+                
+            print(f"🏗️ Building '{staging.collection_name}' for alias '{alias}'")
+            expected_count = populate(staging)
+            if expected_count is None or not staging.verify_collection(expected_count):
+                raise RuntimeError(f"Staging collection '{staging.collection_name}' failed verification")
+                
+            if old_collection is None and resolve_collection(self.client, alias) == alias:
+                # Migration from a plain collection: aliases cannot shadow collection names
+                logger.warning(f"Dropping plain collection '{alias}' to replace it with an alias")
+                self.client.delete_collection(collection_name=alias)
+                
+            if not self.swap_alias(staging.collection_name):
+                raise RuntimeError(f"Could not point alias '{alias}' at '{staging.collection_name}'")
+                
+        except Exception as e:
+            logger.error(f"Blue/green rebuild of '{alias}' failed, keeping the current collection: {e}")
+            try:
+                self.client.delete_collection(collection_name=staging.collection_name)
+            except Exception as cleanup_error:
+                logger.error(f"Error deleting staging collection: {cleanup_error}")
+            return False
+            
+        if old_collection and not keep_old:
+            try:
+                self.client.delete_collection(collection_name=old_collection)
+                print(f"🗑️ Deleted previous collection: {old_collection}")
+            except Exception as e:
+                logger.error(f"Error deleting previous collection '{old_collection}': {e}")
+        return True
+        
+    def _build_point(self, doc: Dict, emb: Any) -> models.PointStruct:
+        """Build a Qdrant point from a document and its embedding."""
+        # Ensure ID is a string or integer (not a list)
+        doc_id = doc.get("id")
+        if isinstance(doc_id, list):
+            # If ID is a list, convert to string
+            doc_id = str(doc_id)
+        
+        return models.PointStruct(
+            id=doc_id,
+            vector=emb.tolist() if hasattr(emb, "tolist") else list(emb),
+            payload={
+                "text": doc.get("text", ""),
+                "metadata": doc.get("metadata", {})
+            }
+        )
+        
+    def _iter_point_batches(self, documents: List[Dict], embeddings: Any, batch_size: Optional[int],
+                            max_batch_bytes: int) -> Iterator[List[models.PointStruct]]:
+        """
+        Yield point batches bounded by count (if given) and estimated request size.
+        
+        Points are built lazily, so only the batches in flight are held as
+        Python objects.
+        """
+        batch = []
+        batch_bytes = 0
+        for doc, emb in zip(documents, embeddings):
+            # float32 vector plus serialized payload; close enough for sizing requests
+            point_bytes = len(emb) * 4 + len(json.dumps(doc.get("metadata", {}), default=str)) + len(doc.get("text", ""))
+            full_by_count = batch_size is not None and len(batch) >= batch_size
+            full_by_bytes = batch_bytes + point_bytes > max_batch_bytes
+            if batch and (full_by_count or full_by_bytes):
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append(self._build_point(doc, emb))
+            batch_bytes += point_bytes
+        
+        if batch:
+            yield batch
+            
+    def insert_documents(self, documents: List[Dict], embeddings: List[List[float]], batch_size: Optional[int] = None,
+                         max_batch_bytes: int = QDRANT_UPSERT_MAX_BATCH_BYTES,
+                         parallel: int = QDRANT_UPSERT_PARALLEL) -> bool:
         """
         Insert documents with embeddings into Qdrant.
         
+        Batches are sized by estimated payload bytes and uploaded with up to
+        ``parallel`` requests in flight using ``wait=False``. The final batch
+        is sent with ``wait=True`` once all others are acknowledged; Qdrant
+        applies updates in order, so its completion is a consistency barrier
+        for the whole insert.
+        
         Args:
             documents: List of document dictionaries with 'id', 'text', and 'metadata'
-            embeddings: List of embedding vectors (must match documents length)
-            batch_size: Number of documents to insert at once
+            embeddings: Embedding vectors (list of lists or 2-D numpy array, must match documents length)
+            batch_size: Optional cap on documents per request
+            max_batch_bytes: Approximate maximum request size in bytes
+            parallel: Number of upsert requests in flight
             
         Returns:
             True if insertion was successful
@@ -107,38 +431,44 @@ class QdrantConnector:
                 return False
                 
             logger.info(f"Inserting {len(documents)} documents into collection '{self.collection_name}'")
+            start_time = time.time()
             
-            # Process in batches
-            for i in range(0, len(documents), batch_size):
-                batch_docs = documents[i:i+batch_size]
-                batch_embeddings = embeddings[i:i+batch_size]
-                
-                # Prepare points for insertion
-                points = []
-                for doc, emb in zip(batch_docs, batch_embeddings):
-                    # Ensure ID is a string or integer (not a list)
-                    doc_id = doc.get("id")
-                    if isinstance(doc_id, list):
-                        # If ID is a list, convert to string
-                        doc_id = str(doc_id)
+            batches = self._iter_point_batches(documents, embeddings, batch_size, max_batch_bytes)
+            last_batch = next(batches, None)
+            if last_batch is None:
+                return True
+            
+            with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+                in_flight = set()
+                # Always hold one batch back to send as the barrier
+                for batch in batches:
+                    in_flight.add(executor.submit(
+                        self.client.upsert,
+                        collection_name=self.collection_name,
+                        points=last_batch,
+                        wait=False
+                    ))
+                    last_batch = batch
                     
-                    point = {
-                        "id": doc_id,
-                        "vector": emb,
-                        "payload": {
-                            "text": doc.get("text", ""),
-                            "metadata": doc.get("metadata", {})
-                        }
-                    }
-                    points.append(point)
-                
-                # Insert batch
-                self.client.upsert(
-                    collection_name=self.collection_name,
-                    points=points
-                )
+                    # Bound memory: never build more than `parallel` batches ahead
+                    if len(in_flight) >= parallel:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
                 
-            logger.info(f"Successfully inserted {len(documents)} documents")
+                for future in in_flight:
+                    future.result()
+            
+            # Consistency barrier: returns once every earlier update is applied
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=last_batch,
+                wait=True
+            )
+            
+            elapsed = time.time() - start_time
+            rate = len(documents) / elapsed if elapsed > 0 else float("inf")
+            logger.info(f"Successfully inserted {len(documents)} documents in {elapsed:.2f}s ({rate:.1f} points/sec)")
             return True
             
         except Exception as e:
@@ -146,7 +476,8 @@ class QdrantConnector:
             return False
             
     def search_documents(self, query_vector: List[float], limit: int = 5, 
-                        filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+                        filter: Optional[Dict[str, Any]] = None,
+                        ef: Optional[int] = None, exact: bool = False) -> List[Dict[str, Any]]:
         """
         Search for similar documents in the collection.
         
@@ -154,20 +485,89 @@ class QdrantConnector:
             query_vector: Query embedding vector
             limit: Maximum number of results to return
             filter: Optional filter to apply to the search
+            ef: HNSW search beam width (default: QDRANT_SEARCH_EF)
+            exact: Search every vector instead of the HNSW index
             
         Returns:
             List of matching documents
+            
+        Raises:
+            ValueError: If the filter uses a field without a payload index
         """
+        query_filter = self._to_filter(filter)
+        
         try:
             return self.client.search(
                 collection_name=self.collection_name,
-                query_vector=query_vector,
+                query_vector=query_vector.tolist() if hasattr(query_vector, "tolist") else query_vector,
                 limit=limit,
-                query_filter=filter
+                query_filter=query_filter,
+                search_params=build_search_params(ef, exact, self.quantization)
             )
         except Exception as e:
+            # Re-raised: an empty list would read as "no matches"
             logger.error(f"Error searching documents: {e}")
-            return []
+            raise
+            
+    def _to_filter(self, filter: Optional[Union[Dict[str, Any], models.Filter]]) -> Optional[models.Filter]:
+        """
+        Convert a dict filter into a Qdrant Filter model and check it only uses indexed fields.
+        
+        REST would coerce plain dicts, but the gRPC transport only accepts models.
+        """
+        if isinstance(filter, dict):
+            filter = models.Filter(**filter)
+        return validate_filter(filter, self.payload_indexes)
+        
+    def search_batch(self, query_vectors: List[List[float]], limit: Union[int, List[int]] = 5,
+                     filters: Optional[List[Optional[Dict[str, Any]]]] = None,
+                     ef: Optional[int] = None, exact: bool = False) -> List[List[Any]]:
+        """
+        Search for many query vectors in a single request.
+        
+        Args:
+            query_vectors: Query embedding vectors (list of lists or 2-D numpy array)
+            limit: Maximum results per query, either one value or one per query
+            filters: Optional filter per query (None entries mean unfiltered)
+            ef: HNSW search beam width (default: QDRANT_SEARCH_EF)
+            exact: Search every vector instead of the HNSW index
+            
+        Returns:
+            One list of matching documents per query, in input order
+            
+        Raises:
+            ValueError: If limit or filters do not match query_vectors in length,
+                or a filter uses a field without a payload index
+        """
+        if isinstance(limit, int):
+            limit = [limit] * len(query_vectors)
+        if filters is None:
+            filters = [None] * len(query_vectors)
+        
+        if len(limit) != len(query_vectors) or len(filters) != len(query_vectors):
+            raise ValueError("search_batch needs one limit and one filter per query vector")
+        
+        filters = [self._to_filter(query_filter) for query_filter in filters]
+        
+        try:
+            search_params = build_search_params(ef, exact, self.quantization)
+            requests = [
+                models.SearchRequest(
+                    vector=vector.tolist() if hasattr(vector, "tolist") else vector,
+                    filter=query_filter,
+                    limit=query_limit,
+                    params=search_params,
+                    with_payload=True
+                )
+                for vector, query_filter, query_limit in zip(query_vectors, filters, limit)
+            ]
+            return self.client.search_batch(
+                collection_name=self.collection_name,
+                requests=requests
+            )
+        except Exception as e:
+            logger.error(f"Error in batch search: {e}")
+            raise
             
     def delete_document(self, document_id: Union[str, int]) -> bool:
         """
@@ -191,6 +591,64 @@ class QdrantConnector:
             logger.error(f"Error deleting document: {e}")
             return False
             
+    def delete_documents(self, document_ids: List[Union[str, int]], batch_size: int = 1000) -> bool:
+        """
+        Delete many documents from the collection.
+        
+        Args:
+            document_ids: IDs of the documents to delete
+            batch_size: Number of IDs per delete request
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            for i in range(0, len(document_ids), batch_size):
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=models.PointIdsList(
+                        points=document_ids[i:i+batch_size]
+                    ),
+                    wait=True
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting documents: {e}")
+            return False
+            
+    def get_payload_values(self, key: str, batch_size: int = 1000) -> Optional[Dict[Union[str, int], Any]]:
+        """
+        Read one payload field for every point, without vectors.
+        
+        Args:
+            key: Payload key, using dots for nested fields (e.g. "metadata.content_hash")
+            batch_size: Number of points per scroll request
+            
+        Returns:
+            Mapping of point ID to the field value (None where unset), or None on error
+        """
+        try:
+            values = {}
+            offset = None
+            while True:
+                points, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=models.PayloadSelectorInclude(include=[key]),
+                    with_vectors=False
+                )
+                for point in points:
+                    value = point.payload or {}
+                    for part in key.split("."):
+                        value = value.get(part) if isinstance(value, dict) else None
+                    values[point.id] = value
+                if offset is None:
+                    return values
+        except Exception as e:
+            logger.error(f"Error reading payload field '{key}': {e}")
+            return None
+            
     def get_document(self, document_id: Union[str, int]) -> Optional[Dict[str, Any]]:
         """
         Get a document from the collection by ID.
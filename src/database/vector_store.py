@@ -0,0 +1,192 @@
+"""
+Vector store interface for EduPlan AI.
+This module defines the VectorStore protocol implemented by every backend,
+the canonical payload schema they store, and a factory that builds the
+configured backend so retrieval code never names a concrete connector.
+"""
+
+import logging
+from typing import List, Dict, Any, Optional, Union, Protocol, runtime_checkable
+
+from qdrant_client.http import models
+
+from ..core.config import (
+    VECTOR_STORE_BACKEND,
+    QDRANT_HOST,
+    QDRANT_PORT,
+    QDRANT_COLLECTION_NAME,
+    QDRANT_VECTOR_SIZE,
+    QDRANT_LOCAL_PATH,
+    NUMPY_STORE_DIR
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("qdrant", "qdrant_local", "numpy")
+
+# Metadata keys written by the ingest scripts; backends store any extra keys as-is
+CANONICAL_METADATA_FIELDS = (
+    "chapter", "subject", "section", "type", "source", "difficulty",
+    "source_file", "chunk", "chunk_index", "index", "content_hash"
+)
+
+
+@runtime_checkable
+class VectorStore(Protocol):
+    """
+    Interface shared by QdrantConnector and NumpyVectorStore.
+    
+    Points carry the canonical payload ``{"text": str, "metadata": dict}``
+    (see ``make_document``). Filters are Qdrant ``Filter`` models or the
+    equivalent dicts and may only use the backend's indexed payload fields.
+    Search results are Qdrant ``ScoredPoint`` objects on every backend.
+    """
+    
+    collection_name: str
+    vector_size: int
+    
+    def recreate_collection(self) -> bool:
+        """Delete the collection if it exists and create an empty one."""
+        ...
+    
+    def ensure_collection(self) -> bool:
+        """Create the collection if it does not exist, keeping existing points."""
+        ...
+    
+    def get_collection_info(self) -> Any:
+        """Backend-specific collection information (empty when unavailable)."""
+        ...
+    
+    def get_vector_size(self) -> Optional[int]:
+        """Dimensionality of the stored vectors, or None if unknown."""
+        ...
+    
+    def count_documents(self) -> int:
+        """Number of points in the collection (-1 on error)."""
+        ...
+    
+    def insert_documents(self, documents: List[Dict], embeddings: List[List[float]],
+                         batch_size: Optional[int] = None) -> bool:
+        """Upsert canonical documents with their embeddings."""
+        ...
+    
+    def search_documents(self, query_vector: List[float], limit: int = 5,
+                         filter: Optional[Dict[str, Any]] = None,
+                         ef: Optional[int] = None, exact: bool = False) -> List[models.ScoredPoint]:
+        """Nearest neighbours of one query vector."""
+        ...
+    
+    def search_batch(self, query_vectors: List[List[float]], limit: Union[int, List[int]] = 5,
+                     filters: Optional[List[Optional[Dict[str, Any]]]] = None,
+                     ef: Optional[int] = None, exact: bool = False) -> List[List[models.ScoredPoint]]:
+        """Nearest neighbours of many query vectors, in input order (ValueError on mismatched lengths)."""
+        ...
+    
+    def delete_documents(self, document_ids: List[Union[str, int]], batch_size: int = 1000) -> bool:
+        """Delete points by ID."""
+        ...
+    
+    def get_document(self, document_id: Union[str, int]) -> Optional[Any]:
+        """Fetch one point (with payload) by ID."""
+        ...
+    
+    def get_payload_values(self, key: str, batch_size: int = 1000) -> Optional[Dict[Union[str, int], Any]]:
+        """Map every point ID to one (dotted) payload field."""
+        ...
+
+
+def make_document(document_id: Union[str, int], text: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build a document in the canonical schema accepted by ``insert_documents``.
+    
+    Args:
+        document_id: Point ID (unsigned integer or UUID string)
+        text: Chunk text
+        metadata: Chunk metadata (see CANONICAL_METADATA_FIELDS)
+    
+    Returns:
+        Dictionary with 'id', 'text' and 'metadata'
+    """
+    return {"id": document_id, "text": text, "metadata": dict(metadata or {})}
+
+
+def canonical_payload(payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Read a stored payload as ``{"text", "metadata"}``.
+    
+    Points written by the old flat QdrantDB schema keep their fields at the
+    top level; those are folded into 'metadata' so readers see one shape.
+    
+    Args:
+        payload: Stored point payload
+    
+    Returns:
+        Dictionary with 'text' and 'metadata'
+    """
+    payload = payload or {}
+    if "metadata" in payload:
+        return {"text": payload.get("text", ""), "metadata": payload.get("metadata") or {}}
+    return {
+        "text": payload.get("text", ""),
+        "metadata": {key: value for key, value in payload.items() if key != "text"}
+    }
+
+
+def create_vector_store(backend: str = None, collection_name: str = None,
+                        vector_size: int = None, **options: Any) -> VectorStore:
+    """
+    Create the configured vector store backend.
+    
+    Args:
+        backend: "qdrant", "qdrant_local" or "numpy" (default: VECTOR_STORE_BACKEND)
+        collection_name: Collection (or alias) to use (default: QDRANT_COLLECTION_NAME)
+        vector_size: Dimensionality of the vectors (default: QDRANT_VECTOR_SIZE)
+        **options: Backend keyword arguments. QdrantConnector options
+            (transport, timeout, quantization, on_disk, hnsw_m,
+            hnsw_ef_construct) are ignored by the NumPy backend; 'path'
+            overrides the local storage directory.
+    
+    Returns:
+        A VectorStore
+    
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    backend = (backend or VECTOR_STORE_BACKEND).lower()
+    collection_name = collection_name or QDRANT_COLLECTION_NAME
+    vector_size = vector_size or QDRANT_VECTOR_SIZE
+    
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown vector store backend '{backend}', expected one of {BACKENDS}")
+    
+    if backend == "numpy":
+        from .numpy_store import NumpyVectorStore
+        
+        ignored = sorted(set(options) - {"path", "payload_indexes"})
+        if ignored:
+            logger.debug(f"NumPy backend ignores options: {', '.join(ignored)}")
+        return NumpyVectorStore(
+            path=options.get("path", NUMPY_STORE_DIR),
+            collection_name=collection_name,
+            vector_size=vector_size,
+            payload_indexes=options.get("payload_indexes")
+        )
+    
+    from .qdrant_connector import QdrantConnector
+    
+    if backend == "qdrant_local":
+        options.setdefault("path", QDRANT_LOCAL_PATH)
+    else:
+        options.pop("path", None)
+    return QdrantConnector(
+        host=options.pop("host", QDRANT_HOST),
+        port=options.pop("port", QDRANT_PORT),
+        collection_name=collection_name,
+        vector_size=vector_size,
+        **options
+    )
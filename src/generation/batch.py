@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Batch lesson plan generation for EduPlan AI.
+Generates lesson plans for a whole file of topics: all retrieval queries are
+embedded in one model batch and searched in one vector database request,
+then LLM calls run concurrently under a configurable limit.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any
+
+# Add the project root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.core.config import LLM_CONCURRENCY, LESSON_PLANS_DIR
+from src.generation.generator import LessonPlanGenerator, CONTEXT_TOP_K
+
+# Fields a topic entry may carry besides 'topic'
+TOPIC_FIELDS = ("chapter", "subject", "grade_level", "duration", "learning_objectives")
+
+def load_topics(path: str) -> List[Dict[str, Any]]:
+    """
+    Load lesson topics from a file.
+    
+    Supported formats:
+    - ``.json``: a list of topic objects
+    - ``.jsonl``: one topic object per line
+    - anything else: one plain topic per line
+    
+    Topic objects need a 'topic' key and may set 'chapter', 'subject',
+    'grade_level', 'duration' and 'learning_objectives'.
+    
+    Args:
+        path: Path to the topics file
+    
+    Returns:
+        List of topic dictionaries
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            entries = json.load(f)
+        elif path.endswith('.jsonl'):
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = [{"topic": line.strip()} for line in f if line.strip()]
+    
+    topics = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"topic": entry}
+        if not entry.get("topic"):
+            print(f"⚠️ Skipping entry without a topic: {entry}")
+            continue
+        topics.append({"topic": entry["topic"], **{k: entry[k] for k in TOPIC_FIELDS if entry.get(k) is not None}})
+    
+    return topics
+
+class BatchLessonPlanGenerator:
+    """Generate many lesson plans with batched retrieval and concurrent LLM calls"""
+    
+    def __init__(self, generator: LessonPlanGenerator = None, concurrency: int = LLM_CONCURRENCY):
+        """
+        Initialize the batch generator
+        
+        Args:
+            generator: Lesson plan generator to use (default: create one)
+            concurrency: Maximum number of LLM calls in flight
+        """
+        self.generator = generator or LessonPlanGenerator()
+        self.concurrency = max(1, concurrency)
+    
+    def generate(self, topics: List[Dict[str, Any]], save: bool = True,
+                 output_dir: str = LESSON_PLANS_DIR) -> List[Dict[str, Any]]:
+        """
+        Generate lesson plans for a list of topics
+        
+        Args:
+            topics: Topic dictionaries as returned by ``load_topics``
+            save: Save each lesson plan as it completes
+            output_dir: Directory for saved lesson plans
+        
+        Returns:
+            One result per topic, in input order, with 'topic', 'lesson_plan'
+            (or 'error') and 'filepath' when saved
+        """
+        if not topics:
+            return []
+        
+        start_time = time.time()
+        
+        # One embedding batch and one vector search request for every topic
+        contexts = self.generator.retriever.retrieve_contexts_batch(topics, top_k=CONTEXT_TOP_K)
+        retrieval_time = time.time() - start_time
+        print(f"📚 Retrieved context for {len(topics)} topics in {retrieval_time:.2f} seconds")
+        
+        results = [None] * len(topics)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(self._generate_one, topic, context, save, output_dir): i
+                for i, (topic, context) in enumerate(zip(topics, contexts))
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                print(f"   📊 Completed {sum(r is not None for r in results)}/{len(topics)} lesson plans")
+        
+        elapsed = time.time() - start_time
+        failed = sum("error" in r for r in results)
+        print(f"✅ Generated {len(topics) - failed}/{len(topics)} lesson plans in {elapsed:.2f} seconds "
+              f"(concurrency {self.concurrency})")
+        return results
+    
+    def _generate_one(self, topic: Dict[str, Any], context: str, save: bool, output_dir: str) -> Dict[str, Any]:
+        """Run LLM generation for one topic, capturing errors instead of raising"""
+        result = {"topic": topic["topic"]}
+        try:
+            lesson_plan = self.generator.generate_from_context(context=context, **topic)
+            result["lesson_plan"] = lesson_plan
+            if save:
+                result["filepath"] = self.generator.save_lesson_plan(lesson_plan, output_dir=output_dir)
+        except Exception as e:
+            print(f"❌ Error generating lesson plan for '{topic['topic']}': {str(e)}")
+            result["error"] = str(e)
+        return result
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description='Generate lesson plans for a file of topics')
+    parser.add_argument('topics_file', help='Topics file (.json list, .jsonl, or one topic per line)')
+    parser.add_argument('--concurrency', type=int, default=LLM_CONCURRENCY, help='Concurrent LLM calls')
+    parser.add_argument('--output-dir', default=LESSON_PLANS_DIR, help='Directory for lesson plans')
+    args = parser.parse_args()
+    
+    topics = load_topics(args.topics_file)
+    print(f"📝 Loaded {len(topics)} topics from {args.topics_file}")
+    
+    batch = BatchLessonPlanGenerator(concurrency=args.concurrency)
+    results = batch.generate(topics, output_dir=args.output_dir)
+    
+    failed = [r for r in results if "error" in r]
+    if failed:
+        print(f"⚠️ {len(failed)} topics failed: {', '.join(r['topic'] for r in failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
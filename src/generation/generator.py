@@ -5,6 +5,9 @@ from datetime import datetime
 from ..core.config import LLM_MODEL, LLM_API_KEY, LLM_BASE_URL
 from ..retrieval.retriever import DocumentRetriever
 
+# Documents retrieved per lesson plan (more context for better generation)
+CONTEXT_TOP_K = 6
+
 class LessonPlanGenerator:
     """
     Advanced lesson plan generator using RAG and LLM
@@ -67,9 +70,47 @@ class LessonPlanGenerator:
             topic=topic,
             subject=subject,
             chapter=chapter,
-            top_k=6  # Get more context for better generation
+            top_k=CONTEXT_TOP_K
         )
         
+        return self.generate_from_context(
+            topic=topic,
+            context=context,
+            chapter=chapter,
+            subject=subject,
+            grade_level=grade_level,
+            duration=duration,
+            learning_objectives=learning_objectives
+        )
+    
+    def generate_from_context(
+        self,
+        topic: str,
+        context: str,
+        chapter: str = None,
+        subject: str = "General",
+        grade_level: str = "Middle School",
+        duration: int = 45,
+        learning_objectives: List[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a lesson plan from already retrieved context
+        
+        Safe to call from several threads at once; batch generation uses this
+        to run LLM calls concurrently.
+        
+        Args:
+            topic: Main topic of the lesson
+            context: Formatted educational context
+            chapter: Optional chapter context
+            subject: Subject area
+            grade_level: Target grade level
+            duration: Lesson duration in minutes
+            learning_objectives: Optional specific objectives
+            
+        Returns:
+            Generated lesson plan as dictionary
+        """
         # Create the generation prompt
         prompt = self.create_lesson_plan_prompt(
             topic=topic,
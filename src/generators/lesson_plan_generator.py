@@ -1,13 +1,13 @@
 from typing import List, Dict, Any
 from ..core.vector_database import QdrantDB
-from ..models.embedding_model import NVEmbedPipeline
+from ..models.registry import get_embedding_model
 
 class LessonPlanGenerator:
     """RAG-based Lesson Plan Generator with Chapter-wise organization"""
     
     def __init__(self):
         self.db = QdrantDB()
-        self.embedder = NVEmbedPipeline()
+        self.embedder = get_embedding_model()
         print("✅ Lesson Plan Generator initialized")
     
     def retrieve_context(self, query: str, filter_chapter: str = None, filter_subject: str = None, top_k: int = 5) -> List[Dict[str, Any]]:
@@ -32,12 +32,44 @@ class LessonPlanGenerator:
         print(f"✅ Found {len(results)} relevant documents")
         return results
     
+    def retrieve_contexts(self, queries: List[str], filters: List[Dict[str, str]] = None, top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """Retrieve documents for many queries with one embedding batch and one batch search"""
+        print(f"🔍 Searching for {len(queries)} queries in one batch")
+        
+        query_embeddings = self.embedder.embed_queries(queries)
+        results = self.db.search_batch(query_embeddings, top_k=top_k, filters=filters)
+        
+        print(f"✅ Found {sum(len(docs) for docs in results)} relevant documents")
+        return results
+    
     def generate_lesson_plan(self, query: str, filter_chapter: str = None, filter_subject: str = None) -> Dict[str, Any]:
         """Generate a lesson plan based on query and retrieved context"""
         
         # Retrieve relevant context
         context_docs = self.retrieve_context(query, filter_chapter, filter_subject)
         
+        return self._build_result(query, context_docs, filter_chapter, filter_subject)
+    
+    def generate_lesson_plans(self, requests: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Generate lesson plans for many queries with batched retrieval
+        
+        Each request is a dict with 'query' and optional 'chapter' and 'subject'.
+        Results are returned in input order.
+        """
+        context_docs_per_query = self.retrieve_contexts(
+            [req["query"] for req in requests],
+            filters=[{"chapter": req.get("chapter"), "subject": req.get("subject")} for req in requests]
+        )
+        
+        return [
+            self._build_result(req["query"], context_docs, req.get("chapter"), req.get("subject"))
+            for req, context_docs in zip(requests, context_docs_per_query)
+        ]
+    
+    def _build_result(self, query: str, context_docs: List[Dict[str, Any]], filter_chapter: str = None, filter_subject: str = None) -> Dict[str, Any]:
+        """Build the lesson plan result from retrieved context documents"""
+        
         # Extract context text
         context_text = "\n\n".join([doc["text"][:500] for doc in context_docs])  # Limit context
         
@@ -0,0 +1,293 @@
+"""
+Embedding caches for EduPlan AI.
+This module provides a persistent, content-addressed store for document
+embeddings so that unchanged text is never re-embedded across runs, and an
+in-process LRU cache for query embeddings on the retrieval path.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Tuple, Dict, Any, Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on host parameters per statement is 999
+_SQL_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys (Unicode NFC, collapsed whitespace)."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """
+    Size-bounded LRU embedding cache backed by a memory-mapped float32 matrix.
+    
+    Vectors live in a fixed-size ``np.memmap`` of shape (max_entries, dim);
+    a small SQLite index maps each content key to its row ("slot") and the
+    time it was last used. When the cache is full the least recently used
+    slots are reused.
+    """
+    
+    def __init__(self, cache_dir: str, dim: int, max_entries: int = 20000):
+        """
+        Open (or create) an embedding cache.
+        
+        Args:
+            cache_dir: Directory holding the index and vector files
+            dim: Dimensionality of cached vectors
+            max_entries: Maximum number of vectors kept on disk
+        """
+        self.cache_dir = cache_dir
+        self.dim = dim
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        index_path = os.path.join(cache_dir, "index.sqlite3")
+        vectors_path = os.path.join(cache_dir, "vectors.f32")
+        
+        self._conn = sqlite3.connect(index_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, slot INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        
+        # Layout changes invalidate every slot, so start over
+        layout = {"dim": str(dim), "max_entries": str(max_entries)}
+        stored = dict(self._conn.execute("SELECT name, value FROM meta").fetchall())
+        reset = stored != layout or not os.path.exists(vectors_path)
+        if reset:
+            if stored:
+                logger.info(f"Embedding cache layout changed ({stored} → {layout}), resetting")
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM meta")
+            self._conn.executemany("INSERT INTO meta (name, value) VALUES (?, ?)", layout.items())
+        self._conn.commit()
+        
+        self._vectors = np.memmap(
+            vectors_path,
+            dtype=np.float32,
+            mode="w+" if reset else "r+",
+            shape=(max_entries, dim)
+        )
+    
+    @staticmethod
+    def make_key(model_name: str, max_length: int, pooling: str, text: str) -> str:
+        """
+        Build a content key from everything that determines an embedding.
+        
+        Args:
+            model_name: Embedding model identifier
+            max_length: Tokenizer truncation length
+            pooling: Pooling mode used to reduce token embeddings
+            text: Text being embedded
+        
+        Returns:
+            Hex SHA-256 digest
+        """
+        parts = [model_name, str(max_length), pooling, normalize_text(text)]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    
+    def _lookup_slots(self, keys: List[str]) -> Dict[str, int]:
+        """Map the given keys to their slots (keys not cached are omitted)."""
+        slots = {}
+        for i in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[i:i+_SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, slot FROM entries WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            slots.update(rows)
+        return slots
+    
+    def get_many(self, keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Look up cached vectors.
+        
+        Args:
+            keys: Content keys from ``make_key``
+        
+        Returns:
+            Tuple of (vectors, found) where vectors has shape (len(keys), dim)
+            and found is a boolean mask of cache hits; rows for misses are zero
+        """
+        vectors = np.zeros((len(keys), self.dim), dtype=np.float32)
+        found = np.zeros(len(keys), dtype=bool)
+        if not keys:
+            return vectors, found
+        
+        with self._lock:
+            slots = self._lookup_slots(keys)
+            rows = [i for i, key in enumerate(keys) if key in slots]
+            if rows:
+                vectors[rows] = self._vectors[[slots[keys[i]] for i in rows]]
+                found[rows] = True
+                
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE entries SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in {keys[i] for i in rows}]
+                )
+                self._conn.commit()
+            
+            self.hits += len(rows)
+            self.misses += len(keys) - len(rows)
+        
+        return vectors, found
+    
+    def put_many(self, keys: List[str], vectors: np.ndarray) -> None:
+        """
+        Store vectors, evicting least recently used entries when full.
+        
+        Args:
+            keys: Content keys from ``make_key``
+            vectors: Array of shape (len(keys), dim)
+        """
+        if not keys:
+            return
+        
+        # Last write wins for duplicate keys within one call
+        latest = {key: i for i, key in enumerate(keys)}
+        if len(latest) > self.max_entries:
+            latest = dict(list(latest.items())[-self.max_entries:])
+        
+        with self._lock:
+            slots = self._lookup_slots(list(latest))
+            new_keys = [key for key in latest if key not in slots]
+            
+            if new_keys:
+                used = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                free = max(self.max_entries - used, 0)
+                # Slots stay dense: fresh ones are appended, evicted ones reused
+                fresh = list(range(used, used + min(free, len(new_keys))))
+                
+                shortfall = len(new_keys) - len(fresh)
+                if shortfall > 0:
+                    # Oldest entries, skipping keys this call is about to overwrite
+                    candidates = self._conn.execute(
+                        "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?",
+                        (shortfall + len(slots),)
+                    ).fetchall()
+                    evicted = [(key, slot) for key, slot in candidates if key not in slots][:shortfall]
+                    self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in evicted])
+                    fresh.extend(slot for _, slot in evicted)
+                    logger.debug(f"Evicted {len(evicted)} embeddings from cache")
+                
+                slots.update(zip(new_keys, fresh))
+            
+            now = time.time()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, slot, last_used) VALUES (?, ?, ?)",
+                [(key, slots[key], now) for key in latest]
+            )
+            self._vectors[[slots[key] for key in latest]] = vectors[list(latest.values())]
+            self._vectors.flush()
+            self._conn.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and occupancy."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+            "max_entries": self.max_entries
+        }
+    
+    def close(self) -> None:
+        """Flush vectors and close the index."""
+        with self._lock:
+            self._vectors.flush()
+            self._conn.close()
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded, thread-safe in-process LRU cache for query embeddings.
+    
+    Entries expire ``ttl_seconds`` after they were stored. Queries are
+    normalized before lookup so trivially different spellings of the same
+    query (extra spaces, Unicode forms) share an entry.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        """
+        Initialize the query cache.
+        
+        Args:
+            max_entries: Maximum number of cached queries
+            ttl_seconds: Lifetime of an entry (None or 0 disables expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, query: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for a query, or None."""
+        key = normalize_text(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, vector = entry
+                if not self.ttl_seconds or time.monotonic() - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, query: str, vector: np.ndarray) -> None:
+        """Cache the embedding for a query, evicting the least recently used entry."""
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        key = normalize_text(query)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all cached queries."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and occupancy."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries
+            }
@@ -4,13 +4,27 @@ This module provides the NVEmbedPipeline class for generating embeddings
 using the NVIDIA NV-Embed model.
 """
 
+import gc
 import logging
 import time
 import torch
-from typing import List, Union, Dict, Any
+from typing import List, Union, Dict, Any, Optional, Tuple
 from transformers import AutoModel, AutoTokenizer
 import numpy as np
 
+from .embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from .projection import VectorProjection, load_projection
+from ..core.config import (
+    EMBEDDING_DIM,
+    EMBEDDING_MAX_LENGTH,
+    EMBEDDING_MAX_BATCH_TOKENS,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    QUERY_CACHE_MAX_ENTRIES,
+    QUERY_CACHE_TTL_SECONDS
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -18,22 +32,69 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def resolve_device(device: str = None) -> str:
+    """Use CUDA if available, otherwise fall back to CPU."""
+    if device is None:
+        return "cuda:0" if torch.cuda.is_available() else "cpu"
+    return device
+
+def resolve_dtype(device: str, dtype: Union[str, torch.dtype] = None) -> torch.dtype:
+    """Use half precision on GPU to save memory unless a dtype is given."""
+    if dtype is None:
+        return torch.float16 if device.startswith("cuda") else torch.float32
+    if isinstance(dtype, str):
+        return getattr(torch, dtype)
+    return dtype
+
 class NVEmbedPipeline:
     """Pipeline for generating embeddings using NVIDIA NV-Embed."""
     
-    def __init__(self, model_name: str = "nvidia/NV-Embed-v2", device: str = None):
-        """Initialize the NVEmbedPipeline."""
-        self.model_name = model_name
+    # Pooling applied to token-level outputs; part of the embedding cache key
+    pooling = "mean"
+    
+    def __init__(self, model_name: str = "nvidia/NV-Embed-v2", device: str = None,
+                 dtype: Union[str, torch.dtype] = None,
+                 use_cache: bool = EMBEDDING_CACHE_ENABLED, cache_dir: str = None,
+                 projection: Optional[VectorProjection] = None):
+        """
+        Initialize the NVEmbedPipeline.
         
-        # Use CUDA if available, otherwise fall back to CPU
-        if device is None:
-            self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
-        else:
-            self.device = device
+        Prefer ``src.models.registry.get_embedding_model`` over constructing
+        this directly, so the weights are loaded once per process.
+        
+        Args:
+            model_name: Hugging Face model identifier
+            device: Torch device (default: first CUDA device, else CPU)
+            dtype: Model dtype, e.g. "float16" (default: float16 on GPU, else float32)
+            use_cache: Consult the on-disk embedding cache before running the model
+            cache_dir: Embedding cache directory (default: EMBEDDING_CACHE_DIR)
+            projection: Projection applied to returned vectors (default: the
+                configured EMBEDDING_PROJECTION, loaded on first use)
+        """
+        self.model_name = model_name
+        self.device = resolve_device(device)
+        self.dtype = resolve_dtype(self.device, dtype)
+        self.projection = projection
+        self._projection_loaded = projection is not None
             
         # Load model and tokenizer
         self._load_model()
         
+        # Persistent embedding cache keyed by model, settings and text
+        self.cache = None
+        if use_cache:
+            self.cache = EmbeddingCache(
+                cache_dir or EMBEDDING_CACHE_DIR,
+                dim=self.vector_size,
+                max_entries=EMBEDDING_CACHE_MAX_ENTRIES
+            )
+        
+        # In-process cache so repeated queries cost no model time
+        self.query_cache = QueryEmbeddingCache(
+            max_entries=QUERY_CACHE_MAX_ENTRIES,
+            ttl_seconds=QUERY_CACHE_TTL_SECONDS
+        )
+        
     def _load_model(self):
         """Load the NV-Embed model and tokenizer."""
         try:
@@ -41,8 +102,7 @@ class NVEmbedPipeline:
             print(f"🔄 Loading NVIDIA NV-Embed-v2: {self.model_name}")
             print(f"🎯 Using device: {self.device}")
             
-            # Use half precision for GPU to save memory
-            dtype = torch.float16 if self.device.startswith("cuda") else torch.float32
+            dtype = self.dtype
             
             # Load tokenizer with trust_remote_code=True for NVIDIA models
             self.tokenizer = AutoTokenizer.from_pretrained(
@@ -61,8 +121,8 @@ class NVEmbedPipeline:
             self.model.to(self.device)
             
             # Save embedding dimension from config
-            self.embedding_dim = 4096  # Hard-coded for NV-Embed-v2
-            self.vector_size = self.embedding_dim  # Add this for compatibility
+            self.embedding_dim = EMBEDDING_DIM
+            self.vector_size = self.embedding_dim  # Full (unprojected) dimension
             
             # Print success message
             print(f"✅ NVIDIA NV-Embed-v2 loaded successfully!")
@@ -74,114 +134,211 @@ class NVEmbedPipeline:
             logger.error(f"Error loading NV-Embed model: {e}")
             raise
     
-    def embed_texts(self, texts: List[str], batch_size: int = 2) -> List[List[float]]:
-        """Generate embeddings for a list of texts."""
-        print(f"🔄 Generating embeddings for {len(texts)} texts...")
+    def get_projection(self) -> Optional[VectorProjection]:
+        """Return the projection, loading the configured one on first use."""
+        if not self._projection_loaded:
+            # Deferred so the model can embed at full size to fit a PCA
+            self.projection = load_projection()
+            self._projection_loaded = True
+        return self.projection
+    
+    @property
+    def output_dim(self) -> int:
+        """Dimension of vectors returned by ``embed_texts`` and ``embed_query``."""
+        projection = self.get_projection()
+        return projection.dim if projection is not None else self.vector_size
+    
+    def _pool_embeddings(self, outputs, attention_mask: torch.Tensor) -> torch.Tensor:
+        """
+        Reduce model outputs to one vector per sequence.
+        
+        Token-level outputs (batch, seq_len, dim) are mean-pooled over the
+        attention mask in a single tensor op; sentence-level outputs
+        (batch, dim) are returned unchanged.
+        """
+        if isinstance(outputs, dict):
+            if "sentence_embeddings" in outputs:
+                hidden = outputs["sentence_embeddings"]
+            elif "last_hidden_state" in outputs:
+                hidden = outputs["last_hidden_state"]
+            else:
+                # Try to find any usable tensor
+                hidden = None
+                for key, value in outputs.items():
+                    if isinstance(value, torch.Tensor) and value.dim() >= 2:
+                        logger.info(f"Using fallback key: {key}")
+                        hidden = value
+                        break
+                if hidden is None:
+                    raise ValueError("Cannot find usable embeddings in model output")
+        else:
+            # Direct tensor output
+            hidden = outputs
         
-        embeddings = []
+        if hidden.dim() != 3:
+            # Already sentence-level embeddings
+            return hidden
         
-        # Process in batches
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i+batch_size]
+        # Masked mean over the whole batch; clamp avoids division by zero
+        # for (unexpected) fully padded rows, which then pool to zeros
+        mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+        summed = torch.sum(hidden * mask, dim=1)
+        counts = torch.clamp(mask.sum(dim=1), min=1.0)
+        return summed / counts
+    
+    def _fit_dimension(self, batch_embeddings: np.ndarray) -> np.ndarray:
+        """Pad or truncate a (batch, dim) array to the configured vector size."""
+        dim = batch_embeddings.shape[1]
+        if dim == self.vector_size:
+            return batch_embeddings
+        
+        logger.warning(f"Fixing dimension: {dim} → {self.vector_size}")
+        if dim > self.vector_size:
+            return batch_embeddings[:, :self.vector_size]
+        
+        padded = np.zeros((batch_embeddings.shape[0], self.vector_size), dtype=np.float32)
+        padded[:, :dim] = batch_embeddings
+        return padded
+    
+    def _tokenize(self, texts: List[str]) -> Dict[str, List[List[int]]]:
+        """Tokenize texts without padding so each sequence keeps its true length."""
+        return self.tokenizer(
+            texts,
+            padding=False,
+            truncation=True,
+            max_length=EMBEDDING_MAX_LENGTH
+        )
+    
+    def _plan_batches(self, lengths: List[int], max_batch_tokens: int,
+                      max_batch_size: Optional[int] = None) -> List[List[int]]:
+        """
+        Group sequence indices into length-sorted batches under a token budget.
+        
+        A batch is padded to its longest member, so its cost is
+        ``len(batch) * max_length_in_batch``; sorting by length keeps
+        neighbours similar and that padding small.
+        
+        Args:
+            lengths: Token count of each sequence
+            max_batch_tokens: Maximum padded tokens per batch
+            max_batch_size: Optional cap on sequences per batch
             
-            # Tokenize batch
-            inputs = self.tokenizer(
-                batch_texts, 
-                padding=True, 
-                truncation=True, 
-                max_length=512,
-                return_tensors="pt"
-            ).to(self.device)
+        Returns:
+            List of batches, each a list of indices into ``lengths``
+        """
+        order = sorted(range(len(lengths)), key=lengths.__getitem__)
+        
+        batches = []
+        current = []
+        for idx in order:
+            # Sorted ascending, so this sequence sets the batch's padded length
+            padded_length = max(lengths[idx], 1)
+            over_budget = padded_length * (len(current) + 1) > max_batch_tokens
+            over_size = max_batch_size is not None and len(current) >= max_batch_size
+            if current and (over_budget or over_size):
+                batches.append(current)
+                current = []
+            current.append(idx)
+        
+        if current:
+            batches.append(current)
+        
+        return batches
+    
+    def _embed_batch(self, input_ids: List[List[int]], attention_mask: List[List[int]]) -> np.ndarray:
+        """Run the model on one pre-tokenized batch and return a (batch, vector_size) float32 array."""
+        # Pad batch to its longest member
+        inputs = self.tokenizer.pad(
+            {"input_ids": input_ids, "attention_mask": attention_mask},
+            padding=True,
+            return_tensors="pt"
+        ).to(self.device)
+        
+        # Generate embeddings with no gradient tracking
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+            pooled = self._pool_embeddings(outputs, inputs["attention_mask"])
+        
+        # Single device-to-host transfer for the whole batch
+        batch_embeddings = pooled.float().cpu().numpy()
+        return self._fit_dimension(batch_embeddings)
+    
+    def embed_texts(self, texts: List[str], batch_size: Optional[int] = None,
+                    max_batch_tokens: Optional[int] = None, project: bool = True,
+                    return_failed: bool = False) -> Union[np.ndarray, Tuple[np.ndarray, List[int]]]:
+        """
+        Generate embeddings for a list of texts.
+        
+        Texts already in the embedding cache are served from disk. The rest
+        are sorted by tokenized length and grouped into batches under a
+        padded-token budget; results are written back in input order.
+        The cache always holds full-size vectors; the projection (if any)
+        is applied on the way out.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Optional cap on texts per batch
+            max_batch_tokens: Padded-token budget per batch
+                (default: EMBEDDING_MAX_BATCH_TOKENS)
+            project: Apply the configured projection
+            return_failed: Also return the rows that ran out of GPU memory
+                even on their own (they are left as zero vectors)
+        
+        Returns:
+            Contiguous float32 array of shape (len(texts), output_dim),
+            or (len(texts), vector_size) when ``project`` is False; with
+            ``return_failed``, a tuple of that array and the failed row indices
+        """
+        embeddings, failed = self._embed_full(texts, batch_size, max_batch_tokens)
+        projection = self.get_projection() if project else None
+        if projection is not None:
+            embeddings = projection.transform(embeddings)
+        return (embeddings, failed) if return_failed else embeddings
+    
+    def _embed_full(self, texts: List[str], batch_size: Optional[int],
+                    max_batch_tokens: Optional[int]) -> Tuple[np.ndarray, List[int]]:
+        """Embed texts at full model dimension, using the embedding cache; also return the failed rows."""
+        print(f"🔄 Generating embeddings for {len(texts)} texts...")
+        
+        if max_batch_tokens is None:
+            max_batch_tokens = EMBEDDING_MAX_BATCH_TOKENS
+        
+        embeddings = np.zeros((len(texts), self.vector_size), dtype=np.float32)
+        if not texts:
+            return embeddings, []
+        
+        # Serve what we can from the cache; only misses reach the model
+        if self.cache is not None:
+            keys = [
+                self.cache.make_key(self.model_name, EMBEDDING_MAX_LENGTH, self.pooling, text)
+                for text in texts
+            ]
+            cached, found = self.cache.get_many(keys)
+            embeddings[found] = cached[found]
+            pending = np.flatnonzero(~found).tolist()
+            print(f"   💾 Embedding cache: {len(texts) - len(pending)} hits, {len(pending)} misses")
+        else:
+            pending = list(range(len(texts)))
+        
+        if not pending:
+            print(f"✅ Generated {len(embeddings)} embeddings with dimension {self.vector_size}")
+            return embeddings, []
+        
+        encoded = self._tokenize([texts[idx] for idx in pending])
+        all_ids = encoded["input_ids"]
+        all_masks = encoded["attention_mask"]
+        batches = self._plan_batches([len(ids) for ids in all_ids], max_batch_tokens, batch_size)
+        
+        failed = set()
+        processed = len(texts) - len(pending)
+        for batch in batches:
+            batch_ids = [all_ids[pos] for pos in batch]
+            batch_masks = [all_masks[pos] for pos in batch]
+            rows = [pending[pos] for pos in batch]
             
             try:
-                # Generate embeddings with no gradient tracking
-                with torch.no_grad():
-                    outputs = self.model(**inputs)
-                
-                # Get embeddings - simpler approach with less memory usage
-                if isinstance(outputs, dict):
-                    if "sentence_embeddings" in outputs:
-                        token_embeddings = outputs["sentence_embeddings"]
-                        
-                        # Check shape - don't print to reduce log spam
-                        if len(token_embeddings.shape) == 3:
-                            # Memory-efficient pooling: process one sequence at a time
-                            batch_embeddings = []
-                            for seq_idx in range(token_embeddings.shape[0]):
-                                # Get single sequence tokens and its mask
-                                seq_tokens = token_embeddings[seq_idx]
-                                seq_mask = inputs["attention_mask"][seq_idx]
-                                
-                                # Apply mask and mean only for this sequence
-                                masked_tokens = seq_tokens * seq_mask.unsqueeze(-1)
-                                # Sum and divide by non-zero mask elements
-                                sum_tokens = torch.sum(masked_tokens, dim=0)
-                                token_count = torch.sum(seq_mask).item()
-                                if token_count > 0:
-                                    mean_embedding = (sum_tokens / token_count).cpu().numpy()
-                                else:
-                                    # Fallback if no tokens (shouldn't happen)
-                                    mean_embedding = torch.zeros(self.embedding_dim).cpu().numpy()
-                                    
-                                batch_embeddings.append(mean_embedding)
-                            
-                            # Convert to numpy array
-                            batch_embeddings = np.array(batch_embeddings)
-                        else:
-                            # Already sentence-level embeddings
-                            batch_embeddings = token_embeddings.cpu().numpy()
-                    else:
-                        # Alternative keys
-                        if "last_hidden_state" in outputs:
-                            # Similar memory-efficient approach for last_hidden_state
-                            token_embeddings = outputs["last_hidden_state"]
-                            batch_embeddings = []
-                            for seq_idx in range(token_embeddings.shape[0]):
-                                seq_tokens = token_embeddings[seq_idx]
-                                seq_mask = inputs["attention_mask"][seq_idx]
-                                masked_tokens = seq_tokens * seq_mask.unsqueeze(-1)
-                                sum_tokens = torch.sum(masked_tokens, dim=0)
-                                token_count = torch.sum(seq_mask).item()
-                                if token_count > 0:
-                                    mean_embedding = (sum_tokens / token_count).cpu().numpy()
-                                else:
-                                    mean_embedding = torch.zeros(self.embedding_dim).cpu().numpy()
-                                batch_embeddings.append(mean_embedding)
-                            
-                            batch_embeddings = np.array(batch_embeddings)
-                        else:
-                            # Try to find any usable tensor
-                            usable_key = None
-                            for key, value in outputs.items():
-                                if isinstance(value, torch.Tensor) and value.dim() >= 2:
-                                    usable_key = key
-                                    break
-                            
-                            if usable_key:
-                                logger.info(f"Using fallback key: {usable_key}")
-                                batch_embeddings = outputs[usable_key].cpu().numpy()
-                            else:
-                                raise ValueError("Cannot find usable embeddings in model output")
-                else:
-                    # Direct tensor - use memory-efficient approach
-                    token_embeddings = outputs
-                    batch_embeddings = []
-                    for seq_idx in range(token_embeddings.shape[0]):
-                        seq_tokens = token_embeddings[seq_idx]
-                        seq_mask = inputs["attention_mask"][seq_idx]
-                        masked_tokens = seq_tokens * seq_mask.unsqueeze(-1)
-                        sum_tokens = torch.sum(masked_tokens, dim=0)
-                        token_count = torch.sum(seq_mask).item()
-                        if token_count > 0:
-                            mean_embedding = (sum_tokens / token_count).cpu().numpy()
-                        else:
-                            mean_embedding = torch.zeros(self.embedding_dim).cpu().numpy()
-                        batch_embeddings.append(mean_embedding)
-                    
-                    batch_embeddings = np.array(batch_embeddings)
-                
-                # Add to results
-                embeddings.extend(batch_embeddings)
+                # Fancy-index assignment restores original order
+                embeddings[rows] = self._embed_batch(batch_ids, batch_masks)
                 
             except RuntimeError as e:
                 if 'out of memory' in str(e):
@@ -189,58 +346,110 @@ class NVEmbedPipeline:
                     torch.cuda.empty_cache()
                     logger.warning(f"GPU out of memory, reducing batch size and retrying...")
                     
-                    if batch_size > 1:
-                        # Try with batch_size of 1
-                        for text in batch_texts:
+                    if len(batch) > 1:
+                        # Try one text at a time
+                        for pos, row in zip(batch, rows):
                             try:
-                                # Process one text at a time
-                                single_embedding = self.embed_query(text)
-                                embeddings.append(single_embedding)
+                                embeddings[row] = self._embed_batch([all_ids[pos]], [all_masks[pos]])[0]
                             except Exception as inner_e:
+                                # Row stays zero as fallback
                                 logger.error(f"Error processing single text: {inner_e}")
-                                # Add zeros as fallback
-                                embeddings.append([0.0] * self.embedding_dim)
+                                failed.add(row)
                     else:
-                        # Even batch_size=1 failed, add zeros as fallback
+                        # Even a single text failed, row stays zero as fallback
                         logger.error(f"Cannot process even with batch_size=1: {e}")
-                        for _ in batch_texts:
-                            embeddings.append([0.0] * self.embedding_dim)
+                        failed.update(rows)
                 else:
                     # Other error
                     raise
                 
             # Log progress
-            print(f"   📊 Processed {min(i+batch_size, len(texts))}/{len(texts)} texts ({self.device.upper()})")
+            processed += len(batch)
+            print(f"   📊 Processed {processed}/{len(texts)} texts ({self.device.upper()})")
             
             # Free GPU memory
             if self.device.startswith("cuda"):
                 torch.cuda.empty_cache()
-                
-        # Convert to lists for consistent output
-        result = []
-        for emb in embeddings:
-            # Convert to list and ensure correct dimension
-            if isinstance(emb, np.ndarray):
-                emb_list = emb.tolist()
-            else:
-                emb_list = list(emb)
-            
-            # Check dimensions
-            if len(emb_list) != self.vector_size:
-                logger.warning(f"Fixing dimension: {len(emb_list)} → {self.vector_size}")
-                if len(emb_list) < self.vector_size:
-                    # Pad with zeros
-                    emb_list = emb_list + [0.0] * (self.vector_size - len(emb_list))
-                else:
-                    # Truncate
-                    emb_list = emb_list[:self.vector_size]
-            
-            result.append(emb_list)
         
-        print(f"✅ Generated {len(result)} embeddings with dimension {self.vector_size}")
-        return result
+        # Zero-vector fallbacks must not be persisted
+        if self.cache is not None:
+            computed = [row for row in pending if row not in failed]
+            self.cache.put_many([keys[row] for row in computed], embeddings[computed])
+        
+        if failed:
+            logger.warning(f"{len(failed)} of {len(texts)} texts could not be embedded and were left as zero vectors")
+        print(f"✅ Generated {len(embeddings)} embeddings with dimension {self.vector_size}")
+        return embeddings, sorted(failed)
             
-    def embed_query(self, text: str) -> List[float]:
-        """Generate embedding for a single query text."""
-        result = self.embed_texts([text], batch_size=1)
-        return result[0] if result else []
+    def embed_query(self, text: str, use_cache: bool = True) -> List[float]:
+        """
+        Generate embedding for a single query text.
+        
+        Args:
+            text: Query text
+            use_cache: Serve repeated queries from the in-process query cache
+        
+        Returns:
+            Embedding vector as a list of floats
+        """
+        if use_cache:
+            cached = self.query_cache.get(text)
+            if cached is not None:
+                return cached.tolist()
+        
+        result, failed = self.embed_texts([text], batch_size=1, return_failed=True)
+        if not len(result):
+            return []
+        
+        if use_cache and not failed:
+            self.query_cache.put(text, result[0])
+        return result[0].tolist()
+    
+    def embed_queries(self, texts: List[str], use_cache: bool = True) -> np.ndarray:
+        """
+        Generate embeddings for many queries in one model batch.
+        
+        Cached queries are served from the query cache; the rest are embedded
+        together with a single ``embed_texts`` call and then cached.
+        
+        Args:
+            texts: Query texts
+            use_cache: Use the in-process query cache
+        
+        Returns:
+            Float32 array of shape (len(texts), output_dim)
+        """
+        embeddings = np.zeros((len(texts), self.output_dim), dtype=np.float32)
+        
+        pending = []
+        for i, text in enumerate(texts):
+            cached = self.query_cache.get(text) if use_cache else None
+            if cached is not None:
+                embeddings[i] = cached
+            else:
+                pending.append(i)
+        
+        if pending:
+            computed, failed = self.embed_texts([texts[i] for i in pending], return_failed=True)
+            embeddings[pending] = computed
+            if use_cache:
+                # Zero-vector fallbacks are not cached so the query is retried
+                failed = set(failed)
+                for pos, (i, vector) in enumerate(zip(pending, computed)):
+                    if pos not in failed:
+                        self.query_cache.put(texts[i], vector)
+        
+        return embeddings
+    
+    def unload(self) -> None:
+        """Release model weights and close the embedding cache."""
+        self.model = None
+        self.tokenizer = None
+        self.query_cache.clear()
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        
+        gc.collect()
+        if self.device.startswith("cuda"):
+            torch.cuda.empty_cache()
@@ -0,0 +1,210 @@
+"""
+Vector projection for EduPlan AI.
+This module reduces embedding dimensionality before vectors are stored or
+queried, either by truncation (Matryoshka-style prefixes) or by a PCA basis
+fitted on the corpus and persisted next to the data.
+"""
+
+import logging
+import os
+from typing import Optional, List, Dict
+
+import numpy as np
+
+from ..core.config import (
+    EMBEDDING_DIM,
+    EMBEDDING_PROJECTION,
+    EMBEDDING_PROJECTION_DIM,
+    EMBEDDING_PROJECTION_PATH
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PROJECTION_MODES = ("none", "truncate", "pca")
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+class VectorProjection:
+    """
+    Linear map from full embeddings to a smaller stored dimension.
+    
+    Inputs are L2-normalized first and outputs are L2-normalized again, so
+    cosine similarity in the reduced space approximates the original.
+    Truncation keeps the first ``dim`` components, which works best for
+    models trained with Matryoshka losses; NV-Embed-v2 is not, so compare
+    both modes with ``scripts/fit_projection.py`` before switching.
+    """
+    
+    def __init__(self, mode: str, dim: int, input_dim: int = EMBEDDING_DIM,
+                 mean: Optional[np.ndarray] = None, components: Optional[np.ndarray] = None,
+                 explained_variance: Optional[float] = None):
+        """
+        Initialize a projection.
+        
+        Args:
+            mode: "truncate" or "pca"
+            dim: Output dimension
+            input_dim: Dimension of the full embeddings
+            mean: PCA mean of the normalized inputs, shape (input_dim,)
+            components: PCA basis, shape (dim, input_dim)
+            explained_variance: Fraction of variance kept by the PCA basis
+        """
+        if mode not in PROJECTION_MODES or mode == "none":
+            raise ValueError(f"Unknown projection mode '{mode}', expected 'truncate' or 'pca'")
+        if dim > input_dim:
+            raise ValueError(f"Projection dimension {dim} exceeds input dimension {input_dim}")
+        if mode == "pca" and (mean is None or components is None):
+            raise ValueError("PCA projection needs a mean and components")
+        
+        self.mode = mode
+        self.dim = dim
+        self.input_dim = input_dim
+        self.mean = mean
+        self.components = components
+        self.explained_variance = explained_variance
+    
+    @classmethod
+    def fit_pca(cls, vectors: np.ndarray, dim: int) -> "VectorProjection":
+        """
+        Fit a PCA projection on a sample of full embeddings.
+        
+        Args:
+            vectors: Array of shape (n, input_dim)
+            dim: Output dimension
+        
+        Returns:
+            Fitted VectorProjection
+        """
+        return cls.fit_pca_dims(vectors, [dim])[dim]
+    
+    @classmethod
+    def fit_pca_dims(cls, vectors: np.ndarray, dims: List[int]) -> Dict[int, "VectorProjection"]:
+        """
+        Fit PCA projections for several output dimensions from one decomposition.
+        
+        The covariance is decomposed once; each dimension keeps the leading
+        eigenvectors of the same basis.
+        
+        Args:
+            vectors: Array of shape (n, input_dim)
+            dims: Output dimensions
+        
+        Returns:
+            Fitted VectorProjection per dimension
+        """
+        vectors = l2_normalize(np.asarray(vectors, dtype=np.float64))
+        mean = vectors.mean(axis=0)
+        centered = vectors - mean
+        
+        # Eigen-decomposition of the (input_dim, input_dim) covariance is
+        # cheaper than an SVD of the data when there are many vectors
+        covariance = centered.T @ centered / max(len(vectors) - 1, 1)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        order = np.argsort(eigenvalues)[::-1]
+        total = eigenvalues.sum()
+        
+        projections = {}
+        for dim in dims:
+            leading = order[:dim]
+            explained = float(eigenvalues[leading].sum() / total) if total > 0 else 0.0
+            logger.info(f"Fitted PCA {vectors.shape[1]} → {dim} on {len(vectors)} vectors "
+                        f"({explained:.1%} variance kept)")
+            projections[dim] = cls(
+                "pca",
+                dim,
+                input_dim=vectors.shape[1],
+                mean=mean.astype(np.float32),
+                components=eigenvectors[:, leading].T.astype(np.float32),
+                explained_variance=explained
+            )
+        return projections
+    
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Project full embeddings.
+        
+        Args:
+            vectors: Array of shape (n, input_dim)
+        
+        Returns:
+            Float32 array of shape (n, dim) with unit-length rows
+        """
+        vectors = l2_normalize(np.asarray(vectors, dtype=np.float32))
+        if self.mode == "truncate":
+            reduced = vectors[:, :self.dim]
+        else:
+            reduced = (vectors - self.mean) @ self.components.T
+        return np.ascontiguousarray(l2_normalize(reduced), dtype=np.float32)
+    
+    def save(self, path: str = EMBEDDING_PROJECTION_PATH) -> None:
+        """Persist the projection as a .npz file."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        arrays = {
+            "mode": np.array(self.mode),
+            "dim": np.array(self.dim),
+            "input_dim": np.array(self.input_dim)
+        }
+        if self.mode == "pca":
+            arrays.update(
+                mean=self.mean,
+                components=self.components,
+                explained_variance=np.array(self.explained_variance)
+            )
+        np.savez(path, **arrays)
+        logger.info(f"Saved {self.mode} projection ({self.input_dim} → {self.dim}) to {path}")
+    
+    @classmethod
+    def load(cls, path: str = EMBEDDING_PROJECTION_PATH) -> "VectorProjection":
+        """Load a projection saved with ``save``."""
+        with np.load(path) as data:
+            mode = str(data["mode"])
+            return cls(
+                mode,
+                int(data["dim"]),
+                input_dim=int(data["input_dim"]),
+                mean=data["mean"] if mode == "pca" else None,
+                components=data["components"] if mode == "pca" else None,
+                explained_variance=float(data["explained_variance"]) if mode == "pca" else None
+            )
+
+def load_projection(mode: str = EMBEDDING_PROJECTION, dim: int = EMBEDDING_PROJECTION_DIM,
+                    path: str = EMBEDDING_PROJECTION_PATH) -> Optional[VectorProjection]:
+    """
+    Build the configured projection.
+    
+    Args:
+        mode: "none", "truncate" or "pca" (default: EMBEDDING_PROJECTION)
+        dim: Output dimension (default: EMBEDDING_PROJECTION_DIM)
+        path: Fitted PCA file (default: EMBEDDING_PROJECTION_PATH)
+    
+    Returns:
+        VectorProjection, or None when projection is disabled
+    
+    Raises:
+        FileNotFoundError: If PCA is configured but has not been fitted
+        ValueError: If the fitted PCA does not match the configured dimension
+    """
+    mode = mode.lower()
+    if mode == "none":
+        return None
+    if mode == "truncate":
+        return VectorProjection("truncate", dim)
+    if mode != "pca":
+        raise ValueError(f"Unknown projection mode '{mode}', expected one of {PROJECTION_MODES}")
+    
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No fitted PCA projection at {path}; run scripts/fit_projection.py --save first")
+    
+    projection = VectorProjection.load(path)
+    if projection.mode != "pca" or projection.dim != dim:
+        raise ValueError(f"Projection at {path} is {projection.mode}/{projection.dim}, "
+                         f"but config asks for pca/{dim}")
+    return projection
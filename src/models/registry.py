@@ -0,0 +1,88 @@
+"""
+Model registry for EduPlan AI.
+This module keeps one NVEmbedPipeline per (model name, device, dtype) for the
+lifetime of the process, so callers share weights instead of reloading them.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Tuple, Union
+
+import torch
+
+from .embedding_model import NVEmbedPipeline, resolve_device, resolve_dtype
+from ..core.config import EMBEDDING_MODEL
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+_models: Dict[Tuple[str, str, torch.dtype], NVEmbedPipeline] = {}
+_lock = threading.Lock()
+
+def _registry_key(model_name: str, device: str, dtype: Union[str, torch.dtype]) -> Tuple[str, str, torch.dtype]:
+    """Resolve defaults so equivalent requests map to the same entry."""
+    device = resolve_device(device)
+    return model_name, device, resolve_dtype(device, dtype)
+
+def get_embedding_model(model_name: str = EMBEDDING_MODEL, device: str = None,
+                        dtype: Union[str, torch.dtype] = None) -> NVEmbedPipeline:
+    """
+    Return the shared embedding pipeline, loading it on first use.
+    
+    Args:
+        model_name: Hugging Face model identifier
+        device: Torch device (default: first CUDA device, else CPU)
+        dtype: Model dtype (default: float16 on GPU, else float32)
+        
+    Returns:
+        Process-wide NVEmbedPipeline for this (model, device, dtype)
+    """
+    key = _registry_key(model_name, device, dtype)
+    
+    # Loading happens under the lock so concurrent callers wait for one load
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            logger.info(f"Loading embedding model {key[0]} on {key[1]} ({key[2]})")
+            model = NVEmbedPipeline(model_name=key[0], device=key[1], dtype=key[2])
+            _models[key] = model
+        return model
+
+def unload_embedding_model(model_name: str = EMBEDDING_MODEL, device: str = None,
+                           dtype: Union[str, torch.dtype] = None) -> bool:
+    """
+    Drop a loaded model from the registry and free its memory.
+    
+    Callers still holding a reference keep a pipeline without weights.
+    
+    Returns:
+        True if a model was unloaded, False if it was not loaded
+    """
+    key = _registry_key(model_name, device, dtype)
+    with _lock:
+        model = _models.pop(key, None)
+    
+    if model is None:
+        return False
+    
+    model.unload()
+    logger.info(f"Unloaded embedding model {key[0]} from {key[1]}")
+    return True
+
+def unload_all() -> None:
+    """Unload every registered model."""
+    with _lock:
+        models = list(_models.values())
+        _models.clear()
+    
+    for model in models:
+        model.unload()
+
+def loaded_models() -> List[Tuple[str, str, torch.dtype]]:
+    """List the (model name, device, dtype) keys currently loaded."""
+    with _lock:
+        return list(_models)
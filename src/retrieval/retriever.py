@@ -1,8 +1,11 @@
-from typing import List, Dict, Any
-from ..models.embedding_model import NVEmbedPipeline
-from ..database.qdrant_connector import QdrantConnector
+from typing import List, Dict, Any, Optional
+from ..models.registry import get_embedding_model
+from ..database.vector_store import create_vector_store, canonical_payload
 from ..core.config import TOP_K_RESULTS
 
+# Constant query used to browse a chapter; its embedding is served from the query cache
+CHAPTER_BROWSE_QUERY = "educational content and learning material"
+
 class DocumentRetriever:
     """
     Document retrieval system using embeddings and vector database
@@ -10,8 +13,8 @@ class DocumentRetriever:
     
     def __init__(self):
         """Initialize the retriever with embedding model and database"""
-        self.embedding_model = NVEmbedPipeline()
-        self.vector_db = QdrantConnector()
+        self.embedding_model = get_embedding_model()
+        self.vector_db = create_vector_store()
         print("🔍 Document retriever initialized")
     
     def retrieve_relevant_documents(
@@ -19,7 +22,8 @@ class DocumentRetriever:
         query: str, 
         top_k: int = None,
         filter_chapter: str = None,
-        filter_content_type: str = None
+        filter_content_type: str = None,
+        filter_subject: str = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve documents relevant to the query
@@ -29,6 +33,7 @@ class DocumentRetriever:
             top_k: Number of documents to retrieve
             filter_chapter: Optional chapter filter
             filter_content_type: Optional content type filter
+            filter_subject: Optional subject filter (chunks without a subject still match)
             
         Returns:
             List of relevant documents with metadata
@@ -43,12 +48,12 @@ class DocumentRetriever:
             query_embedding = self.embedding_model.embed_query(query)
             
             # Search in vector database
-            results = self.vector_db.search_documents(
-                query_embedding=query_embedding,
-                top_k=top_k,
-                filter_chapter=filter_chapter,
-                filter_content_type=filter_content_type
+            points = self.vector_db.search_documents(
+                query_vector=query_embedding,
+                limit=top_k,
+                filter=self._build_filter(filter_chapter, filter_content_type, filter_subject)
             )
+            results = [self._format_result(point) for point in points]
             
             print(f"📊 Found {len(results)} relevant documents")
             
@@ -81,15 +86,15 @@ class DocumentRetriever:
         
         try:
             # Use a generic query with chapter filter
-            generic_query = "educational content and learning material"
-            query_embedding = self.embedding_model.embed_query(generic_query)
+            query_embedding = self.embedding_model.embed_query(CHAPTER_BROWSE_QUERY)
             
             # Search with chapter filter
-            results = self.vector_db.search_documents(
-                query_embedding=query_embedding,
-                top_k=top_k,
-                filter_chapter=chapter
+            points = self.vector_db.search_documents(
+                query_vector=query_embedding,
+                limit=top_k,
+                filter=self._build_filter(chapter)
             )
+            results = [self._format_result(point) for point in points]
             
             print(f"📊 Found {len(results)} documents in chapter {chapter}")
             return results
@@ -119,18 +124,98 @@ class DocumentRetriever:
         """
         print(f"📖 Retrieving context for topic: '{topic}'")
         
-        # Create enhanced query
-        enhanced_query = f"{topic} educational content lesson material"
-        if subject:
-            enhanced_query += f" {subject}"
-        
         # Retrieve relevant documents
         documents = self.retrieve_relevant_documents(
-            query=enhanced_query,
+            query=self._enhance_query(topic, subject),
             top_k=top_k,
-            filter_chapter=chapter
+            filter_chapter=chapter,
+            filter_subject=subject
         )
         
+        return self.format_context(topic, documents)
+    
+    def retrieve_contexts_batch(self, requests: List[Dict[str, Any]], top_k: int = 5) -> List[str]:
+        """
+        Retrieve and format generation context for many topics at once
+        
+        All queries are embedded in one model batch and searched in one
+        vector database request.
+        
+        Args:
+            requests: Dicts with 'topic' and optional 'subject' and 'chapter'
+            top_k: Number of documents to retrieve per topic
+            
+        Returns:
+            Formatted context string per request, in input order
+        """
+        if not requests:
+            return []
+        
+        print(f"📖 Retrieving context for {len(requests)} topics in one batch")
+        
+        queries = [self._enhance_query(req["topic"], req.get("subject")) for req in requests]
+        query_embeddings = self.embedding_model.embed_queries(queries)
+        
+        batch_results = self.vector_db.search_batch(
+            query_embeddings,
+            limit=top_k,
+            filters=[self._build_filter(req.get("chapter"), subject=req.get("subject")) for req in requests]
+        )
+        
+        return [
+            self.format_context(req["topic"], [self._format_result(point) for point in points])
+            for req, points in zip(requests, batch_results)
+        ]
+    
+    @staticmethod
+    def _enhance_query(topic: str, subject: str = None) -> str:
+        """Create the enhanced retrieval query for a lesson topic"""
+        enhanced_query = f"{topic} educational content lesson material"
+        if subject:
+            enhanced_query += f" {subject}"
+        return enhanced_query
+    
+    @staticmethod
+    def _build_filter(chapter: str = None, content_type: str = None, subject: str = None) -> Optional[Dict[str, Any]]:
+        """Build a vector database filter for an optional chapter, content type and subject"""
+        conditions = []
+        if chapter:
+            conditions.append({"key": "metadata.chapter", "match": {"value": chapter}})
+        if content_type:
+            conditions.append({"key": "metadata.type", "match": {"value": content_type}})
+        if subject:
+            # Textbook chunks are often ingested without a subject; only exclude other subjects
+            conditions.append({"should": [
+                {"key": "metadata.subject", "match": {"value": subject}},
+                {"is_empty": {"key": "metadata.subject"}}
+            ]})
+        return {"must": conditions} if conditions else None
+    
+    @staticmethod
+    def _format_result(point: Any) -> Dict[str, Any]:
+        """Convert a vector database hit into a retrieval result dictionary"""
+        payload = canonical_payload(point.payload)
+        metadata = payload["metadata"]
+        return {
+            "id": point.id,
+            "score": point.score,
+            "text": payload["text"],
+            "chapter": metadata.get("chapter", ""),
+            "content_type": metadata.get("type", ""),
+            "metadata": metadata
+        }
+    
+    def format_context(self, topic: str, documents: List[Dict[str, Any]]) -> str:
+        """
+        Format retrieved documents as generation context
+        
+        Args:
+            topic: Main topic for the lesson plan
+            documents: Retrieved documents
+            
+        Returns:
+            Formatted context string
+        """
         if not documents:
             print("⚠️ No relevant documents found")
             return "No relevant educational content found for this topic."
@@ -6,7 +6,11 @@ This script provides information about your collection.
 
 import sys
 import os
-from qdrant_client import QdrantClient
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.database.client import create_client, resolve_collection
 
 # Collection name to check
 COLLECTION_NAME = "science_9_collection"
@@ -16,7 +20,8 @@ QDRANT_PORT = 6333
 def check_collection(collection_name=COLLECTION_NAME):
     """Check collection status and display info."""
     print(f"🔍 Checking collection: {collection_name}")
-    client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+    # Embedded when QDRANT_MODE is "local" or "memory"
+    client = create_client(host=QDRANT_HOST, port=QDRANT_PORT)
     
     try:
         # Check if collection exists
@@ -24,12 +29,16 @@ def check_collection(collection_name=COLLECTION_NAME):
         collection_names = [c.name for c in collections.collections]
         print(f"Available collections: {collection_names}")
         
-        if collection_name not in collection_names:
+        # The name may be an alias pointing at a versioned collection
+        target = resolve_collection(client, collection_name)
+        if target is None:
             print(f"❌ Collection '{collection_name}' not found!")
             return
+        if target != collection_name:
+            print(f"🔀 '{collection_name}' is an alias for '{target}'")
         
         # Get collection info
-        info = client.get_collection(collection_name)
+        info = client.get_collection(target)
         vector_size = info.config.params.vectors.size
         distance = info.config.params.vectors.distance
         
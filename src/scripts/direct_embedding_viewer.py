@@ -16,7 +16,8 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
 sys.path.append(project_root)
 
 # Now imports from src will work
-from src.models.embedding_model import NVEmbedPipeline
+from src.models.registry import get_embedding_model
+from src.database.numpy_store import NumpyVectorStore
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -84,7 +85,7 @@ def view_embeddings(file_path=None):
     print(f"Extracted {len(chunks)} text chunks from document")
     
     # Initialize embedding model
-    model = NVEmbedPipeline()
+    model = get_embedding_model()
     
     # Generate embeddings (one at a time to avoid memory issues)
     embeddings = []
@@ -187,22 +188,16 @@ def search_with_query(query, embeddings, chunks, metadata):
         return
     
     # Get query embedding
-    model = NVEmbedPipeline()
+    model = get_embedding_model()
     query_embedding = np.array(model.embed_query(query))
     
-    # Normalize query vector
-    query_norm = query_embedding / np.linalg.norm(query_embedding)
-    
-    # Calculate similarities
-    similarities = []
-    for i, emb in enumerate(embeddings):
-        emb_array = np.array(emb)
-        emb_norm = emb_array / np.linalg.norm(emb_array)
-        similarity = np.dot(query_norm, emb_norm)
-        similarities.append((i, similarity))
-    
-    # Sort by similarity (highest first)
-    similarities.sort(key=lambda x: x[1], reverse=True)
+    # Index the chunks in memory and search them in one matrix product
+    store = NumpyVectorStore(path=None, collection_name="viewer", vector_size=len(embeddings[0]))
+    store.insert_documents(
+        [{"id": i, "text": chunk, "metadata": meta} for i, (chunk, meta) in enumerate(zip(chunks, metadata))],
+        embeddings
+    )
+    similarities = [(result.id, result.score) for result in store.search_documents(query_embedding, limit=3)]
     
     # Print results
     print(f"\n🔍 Search results for: '{query}'")
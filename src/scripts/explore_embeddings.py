@@ -16,8 +16,9 @@ from tabulate import tabulate  # pip install tabulate
 # Add parent directory to path to import modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
-from src.models.embedding_model import NVEmbedPipeline
+from src.models.registry import get_embedding_model
 from src.database.qdrant_connector import QdrantConnector
+from src.database.client import create_client, resolve_collection
 from src.core.config import QDRANT_HOST, QDRANT_PORT
 
 # Configure logging
@@ -37,21 +38,17 @@ def get_collection_info(collection_name: str = "science_9_collection") -> Dict[s
     Returns:
         Dictionary with collection information
     """
-    from qdrant_client import QdrantClient
-    
-    client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+    client = create_client(host=QDRANT_HOST, port=QDRANT_PORT)
     
     try:
-        # Check if collection exists
-        collections = client.get_collections()
-        collection_names = [c.name for c in collections.collections]
-        
-        if collection_name not in collection_names:
+        # Check if collection exists (directly or through an alias)
+        target = resolve_collection(client, collection_name)
+        if target is None:
             logger.error(f"Collection '{collection_name}' not found.")
             return {}
         
         # Get collection info
-        collection_info = client.get_collection(collection_name)
+        collection_info = client.get_collection(target)
         
         # Get collection size
         collection_size = client.count(collection_name).count
@@ -96,9 +93,7 @@ def list_documents(collection_name: str = "science_9_collection", limit: int = 1
     Returns:
         List of document dictionaries
     """
-    from qdrant_client import QdrantClient
-    
-    client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+    client = create_client(host=QDRANT_HOST, port=QDRANT_PORT)
     
     try:
         # Get documents
@@ -145,14 +140,13 @@ def semantic_search(query: str, collection_name: str = "science_9_collection", l
         List of search results
     """
     # Load embedding model
-    embedding_model = NVEmbedPipeline()
+    embedding_model = get_embedding_model()
     
     # Generate query embedding
     query_embedding = embedding_model.embed_query(query)
     
     # Search Qdrant
-    from qdrant_client import QdrantClient
-    client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+    client = create_client(host=QDRANT_HOST, port=QDRANT_PORT)
     
     try:
         # Perform search
@@ -197,12 +191,10 @@ def export_collection(collection_name: str = "science_9_collection", output_path
     Returns:
         Path to the exported file
     """
-    from qdrant_client import QdrantClient
-    
     if output_path is None:
         output_path = f"{collection_name}_export.json"
     
-    client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+    client = create_client(host=QDRANT_HOST, port=QDRANT_PORT)
     
     try:
         # Get all documents
@@ -1,106 +1,100 @@
 #!/usr/bin/env python3
 """
 Export embeddings from Qdrant to a file for sharing.
+Points are scrolled and written chunk by chunk into the streaming export
+format (vectors.npy + payloads.jsonl + manifest.json), so memory use does
+not grow with the collection.
 """
 
 import os
-import json
-import pickle
+import sys
+import argparse
 from datetime import datetime
-from qdrant_client import QdrantClient
 
-def export_embeddings(collection_name="science_9_collection", 
+import numpy as np
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.database.client import create_client, resolve_collection
+from src.database.export_format import ExportWriter, EXPORT_DTYPES
+
+def export_embeddings(collection_name="science_9_collection",
                      export_dir="exports",
-                     include_vectors=True):
-    """Export embeddings from Qdrant to a file."""
-    # Create export directory if it doesn't exist
-    os.makedirs(export_dir, exist_ok=True)
+                     include_vectors=True,
+                     dtype="float32",
+                     batch_size=512):
+    """
+    Export a collection (or alias) into a new export directory.
     
-    # Connect to Qdrant
-    client = QdrantClient(host="localhost", port=6333)
-    
-    # Timestamp for filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    Args:
+        collection_name: Collection or alias to export
+        export_dir: Parent directory for exports
+        include_vectors: Export vectors as well as payloads
+        dtype: "float32" or "float16" for stored vectors
+        batch_size: Points per scroll request (and per write)
     
-    # Filename based on whether vectors are included
-    if include_vectors:
-        filename = f"{collection_name}_{timestamp}_with_vectors.pkl"
-    else:
-        filename = f"{collection_name}_{timestamp}_metadata_only.json"
+    Returns:
+        Path to the export directory
+    """
+    # Connect to Qdrant (embedded when QDRANT_MODE says so)
+    client = create_client()
     
-    export_path = os.path.join(export_dir, filename)
+    target = resolve_collection(client, collection_name)
+    if target is None:
+        raise ValueError(f"Collection '{collection_name}' not found")
+    dim = client.get_collection(target).config.params.vectors.size if include_vectors else 0
     
-    # Get all points from collection
-    points = []
-    offset = None
-    batch_size = 100
+    # Timestamp for directory name
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    suffix = "with_vectors" if include_vectors else "metadata_only"
+    export_path = os.path.join(export_dir, f"{collection_name}_{timestamp}_{suffix}")
     
     print(f"Exporting collection '{collection_name}'...")
     
-    while True:
-        records, next_offset = client.scroll(
-            collection_name=collection_name,
-            limit=batch_size,
-            offset=offset,
-            with_vectors=include_vectors,
-            with_payload=True
-        )
-        
-        if not records:
-            break
-        
-        for record in records:
-            point = {
-                "id": record.id,
-                "payload": record.payload
-            }
+    offset = None
+    with ExportWriter(export_path, collection_name, dim, dtype=dtype) as writer:
+        while True:
+            records, offset = client.scroll(
+                collection_name=target,
+                limit=batch_size,
+                offset=offset,
+                with_vectors=include_vectors,
+                with_payload=True
+            )
             
-            if include_vectors and record.vector:
-                point["vector"] = record.vector
-                
-            points.append(point)
-        
-        print(f"Fetched {len(points)} points so far...")
-        
-        if next_offset is None:
-            break
+            if records:
+                writer.write(
+                    [record.id for record in records],
+                    np.asarray([record.vector for record in records], dtype=np.float32) if include_vectors
+                    else np.zeros((len(records), 0), dtype=np.float32),
+                    [record.payload for record in records]
+                )
+                print(f"Fetched {writer.count} points so far...")
             
-        offset = next_offset
-    
-    # Export data
-    export_data = {
-        "collection_name": collection_name,
-        "timestamp": timestamp,
-        "count": len(points),
-        "points": points
-    }
-    
-    # Save to file
-    if include_vectors:
-        # Use pickle for vector data (more efficient)
-        with open(export_path, "wb") as f:
-            pickle.dump(export_data, f)
-    else:
-        # Use JSON for metadata only (more portable)
-        with open(export_path, "w", encoding="utf-8") as f:
-            json.dump(export_data, f, indent=2)
+            if offset is None:
+                break
+        
+        count = writer.count
     
-    print(f"✅ Exported {len(points)} points to {export_path}")
+    print(f"✅ Exported {count} points to {export_path}")
     return export_path
 
 if __name__ == "__main__":
-    import sys
-    
-    # Default values
-    collection = "science_9_collection"
-    vectors = True
-    
-    # Parse arguments
-    if len(sys.argv) > 1:
-        collection = sys.argv[1]
-        
-    if len(sys.argv) > 2:
-        vectors = sys.argv[2].lower() in ("true", "t", "yes", "y", "1")
+    parser = argparse.ArgumentParser(description='Export a Qdrant collection to a streaming export directory')
+    parser.add_argument('collection', nargs='?', default="science_9_collection", help='Collection or alias to export')
+    parser.add_argument('--export-dir', default="exports", help='Parent directory for exports')
+    parser.add_argument('--dtype', choices=EXPORT_DTYPES, default="float32",
+                        help='Stored vector precision (float16 halves the size)')
+    parser.add_argument('--batch-size', type=int, default=512, help='Points per scroll request')
+    parser.add_argument('--no-vectors', action='store_true', help='Export payloads only')
+    args = parser.parse_args()
     
-    export_path = export_embeddings(collection, include_vectors=vectors)
-    print(f"Export complete: {export_path}")
\ No newline at end of file
+    export_path = export_embeddings(
+        args.collection,
+        export_dir=args.export_dir,
+        include_vectors=not args.no_vectors,
+        dtype=args.dtype,
+        batch_size=args.batch_size
+    )
+    print(f"Export complete: {export_path}")
@@ -5,7 +5,8 @@ Fix existing science_9_collection with correct settings.
 
 from qdrant_client import QdrantClient, models
 import logging
-from src.models.embedding_model import NVEmbedPipeline
+from src.models.registry import get_embedding_model
+from src.core.config import QDRANT_VECTOR_SIZE
 from typing import List, Dict, Any, Tuple
 import json
 from pathlib import Path
@@ -17,7 +18,7 @@ logger = logging.getLogger(__name__)
 
 # Collection settings
 COLLECTION_NAME = "science_9_collection"
-VECTOR_SIZE = 4096
+VECTOR_SIZE = QDRANT_VECTOR_SIZE  # Projected size when EMBEDDING_PROJECTION is set
 
 def load_improved_data(data_dir: str = "data/improved") -> List[Dict[str, Any]]:
     """Load the improved data from JSON files."""
@@ -70,9 +71,9 @@ def prepare_documents(data: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict]
     logger.info(f"Prepared {len(texts)} text chunks")
     return texts, metadata
 
-def generate_embeddings(texts: List[str]) -> List[List[float]]:
-    """Generate embeddings using the NVEmbedPipeline."""
-    model = NVEmbedPipeline()
+def generate_embeddings(texts: List[str]) -> np.ndarray:
+    """Generate embeddings using the shared NV-Embed pipeline."""
+    model = get_embedding_model()
     
     start_time = time.time()
     embeddings = model.embed_texts(texts)
@@ -81,7 +82,7 @@ def generate_embeddings(texts: List[str]) -> List[List[float]]:
     logger.info(f"Generated {len(embeddings)} embeddings in {duration:.2f} seconds")
     
     # Verify embeddings
-    if embeddings:
+    if len(embeddings):
         logger.info(f"First embedding length: {len(embeddings[0])}")
     
     return embeddings
@@ -134,20 +135,14 @@ def fix_collection():
                 logger.warning(f"Embedding {point_id} has wrong size: {len(embedding)}")
                 continue
             
-            # Ensure vector values are valid floats
-            valid_embedding = True
-            for val in embedding:
-                if not np.isfinite(val):  # Check for NaN or Inf
-                    valid_embedding = False
-                    break
-            
-            if not valid_embedding:
+            # Ensure vector values are valid floats (no NaN or Inf)
+            if not np.isfinite(embedding).all():
                 logger.warning(f"Embedding {point_id} contains invalid values")
                 continue
                 
             point = models.PointStruct(
                 id=point_id,
-                vector=embedding,
+                vector=embedding.tolist(),
                 payload={
                     "text": text,
                     "metadata": meta
@@ -2,15 +2,24 @@
 """
 Import embeddings from an exported file into Qdrant.
 This allows using pre-generated embeddings without having to regenerate them.
+Streaming export directories are read chunk by chunk from a memory-mapped
+vector file; legacy single-pickle exports are still accepted.
 """
 import os
+import sys
 import pickle
+import argparse
 import logging
-from typing import Union, Optional
+from typing import Union, Optional, Iterator, Tuple, Dict, Any
 from pathlib import Path
 
-from qdrant_client import QdrantClient
-from src.core.config import QDRANT_HOST, QDRANT_PORT
+import numpy as np
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.database.export_format import read_manifest, verify_export, iter_export
+from src.database.vector_store import VectorStore, create_vector_store, canonical_payload
 
 # Configure logging
 logging.basicConfig(
@@ -19,32 +28,75 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _open_legacy_export(import_file: Union[str, Path], chunk_size: int) -> Tuple[Dict[str, Any], Iterator]:
+    """
+    Load an old single-pickle export.
+    
+    Those files hold every point in memory and never recorded the vector
+    size, so it is taken from the first point.
+    
+    Returns:
+        Tuple of (manifest-like dict, chunk iterator)
+    """
+    logger.warning(f"{import_file} is a legacy pickle export; it is loaded whole into memory")
+    with open(import_file, "rb") as f:
+        export_data = pickle.load(f)
+    
+    points = export_data["points"]
+    manifest = {
+        "collection_name": export_data["collection_name"],
+        "count": len(points),
+        "dim": export_data.get("vector_size") or (len(points[0]["vector"]) if points and "vector" in points[0] else 0)
+    }
+    
+    def chunks():
+        for i in range(0, len(points), chunk_size):
+            batch = points[i:i+chunk_size]
+            yield ([p["id"] for p in batch],
+                   np.asarray([p["vector"] for p in batch], dtype=np.float32),
+                   [p["payload"] for p in batch])
+    
+    return manifest, chunks()
+
 def import_collection(
-    import_file: Union[str, Path], 
+    import_file: Union[str, Path],
     collection_name: Optional[str] = None,
-    replace_existing: bool = True
+    replace_existing: bool = True,
+    chunk_size: int = 2000,
+    verify: bool = True,
+    backend: Optional[str] = None
 ) -> bool:
     """
-    Import a collection from an exported file into Qdrant.
+    Import a collection from an export into the configured vector store.
     
     Args:
-        import_file: Path to the exported collection file
+        import_file: Export directory (or legacy .pkl export file)
         collection_name: Optional name for the imported collection (default: use original name)
         replace_existing: Whether to replace existing collection with same name
-        
+        chunk_size: Points read and uploaded per chunk
+        verify: Check the manifest checksums before importing
+        backend: Vector store backend (default: VECTOR_STORE_BACKEND)
+    
     Returns:
         True if import was successful
     """
     logger.info(f"Importing collection from {import_file}")
     
-    # Load the export file
-    with open(import_file, "rb") as f:
-        export_data = pickle.load(f)
+    if os.path.isdir(import_file):
+        manifest = read_manifest(import_file)
+        if verify and not verify_export(import_file, manifest):
+            return False
+        chunks = iter_export(import_file, chunk_size)
+    else:
+        manifest, chunks = _open_legacy_export(import_file, chunk_size)
     
-    original_name = export_data["collection_name"]
-    vector_size = export_data["vector_size"]
-    points = export_data["points"]
-    count = export_data["count"]
+    original_name = manifest["collection_name"]
+    vector_size = manifest["dim"]
+    count = manifest["count"]
+    
+    if not vector_size:
+        logger.error("Export contains no vectors (metadata-only export)")
+        return False
     
     # Use original name if not specified
     if collection_name is None:
@@ -53,54 +105,42 @@ def import_collection(
     logger.info(f"Importing collection '{original_name}' to '{collection_name}'")
     logger.info(f"Vector size: {vector_size}, Points: {count}")
     
-    # Connect to Qdrant
-    client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+    store = create_vector_store(backend=backend, collection_name=collection_name, vector_size=vector_size)
     
     try:
         # Check if collection exists
-        collections = client.get_collections()
-        collection_names = [c.name for c in collections.collections]
-        
-        if collection_name in collection_names:
-            if replace_existing:
-                logger.warning(f"Collection '{collection_name}' already exists. Recreating...")
-                client.delete_collection(collection_name)
-            else:
+        if store.get_vector_size() is not None:
+            if not replace_existing:
                 logger.error(f"Collection '{collection_name}' already exists and replace_existing=False")
                 return False
+            logger.warning(f"Collection '{collection_name}' already exists. Recreating...")
         
-        # Create collection
-        client.create_collection(
-            collection_name=collection_name,
-            vectors_config={
-                "size": vector_size,
-                "distance": "Cosine"
-            }
-        )
+        imported = 0
         
-        # Insert points in batches
-        batch_size = 100
-        for i in range(0, len(points), batch_size):
-            batch = points[i:i+batch_size]
-            
-            # Prepare points for insertion
-            upsert_points = []
-            for p in batch:
-                upsert_points.append({
-                    "id": p["id"],
-                    "vector": p["vector"],
-                    "payload": p["payload"]
-                })
-            
-            # Insert batch
-            client.upsert(
-                collection_name=collection_name,
-                points=upsert_points
-            )
-            
-            logger.info(f"Inserted {min(i+batch_size, len(points))}/{len(points)} points")
+        def populate(target: VectorStore) -> Optional[int]:
+            nonlocal imported
+            for ids, vectors, payloads in chunks:
+                documents = [{"id": point_id, **canonical_payload(payload)} for point_id, payload in zip(ids, payloads)]
+                if not target.insert_documents(documents, vectors):
+                    logger.error(f"Import stopped after {imported}/{count} points")
+                    return None
+                imported += len(ids)
+                logger.info(f"Inserted {imported}/{count} points")
+            return imported
         
-        logger.info(f"Successfully imported {len(points)} points to '{collection_name}'")
+        # recreate_collection refuses aliases (e.g. after a blue/green
+        # rebuild); import into a fresh collection behind the alias instead
+        if getattr(store, "get_alias_target", lambda: None)() is not None:
+            logger.info(f"'{collection_name}' is an alias; importing behind it with a blue/green rebuild")
+            if not store.blue_green_rebuild(populate):
+                return False
+        else:
+            if not store.recreate_collection():
+                return False
+            if populate(store) is None:
+                return False
+        
+        logger.info(f"Successfully imported {imported} points to '{collection_name}'")
         return True
     
     except Exception as e:
@@ -108,19 +148,26 @@ def import_collection(
         raise
 
 if __name__ == "__main__":
-    import sys
+    parser = argparse.ArgumentParser(description='Import an exported collection')
+    parser.add_argument('export_path', help='Export directory (or legacy .pkl file)')
+    parser.add_argument('collection_name', nargs='?', help='Target collection (default: original name)')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='Points per upload chunk')
+    parser.add_argument('--keep-existing', action='store_true', help='Fail instead of replacing an existing collection')
+    parser.add_argument('--no-verify', action='store_true', help='Skip checksum verification')
+    parser.add_argument('--backend', help='Vector store backend (default: VECTOR_STORE_BACKEND)')
+    args = parser.parse_args()
     
-    if len(sys.argv) < 2:
-        print("Usage: python import_embeddings.py <path_to_export_file> [collection_name]")
-        sys.exit(1)
-    
-    export_file = sys.argv[1]
-    collection_name = sys.argv[2] if len(sys.argv) > 2 else None
-    
-    success = import_collection(export_file, collection_name)
+    success = import_collection(
+        args.export_path,
+        args.collection_name,
+        replace_existing=not args.keep_existing,
+        chunk_size=args.chunk_size,
+        verify=not args.no_verify,
+        backend=args.backend
+    )
     
     if success:
         logger.info("✅ Import completed successfully!")
     else:
         logger.error("❌ Import failed.")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -9,7 +9,12 @@ import sys
 import os
 import json
 import time
-from typing import List, Dict, Any, Tuple
+import uuid
+import queue
+import hashlib
+import argparse
+import threading
+from typing import List, Dict, Any, Tuple, Iterator, Iterable, Optional
 from pathlib import Path
 import logging
 
@@ -17,9 +22,12 @@ import logging
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
 # Import required modules
-from src.models.embedding_model import NVEmbedPipeline
-from src.database.qdrant_connector import QdrantConnector
-from src.core.config import QDRANT_COLLECTION_NAME, QDRANT_HOST, QDRANT_PORT, QDRANT_VECTOR_SIZE
+from src.models.registry import get_embedding_model
+from src.database.vector_store import VectorStore, create_vector_store
+from src.core.config import (
+    QDRANT_COLLECTION_NAME, QDRANT_VECTOR_SIZE,
+    INGEST_BATCH_SIZE, INGEST_QUEUE_SIZE
+)
 
 # Configure logging
 logging.basicConfig(
@@ -28,6 +36,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Namespace for deriving stable point IDs from chunk IDs
+CHUNK_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "eduplan-ai/chunks")
+
 def load_improved_data(data_dir: str = "../../data/processed_improved") -> List[Dict[str, Any]]:
     """
     Load all improved data files from the specified directory.
@@ -61,18 +72,21 @@ def load_improved_data(data_dir: str = "../../data/processed_improved") -> List[
     
     return all_data
 
-def prepare_documents(improved_data: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict[str, Any]]]:
+def iter_documents(improved_data: List[Dict[str, Any]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
     """
     Extract text and metadata from improved data with optimized chunking.
     
+    Chunks are yielded as they are built so the ingest pipeline can start
+    embedding before every file has been chunked.
+    
     Args:
         improved_data: List of dictionaries containing improved data
     
-    Returns:
-        Tuple containing (text_chunks, metadata)
+    Yields:
+        Tuples of (text_chunk, metadata)
     """
-    texts = []
-    metadata = []
+    # Simple-format IDs are numbered by position in the overall output
+    emitted = 0
     
     for file_data in improved_data:
         filename = file_data["file"]
@@ -122,10 +136,7 @@ def prepare_documents(improved_data: List[Dict[str, Any]]) -> Tuple[List[str], L
                     # If adding this item would make the chunk too large, save current chunk
                     if len(current_chunk) + len(content_item) > 2000:  # ~500 tokens
                         if current_chunk:
-                            # Add the current chunk to our texts list
-                            texts.append(current_chunk)
-                            
-                            # Add corresponding metadata
+                            # Emit the current chunk with its metadata
                             meta = {
                                 "id": f"{filename}_s{section_idx}_chunk_{chunk_count}",
                                 "chapter": f"Chapter {chapter_number}",
@@ -134,16 +145,14 @@ def prepare_documents(improved_data: List[Dict[str, Any]]) -> Tuple[List[str], L
                                 "section": section_title,
                                 "chunk": chunk_count
                             }
-                            metadata.append(meta)
+                            yield current_chunk, meta
+                            emitted += 1
                             
                             # Start a new chunk
                             chunk_count += 1
                             current_chunk = content_item
                         else:
                             # If the item itself is very large, use it as a chunk
-                            texts.append(content_item)
-                            
-                            # Add corresponding metadata
                             meta = {
                                 "id": f"{filename}_s{section_idx}_chunk_{chunk_count}",
                                 "chapter": f"Chapter {chapter_number}",
@@ -152,7 +161,8 @@ def prepare_documents(improved_data: List[Dict[str, Any]]) -> Tuple[List[str], L
                                 "section": section_title,
                                 "chunk": chunk_count
                             }
-                            metadata.append(meta)
+                            yield content_item, meta
+                            emitted += 1
                             chunk_count += 1
                     else:
                         # Add to current chunk with a space
@@ -163,9 +173,6 @@ def prepare_documents(improved_data: List[Dict[str, Any]]) -> Tuple[List[str], L
                 
                 # Don't forget the last chunk
                 if current_chunk:
-                    texts.append(current_chunk)
-                    
-                    # Add corresponding metadata
                     meta = {
                         "id": f"{filename}_s{section_idx}_chunk_{chunk_count}",
                         "chapter": f"Chapter {chapter_number}",
@@ -174,7 +181,8 @@ def prepare_documents(improved_data: List[Dict[str, Any]]) -> Tuple[List[str], L
                         "section": section_title,
                         "chunk": chunk_count
                     }
-                    metadata.append(meta)
+                    yield current_chunk, meta
+                    emitted += 1
         
         elif isinstance(data, list) and all(isinstance(item, dict) for item in data):
             # Old format (simple list of dictionaries)
@@ -186,12 +194,9 @@ def prepare_documents(improved_data: List[Dict[str, Any]]) -> Tuple[List[str], L
                     if not content:
                         continue
                         
-                    # Add text to chunks
-                    texts.append(content)
-                    
                     # Prepare metadata
                     meta = {
-                        "id": f"{filename}_item_{len(texts)}",
+                        "id": f"{filename}_item_{emitted + 1}",
                         "chapter": item.get("chapter", chapter_name),
                         "source": filename,
                         "type": item.get("type", "unknown"),
@@ -200,101 +205,277 @@ def prepare_documents(improved_data: List[Dict[str, Any]]) -> Tuple[List[str], L
                         "subsection": item.get("subsection", ""),
                         "index": item.get("index", 0)
                     }
-                    metadata.append(meta)
+                    yield content, meta
+                    emitted += 1
                 except Exception as e:
                     logger.error(f"Error processing item in {filename}: {e}")
         
         else:
             logger.warning(f"Unknown data format for file: {filename}")
+
+def prepare_documents(improved_data: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Extract text and metadata from improved data with optimized chunking.
+    
+    Args:
+        improved_data: List of dictionaries containing improved data
+    
+    Returns:
+        Tuple containing (text_chunks, metadata)
+    """
+    texts = []
+    metadata = []
+    for text, meta in iter_documents(improved_data):
+        texts.append(text)
+        metadata.append(meta)
     
     logger.info(f"Prepared {len(texts)} documents with metadata")
     return texts, metadata
 
 
-def generate_embeddings(texts: List[str]) -> List[List[float]]:
+def point_id(original_id: str) -> str:
+    """
+    Derive a stable Qdrant point ID from a chunk's original ID.
+    
+    Args:
+        original_id: Chunk ID such as "Chapter_3_improved.json_s4_chunk_1"
+    
+    Returns:
+        UUIDv5 string that is the same on every run
+    """
+    return str(uuid.uuid5(CHUNK_ID_NAMESPACE, original_id))
+
+def content_hash(text: str, meta: Dict[str, Any]) -> str:
     """
-    Generate embeddings for text chunks using NV-Embed.
+    Hash everything stored for a chunk, so edits to text or metadata are detected.
     
     Args:
-        texts: List of text chunks to embed
+        text: Chunk text
+        meta: Chunk metadata as produced by ``iter_documents``
     
     Returns:
-        List of embedding vectors
+        Hex SHA-256 digest
     """
+    content = json.dumps({"text": text, "metadata": meta}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def iter_batches(documents: Iterable[Tuple[str, Dict[str, Any]]], batch_size: int) -> Iterator[Tuple[List[str], List[Dict[str, Any]]]]:
+    """
+    Group (text, metadata) pairs into batches.
+    
+    Args:
+        documents: Pairs as yielded by ``iter_documents``
+        batch_size: Number of chunks per batch
+    
+    Yields:
+        Tuples of (texts, metadata) with at most ``batch_size`` entries
+    """
+    texts, metadata = [], []
+    for text, meta in documents:
+        texts.append(text)
+        metadata.append(meta)
+        if len(texts) >= batch_size:
+            yield texts, metadata
+            texts, metadata = [], []
+    
+    if texts:
+        yield texts, metadata
+
+def sync_documents(improved_data: List[Dict[str, Any]], qdrant: VectorStore, existing: Dict[Any, str],
+                   batch_size: int = INGEST_BATCH_SIZE, queue_size: int = INGEST_QUEUE_SIZE) -> Optional[Dict[str, int]]:
+    """
+    Embed and store documents as a streaming pipeline.
+    
+    The calling thread chunks and embeds batches while a background thread
+    uploads finished batches to Qdrant. A bounded queue between them applies
+    backpressure, so at most ``queue_size`` embedded batches wait in memory
+    and total time approaches max(embedding, upload) rather than their sum.
+    
+    Each chunk gets a stable point ID from its original ID plus a content
+    hash; only chunks whose hash differs from ``existing`` are embedded and
+    upserted, and points whose chunks no longer exist are deleted once the
+    upload has finished. Chunks the model fails to embed are skipped (any
+    stored version is kept) so the next sync retries them.
+    
+    Args:
+        improved_data: List of dictionaries containing improved data
+        qdrant: Connector for the collection to write to
+        existing: Content hash of each point already stored, by point ID
+        batch_size: Number of chunks embedded and uploaded together
+        queue_size: Maximum number of embedded batches waiting for upload
+    
+    Returns:
+        Counts of 'upserted', 'unchanged', 'skipped' and 'deleted' documents, or None on failure
+    """
+    counts = {"upserted": 0, "unchanged": 0, "skipped": 0, "deleted": 0}
+    seen = set()
+    
+    def changed_documents():
+        for text, meta in iter_documents(improved_data):
+            doc_hash = content_hash(text, meta)
+            doc_id = point_id(meta["id"])
+            seen.add(doc_id)
+            if existing.get(doc_id) == doc_hash:
+                counts["unchanged"] += 1
+                continue
+            meta["original_id"] = meta["id"]
+            meta["content_hash"] = doc_hash
+            yield text, meta
+    
     logger.info("Initializing NV-Embed model...")
-    embedding_model = NVEmbedPipeline()
+    embedding_model = get_embedding_model()
+    
+    upload_queue = queue.Queue(maxsize=max(1, queue_size))
+    failed = threading.Event()
+    upload_time = [0.0]
+    
+    def upload_worker():
+        while True:
+            item = upload_queue.get()
+            if item is None:
+                return
+            # Keep draining after a failure so the producer never blocks
+            if failed.is_set():
+                continue
+            documents, embeddings = item
+            start_time = time.time()
+            try:
+                if not qdrant.insert_documents(documents, embeddings):
+                    failed.set()
+            except Exception as e:
+                # A dead worker would leave the producer blocked on put()
+                logger.error(f"Error uploading batch: {e}")
+                failed.set()
+            upload_time[0] += time.time() - start_time
+    
+    uploader = threading.Thread(target=upload_worker, name="qdrant-upload", daemon=True)
+    uploader.start()
     
-    logger.info(f"Generating embeddings for {len(texts)} documents...")
     start_time = time.time()
-    embeddings = embedding_model.embed_texts(texts)
+    embed_time = 0.0
+    try:
+        for texts, metadata in iter_batches(changed_documents(), batch_size):
+            if failed.is_set():
+                break
+            
+            batch_start = time.time()
+            embeddings, failed_rows = embedding_model.embed_texts(texts, return_failed=True)
+            embed_time += time.time() - batch_start
+            if len(embeddings) != len(texts):
+                logger.error(f"Embedding generation failed. Got {len(embeddings)} embeddings for {len(texts)} texts.")
+                failed.set()
+                break
+            
+            # A zero-vector fallback stored with its content hash would count
+            # as unchanged forever; leave it out so the next sync retries it
+            skipped = set(failed_rows)
+            keep = [row for row in range(len(texts)) if row not in skipped]
+            if failed_rows:
+                logger.warning(f"Skipping {len(failed_rows)} chunks that could not be embedded; they will be retried")
+                counts["skipped"] += len(failed_rows)
+                embeddings = embeddings[keep]
+            
+            documents = [
+                {"id": point_id(metadata[row]["original_id"]), "text": texts[row], "metadata": metadata[row]}
+                for row in keep
+            ]
+            counts["upserted"] += len(documents)
+            if not documents:
+                continue
+            
+            upload_queue.put((documents, embeddings))
+            logger.info(f"Embedded {counts['upserted']} new or changed documents so far")
+    finally:
+        upload_queue.put(None)
+        uploader.join()
+    
     elapsed = time.time() - start_time
+    logger.info(f"Pipeline finished in {elapsed:.2f}s (embedding {embed_time:.2f}s, upload {upload_time[0]:.2f}s)")
     
-    logger.info(f"Generated {len(embeddings)} embeddings in {elapsed:.2f} seconds")
+    if failed.is_set():
+        logger.error("Failed to store documents in database")
+        return None
     
-    # Debug: Check the format of embeddings
-    if embeddings and len(embeddings) > 0:
-        first_emb = embeddings[0]
-        logger.info(f"First embedding type: {type(first_emb)}")
-        logger.info(f"First embedding length: {len(first_emb)}")
-        if hasattr(first_emb, 'tolist') and callable(getattr(first_emb, 'tolist')):
-            logger.info("Converting embeddings from numpy/tensor to list format")
-            embeddings = [emb.tolist() for emb in embeddings]
+    # Only delete once every current chunk is safely stored
+    vanished = [doc_id for doc_id in existing if doc_id not in seen]
+    if vanished:
+        if not qdrant.delete_documents(vanished):
+            return None
+        counts["deleted"] = len(vanished)
     
-    return embeddings
+    logger.info(f"Sync complete: {counts['upserted']} upserted, {counts['unchanged']} unchanged, "
+                f"{counts['skipped']} skipped, {counts['deleted']} deleted")
+    return counts
 
-def store_in_database(texts, embeddings, metadata, collection_name="science_9_collection"):
+def ingest_documents(improved_data: List[Dict[str, Any]], collection_name: str = QDRANT_COLLECTION_NAME,
+                     batch_size: int = INGEST_BATCH_SIZE, queue_size: int = INGEST_QUEUE_SIZE,
+                     rebuild: bool = False) -> Optional[Dict[str, int]]:
     """
-    Store documents and embeddings in Qdrant.
+    Bring a collection up to date with the improved data.
+    
+    By default the collection is synced incrementally and stays online
+    throughout. With ``rebuild`` every chunk is re-embedded into a fresh
+    versioned collection, which replaces the old one by an atomic alias
+    swap once it has been verified, so searches are never interrupted.
     
     Args:
-        texts: List of text chunks
-        embeddings: List of embedding vectors
-        metadata: List of metadata dictionaries
-        collection_name: Name of the Qdrant collection
+        improved_data: List of dictionaries containing improved data
+        collection_name: Name (or alias) of the Qdrant collection
+        batch_size: Number of chunks embedded and uploaded together
+        queue_size: Maximum number of embedded batches waiting for upload
+        rebuild: Rebuild the collection from scratch behind its alias
+    
+    Returns:
+        Counts of 'upserted', 'unchanged', 'skipped' and 'deleted' documents, or None on failure
     """
     logger.info(f"Storing data in collection: {collection_name}")
+    logger.info(f"Using vector size: {QDRANT_VECTOR_SIZE}")
+    
+    qdrant = create_vector_store(collection_name=collection_name, vector_size=QDRANT_VECTOR_SIZE)
+    
+    if rebuild and not hasattr(qdrant, "blue_green_rebuild"):
+        # Backends without aliases rebuild in place
+        if not qdrant.recreate_collection():
+            return None
+        return sync_documents(improved_data, qdrant, {}, batch_size, queue_size)
     
-    # Always use 4096 for NV-Embed vector size
-    vector_size = 4096
-    logger.info(f"Using vector size: {vector_size}")
-    
-    # Create Qdrant connector
-    qdrant = QdrantConnector(
-        host=QDRANT_HOST,
-        port=QDRANT_PORT,
-        collection_name=collection_name,
-        vector_size=vector_size
-    )
-    
-    # Create collection if it doesn't exist
-    qdrant.recreate_collection()
-    
-    # Prepare documents for insertion
-    documents = []
-    for i, (text, meta) in enumerate(zip(texts, metadata)):
-        # Use numeric ID (required by Qdrant) but save original ID in metadata
-        original_id = meta.get("id", f"doc_{i}")
-        meta["original_id"] = original_id  # Keep the original ID in metadata
+    if rebuild:
+        result = {}
         
-        doc = {
-            "id": i,  # Use simple numeric ID for Qdrant
-            "text": text,
-            "metadata": meta
-        }
-        documents.append(doc)
-    
-    # Insert documents - don't pass batch_size to avoid parameter conflict
-    success = qdrant.insert_documents(documents, embeddings)
-    
-    if success:
-        logger.info(f"Successfully stored {len(documents)} documents in database")
-    else:
-        logger.error("Failed to store documents in database")
+        def populate(staging: VectorStore) -> Optional[int]:
+            counts = sync_documents(improved_data, staging, {}, batch_size, queue_size)
+            if counts is None:
+                return None
+            result.update(counts)
+            return counts["upserted"]
         
-    return success
+        return result if qdrant.blue_green_rebuild(populate) else None
+    
+    if not qdrant.ensure_collection():
+        return None
+    
+    # A projection change alters the stored dimension; syncing cannot fix that
+    stored_size = qdrant.get_vector_size()
+    if stored_size is None:
+        return None
+    if stored_size != QDRANT_VECTOR_SIZE:
+        logger.error(f"Collection stores {stored_size}-dim vectors but {QDRANT_VECTOR_SIZE} are configured; "
+                     f"run with --rebuild")
+        return None
+    
+    existing = qdrant.get_payload_values("metadata.content_hash")
+    if existing is None:
+        return None
+    logger.info(f"Found {len(existing)} documents already in the collection")
+    
+    return sync_documents(improved_data, qdrant, existing, batch_size, queue_size)
 
 def main():
     """Main processing function"""
+    parser = argparse.ArgumentParser(description='Embed improved data and sync it into Qdrant')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the collection from scratch behind its alias')
+    args = parser.parse_args()
+    
     logger.info("Starting improved data processing with NV-Embed")
     
     # Load improved data
@@ -303,26 +484,16 @@ def main():
         logger.error("No improved data found. Exiting.")
         return
     
-    # Prepare documents
-    texts, metadata = prepare_documents(improved_data)
-    if not texts:
-        logger.error("No text chunks extracted. Exiting.")
-        return
-    
-    # Generate embeddings
-    embeddings = generate_embeddings(texts)
-    if not embeddings or len(embeddings) != len(texts):
-        logger.error(f"Embedding generation failed. Got {len(embeddings)} embeddings for {len(texts)} texts.")
-        return
-    
-    # Store in database - fix the argument order
-    success = store_in_database(texts, embeddings, metadata)
+    # Chunk, embed and store as one streaming pipeline
+    counts = ingest_documents(improved_data, rebuild=args.rebuild)
     
-    if success:
-        logger.info(f"✅ Processing completed successfully!")
-        logger.info(f"   Processed {len(texts)} documents across {len(improved_data)} files")
-    else:
+    if counts is None:
         logger.error("❌ Processing failed.")
+    elif counts["upserted"] + counts["unchanged"] + counts["skipped"] == 0:
+        logger.error("No text chunks extracted. Exiting.")
+    else:
+        logger.info(f"✅ Processing completed successfully!")
+        logger.info(f"   Synced {counts['upserted'] + counts['unchanged']} documents across {len(improved_data)} files")
 
 if __name__ == "__main__":
     main()
@@ -12,8 +12,9 @@ from typing import List, Dict, Any
 # Add parent directory to path to import modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
-from src.models.embedding_model import NVEmbedPipeline
+from src.models.registry import get_embedding_model
 from src.database.qdrant_connector import QdrantConnector
+from src.database.client import resolve_collection
 from qdrant_client import QdrantClient
 
 def search(query: str, collection_name: str = "science_9_collection", top_k: int = 3):
@@ -28,7 +29,7 @@ def search(query: str, collection_name: str = "science_9_collection", top_k: int
     print(f"🔍 Searching for: '{query}'")
     
     # Create embedding model
-    embedding_model = NVEmbedPipeline()
+    embedding_model = get_embedding_model()
     
     # Generate query embedding
     query_embedding = embedding_model.embed_query(query)
@@ -159,7 +160,8 @@ def list_document_ids(collection_name: str = "science_9_collection", limit: int
         collections = client.get_collections()
         collection_names = [c.name for c in collections.collections]
         
-        if collection_name not in collection_names:
+        target = resolve_collection(client, collection_name)
+        if target is None:
             print(f"❌ Collection '{collection_name}' not found")
             print(f"Available collections: {collection_names}")
             return
@@ -168,7 +170,7 @@ def list_document_ids(collection_name: str = "science_9_collection", limit: int
         
         try:
             # Try a simpler approach first - just get the collection info
-            collection_info = client.get_collection(collection_name)
+            collection_info = client.get_collection(target)
             print(f"Collection exists with config: {collection_info.config.params}")
             
             # Try to count the documents
@@ -5,7 +5,7 @@ Simple semantic search tool for your fixed collection.
 
 import sys
 import logging
-from src.models.embedding_model import NVEmbedPipeline
+from src.models.registry import get_embedding_model
 from qdrant_client import QdrantClient
 # Add this import
 from qdrant_client import models
@@ -19,7 +19,7 @@ def search(query_text, collection_name="science_9_collection", limit=3):
     print(f"🔍 Searching for: '{query_text}'")
     
     # Generate query embedding
-    model = NVEmbedPipeline()
+    model = get_embedding_model()
     query_embedding = model.embed_query(query_text)
     print(f"Generated embedding of dimension {len(query_embedding)}")
     
@@ -0,0 +1,3 @@
+"""
+Long-lived lesson plan service and its thin HTTP client
+"""
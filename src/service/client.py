@@ -0,0 +1,74 @@
+"""
+Thin HTTP client for the EduPlan AI lesson plan service.
+Uses only the standard library so callers avoid importing torch or Qdrant.
+"""
+
+import json
+import urllib.error
+import urllib.request
+from typing import Dict, Any
+
+from common.config import API_HOST, API_PORT
+
+DEFAULT_SERVICE_URL = f"http://{API_HOST}:{API_PORT}"
+
+def _post(url: str, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    """POST a JSON payload and decode the JSON response."""
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        # Service errors carry a JSON body with an "error" field; proxies and
+        # server crashes may answer with HTML or plain text instead
+        text = e.read().decode("utf-8", errors="replace")
+        try:
+            body = json.loads(text or "{}")
+        except ValueError:
+            body = None
+        if isinstance(body, dict) and body.get("error"):
+            raise RuntimeError(body["error"]) from e
+        raise RuntimeError(f"HTTP {e.code}: {text.strip()[:500]}" if text.strip() else f"HTTP {e.code}") from e
+
+def is_service_available(base_url: str = DEFAULT_SERVICE_URL, timeout: float = 1.0) -> bool:
+    """Check whether the service answers its health endpoint."""
+    try:
+        with urllib.request.urlopen(f"{base_url}/health", timeout=timeout) as response:
+            return response.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+def request_lesson_plan(topic: str, chapter: str = None, subject: str = None,
+                        base_url: str = DEFAULT_SERVICE_URL, timeout: float = 300.0) -> Dict[str, Any]:
+    """
+    Ask the service to generate a lesson plan.
+    
+    Args:
+        topic: Lesson plan topic
+        chapter: Optional chapter filter
+        subject: Optional subject filter
+        base_url: Service base URL
+        timeout: Request timeout in seconds
+        
+    Returns:
+        Lesson plan as returned by the service
+    """
+    return _post(
+        f"{base_url}/lesson-plan",
+        {"topic": topic, "chapter": chapter, "subject": subject},
+        timeout
+    )
+
+def request_search(query: str, chapter: str = None, subject: str = None, top_k: int = 5,
+                   base_url: str = DEFAULT_SERVICE_URL, timeout: float = 60.0) -> Dict[str, Any]:
+    """Ask the service for documents relevant to a query."""
+    return _post(
+        f"{base_url}/search",
+        {"query": query, "chapter": chapter, "subject": subject, "top_k": top_k},
+        timeout
+    )
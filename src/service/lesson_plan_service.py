@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Lesson plan service for EduPlan AI.
+A persistent local HTTP service that keeps the embedding model, Qdrant client
+and lesson plan generator warm, so each request costs query time rather than
+model-load time.
+"""
+
+import os
+import sys
+import time
+import logging
+
+from flask import Flask, request, jsonify
+
+# Add the project root to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from common.config import API_HOST, API_PORT
+from src.generators.lesson_plan_generator import LessonPlanGenerator
+from src.models.registry import loaded_models
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def create_app(generator: LessonPlanGenerator = None) -> Flask:
+    """
+    Create the Flask app around a warm lesson plan generator.
+    
+    Args:
+        generator: Generator to serve (default: build one now, loading the
+            embedding model and connecting to Qdrant up front)
+            
+    Returns:
+        Configured Flask application
+    """
+    if generator is None:
+        start_time = time.time()
+        generator = LessonPlanGenerator()
+        logger.info(f"Warmed up lesson plan generator in {time.time() - start_time:.2f} seconds")
+    
+    app = Flask(__name__)
+    
+    @app.route('/health')
+    def health_check():
+        """Health check endpoint"""
+        return jsonify({
+            "status": "healthy",
+            "service": "EduPlan AI lesson plan service",
+            "models": [f"{name} ({device}, {dtype})" for name, device, dtype in loaded_models()],
+            "query_cache": generator.embedder.query_cache.stats()
+        })
+    
+    @app.route('/search', methods=['POST'])
+    def search():
+        """Retrieve documents relevant to a query"""
+        try:
+            data = request.get_json()
+            
+            # Validate required fields
+            if not data or 'query' not in data:
+                return jsonify({"error": "Query is required"}), 400
+            
+            results = generator.retrieve_context(
+                query=data['query'],
+                filter_chapter=data.get('chapter') or None,
+                filter_subject=data.get('subject') or None,
+                top_k=int(data.get('top_k', 5))
+            )
+            
+            return jsonify({"query": data['query'], "results": results})
+            
+        except Exception as e:
+            logger.error(f"Error searching: {e}")
+            return jsonify({"error": f"Error searching: {str(e)}"}), 500
+    
+    @app.route('/lesson-plan', methods=['POST'])
+    def lesson_plan():
+        """Generate a lesson plan for a topic"""
+        try:
+            data = request.get_json()
+            
+            # Validate required fields
+            if not data or 'topic' not in data:
+                return jsonify({"error": "Topic is required"}), 400
+            
+            start_time = time.time()
+            result = generator.generate_lesson_plan(
+                query=data['topic'],
+                filter_chapter=data.get('chapter') or None,
+                filter_subject=data.get('subject') or None
+            )
+            logger.info(f"Generated lesson plan for '{data['topic']}' in {time.time() - start_time:.2f} seconds")
+            
+            return jsonify(result)
+            
+        except Exception as e:
+            logger.error(f"Error generating lesson plan: {e}")
+            return jsonify({"error": f"Error generating lesson plan: {str(e)}"}), 500
+    
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({"error": "Endpoint not found"}), 404
+    
+    return app
+
+def run_server(host: str = API_HOST, port: int = API_PORT) -> None:
+    """Warm up the generator and serve requests until interrupted."""
+    app = create_app()
+    print(f"🚀 EduPlan AI service listening on http://{host}:{port}")
+    app.run(host=host, port=port, debug=False, threaded=True)
+
+if __name__ == "__main__":
+    run_server()
@@ -0,0 +1,12 @@
+"""
+Shared pytest setup for EduPlan AI.
+Puts the project root and scripts/ on the path the same way the scripts do.
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, "scripts")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,101 @@
+"""
+Tests for the persistent embedding cache (LRU over a memory-mapped matrix)
+and the in-process query cache.
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from src.models import embedding_cache
+from src.models.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing time so LRU order does not depend on timer resolution."""
+    ticks = itertools.count(1)
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: float(next(ticks)))
+
+
+def vectors_for(keys, dim=4):
+    return np.array([[float(ord(key[0]))] * dim for key in keys], dtype=np.float32)
+
+
+def test_round_trip_and_miss(tmp_path, clock):
+    cache = EmbeddingCache(str(tmp_path), dim=4, max_entries=8)
+    cache.put_many(["a", "b"], vectors_for("ab"))
+    
+    vectors, found = cache.get_many(["b", "zz", "a"])
+    assert found.tolist() == [True, False, True]
+    np.testing.assert_array_equal(vectors[[0, 2]], vectors_for("ba"))
+    assert not vectors[1].any()
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = EmbeddingCache(str(tmp_path), dim=4, max_entries=3)
+    cache.put_many(["a", "b", "c"], vectors_for("abc"))
+    cache.get_many(["a"])  # b is now the oldest
+    cache.put_many(["d"], vectors_for("d"))
+    
+    vectors, found = cache.get_many(["a", "b", "c", "d"])
+    assert found.tolist() == [True, False, True, True]
+    np.testing.assert_array_equal(vectors[[0, 2, 3]], vectors_for("acd"))
+    assert len(cache) == 3
+
+
+def test_overwriting_a_key_does_not_evict_it(tmp_path, clock):
+    cache = EmbeddingCache(str(tmp_path), dim=4, max_entries=2)
+    cache.put_many(["a", "b"], vectors_for("ab"))
+    cache.put_many(["a", "c"], vectors_for("xc"))
+    
+    vectors, found = cache.get_many(["a", "b", "c"])
+    assert found.tolist() == [True, False, True]
+    np.testing.assert_array_equal(vectors[[0, 2]], vectors_for("xc"))
+
+
+def test_vectors_persist_across_reopen(tmp_path, clock):
+    cache = EmbeddingCache(str(tmp_path), dim=4, max_entries=8)
+    cache.put_many(["a", "b"], vectors_for("ab"))
+    cache.close()
+    
+    reopened = EmbeddingCache(str(tmp_path), dim=4, max_entries=8)
+    vectors, found = reopened.get_many(["a", "b"])
+    assert found.all()
+    np.testing.assert_array_equal(vectors, vectors_for("ab"))
+    reopened.close()
+
+
+def test_layout_change_resets_the_cache(tmp_path, clock):
+    cache = EmbeddingCache(str(tmp_path), dim=4, max_entries=8)
+    cache.put_many(["a"], vectors_for("a"))
+    cache.close()
+    
+    resized = EmbeddingCache(str(tmp_path), dim=6, max_entries=8)
+    assert len(resized) == 0
+    assert not resized.get_many(["a"])[1].any()
+    resized.close()
+
+
+def test_keys_ignore_whitespace_but_not_model_settings():
+    key = EmbeddingCache.make_key("model", 512, "mean", "Hello  world\n")
+    assert key == EmbeddingCache.make_key("model", 512, "mean", "Hello world")
+    assert key != EmbeddingCache.make_key("model", 256, "mean", "Hello world")
+    assert key != EmbeddingCache.make_key("model", 512, "cls", "Hello world")
+
+
+def test_query_cache_is_lru_and_expires(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(embedding_cache.time, "monotonic", lambda: now[0])
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=10)
+    cache.put("a", np.ones(2))
+    cache.put("b", np.ones(2))
+    assert cache.get("a  ") is not None  # normalized, and now most recent
+    cache.put("c", np.ones(2))
+    
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    now[0] = 11.0
+    assert cache.get("c") is None
@@ -0,0 +1,221 @@
+"""
+Tests for the improved PDF extractor.
+
+The single-pass cleaner is checked against the original multi-pass one on
+random input, since the two must agree on every string.
+"""
+
+import json
+import os
+import random
+import re
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from improved_pdf_extractor import ImprovedPDFExtractor, SectionBuilder, ExtractionManifest, MANIFEST_FILENAME
+
+
+def reference_clean_text(text):
+    """clean_text as it was before the rules were merged into one pass"""
+    if not text:
+        return ""
+    text = re.sub(r'\n+', '\n', text)
+    text = re.sub(r' +', ' ', text)
+    text = re.sub(r'([A-Z])\1{3,}', r'\1', text)
+    text = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', text)
+    text = re.sub(r'^\d+\s*$', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^C\s*hapter\s*$', 'Chapter', text, flags=re.MULTILINE)
+    return text.strip()
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    return ImprovedPDFExtractor(output_dir=str(tmp_path / "out"))
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "12\nChapter 3: Motion\n\n\n\nA body  at rest",
+    "C hapter\n14  \nMMMMM OOOOO SSSSS",
+    "aMMMM and iceCream\n7",
+    "  leading and trailing  \n",
+    "C  hapter \n\n 3 \nend",
+])
+def test_clean_text_examples_match_reference(extractor, text):
+    assert extractor.clean_text(text) == reference_clean_text(text)
+
+
+def test_clean_text_matches_reference_on_random_input(extractor):
+    rng = random.Random(0)
+    pieces = ["a", "b", "A", "M", "MMMM", "C", "hapter", "Chapter", " ", "  ", "\n", "\n\n", "1", "42", "\t", "x"]
+    for _ in range(20000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 25)))
+        assert extractor.clean_text(text) == reference_clean_text(text), repr(text)
+
+
+SAMPLE_PAGES = [
+    [("Chapter 8: Motion", 18), ("Describing motion", 16), ("An object is in motion when", 11),
+     ("its position changes with time.", 11), ("1", 11)],
+    [("Activity 8.1 Roll a ball", 11), ("Question: what is speed?", 11),
+     ("Figure 8.1 a moving car", 11), ("Uniform motion", 16), ("Equal distances in equal intervals", 11)],
+    [("Table 8.2 distances", 11), ("C hapter", 11), ("Activity 8.2 Time a walk", 11),
+     ("Questions", 16), ("Q. Define velocity.", 11), ("2", 11)],
+]
+
+
+def make_pdf(path, pages=SAMPLE_PAGES):
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page()
+        for i, (text, size) in enumerate(lines):
+            page.insert_text((72, 72 + 40 * i), text, fontsize=size)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def extract(tmp_path, pdf_path, **options):
+    output_dir = tmp_path / "_".join(f"{key}-{value}" for key, value in sorted(options.items()))
+    extractor = ImprovedPDFExtractor(output_dir=str(output_dir), **options)
+    assert extractor.process_single_pdf(pdf_path)
+    with open(extractor._output_path(os.path.basename(pdf_path)), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_compact_output_matches_standard_without_full_text(tmp_path):
+    pdf_path = make_pdf(tmp_path / "Chapter_8.pdf")
+    standard = extract(tmp_path, pdf_path, single_pass=True)
+    compact = extract(tmp_path, pdf_path, compact=True)
+    
+    assert standard["sections"]
+    assert compact["sections"] == standard["sections"]
+    assert compact["metadata"] == standard["metadata"]
+    assert "full_text" not in compact
+
+
+def test_compact_page_records_rebuild_standard_records(tmp_path):
+    pdf_path = make_pdf(tmp_path / "Chapter_8.pdf")
+    standard = ImprovedPDFExtractor(output_dir=str(tmp_path / "a"), single_pass=True)
+    compact = ImprovedPDFExtractor(output_dir=str(tmp_path / "b"), compact=True)
+    
+    doc = fitz.open(pdf_path)
+    for page_num in range(len(doc)):
+        full_page = standard.extract_page(doc[page_num], page_num)
+        lean_page = compact.extract_page(doc[page_num], page_num)
+        assert compact.page_text(lean_page) == full_page["raw_text"]
+        assert compact.page_cleaned_text(lean_page) == full_page["cleaned_text"]
+        assert list(compact.page_blocks(lean_page)) == [
+            {**block, "bbox": tuple(block["bbox"])} for block in full_page["structured_text"]
+        ]
+    doc.close()
+
+
+def test_find_chapter_info_matches_joined_text(extractor):
+    pages = [{"cleaned_text": text} for text in ["intro text", "see Chapter", "12: Sound waves\nmore", "Chapter 3: Later"]]
+    joined = " ".join(page["cleaned_text"] for page in pages)
+    assert extractor.find_chapter_info(pages) == extractor.extract_chapter_info(joined)
+    assert extractor.find_chapter_info(pages) == {"number": "12", "title": "Sound waves"}
+
+
+@pytest.mark.parametrize("options", [{}, {"single_pass": True}, {"compact": True}])
+def test_streaming_output_matches_in_memory_output(tmp_path, options):
+    pdf_path = make_pdf(tmp_path / "Chapter_8.pdf")
+    in_memory = extract(tmp_path, pdf_path, **options)
+    streamed = extract(tmp_path, pdf_path, streaming=True, **options)
+    assert streamed == in_memory
+
+
+def test_streaming_handles_a_pdf_without_sections(tmp_path):
+    pdf_path = make_pdf(tmp_path / "Notes.pdf", pages=[[("plain body text", 11)], [("3", 11)]])
+    assert extract(tmp_path, pdf_path, streaming=True) == extract(tmp_path, pdf_path)
+
+
+def test_section_builder_hands_back_sections_as_headings_close_them(extractor):
+    blocks = [
+        {"text": "preamble before any heading", "type": "body_text"},
+        {"text": "Chapter 8: Motion", "type": "chapter_title"},
+        {"text": "body", "type": "body_text"},
+        {"text": "Activity 8.1", "type": "activity"},
+        {"text": "Uniform motion", "type": "heading"},
+        {"text": "Question: why?", "type": "question"},
+    ]
+    builder = SectionBuilder(extractor._optimize_section_chunks)
+    completed = [builder.add(block) for block in blocks]
+    
+    assert [section["title"] if section else None for section in completed] == [
+        None, None, None, None, "Chapter 8: Motion", None
+    ]
+    assert completed[4]["content"] == ["body"] and completed[4]["activities"] == ["Activity 8.1"]
+    last = builder.finish()
+    assert last["title"] == "Uniform motion" and last["questions"] == ["Question: why?"]
+    assert builder.finish() is None
+    
+    pages = [{"structured_text": blocks[:3]}, {"structured_text": blocks[3:]}]
+    assert extractor.split_into_sections(pages) == [completed[4], last]
+
+
+def count_extractions(monkeypatch, extractor):
+    processed = []
+    original = extractor.process_single_pdf
+    
+    def process_single_pdf(pdf_path, workers=1):
+        processed.append(os.path.basename(pdf_path))
+        return original(pdf_path, workers)
+    
+    monkeypatch.setattr(extractor, "process_single_pdf", process_single_pdf)
+    return processed
+
+
+def test_manifest_skips_unchanged_pdfs(tmp_path, monkeypatch):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    make_pdf(raw_dir / "Chapter_8.pdf")
+    make_pdf(raw_dir / "Chapter_9.pdf", pages=SAMPLE_PAGES[:1])
+    output_dir = str(tmp_path / "out")
+    
+    first = ImprovedPDFExtractor(output_dir=output_dir)
+    processed = count_extractions(monkeypatch, first)
+    first.process_all_pdfs(str(raw_dir))
+    assert sorted(processed) == ["Chapter_8.pdf", "Chapter_9.pdf"]
+    
+    second = ImprovedPDFExtractor(output_dir=output_dir)
+    processed = count_extractions(monkeypatch, second)
+    second.process_all_pdfs(str(raw_dir))
+    assert processed == []
+    
+    # Touched but unchanged: the hash still matches
+    os.utime(raw_dir / "Chapter_9.pdf", ns=(0, 10 ** 9))
+    second.process_all_pdfs(str(raw_dir))
+    assert processed == []
+    
+    # Changed content, a deleted output and --force are all re-extracted
+    make_pdf(raw_dir / "Chapter_9.pdf", pages=SAMPLE_PAGES[1:])
+    os.remove(second._output_path("Chapter_8.pdf"))
+    second.process_all_pdfs(str(raw_dir))
+    assert sorted(processed) == ["Chapter_8.pdf", "Chapter_9.pdf"]
+    
+    processed.clear()
+    second.process_all_pdfs(str(raw_dir), force=True)
+    assert sorted(processed) == ["Chapter_8.pdf", "Chapter_9.pdf"]
+
+
+@pytest.mark.parametrize("options", [{"single_pass": True}, {"compact": True}, {"streaming": True}])
+def test_manifest_reextracts_when_output_options_change(tmp_path, options):
+    pdf_path = make_pdf(tmp_path / "Chapter_8.pdf")
+    output_dir = str(tmp_path / "out")
+    default = ImprovedPDFExtractor(output_dir=output_dir)
+    output_path = default._output_path("Chapter_8.pdf")
+    open(output_path, "w").close()
+    
+    ExtractionManifest(output_dir, default.output_options()).record(pdf_path, output_path)
+    assert ExtractionManifest(output_dir, default.output_options()).is_current(pdf_path, output_path)
+    
+    changed = ImprovedPDFExtractor(output_dir=output_dir, **options)
+    assert not ExtractionManifest(output_dir, changed.output_options()).is_current(pdf_path, output_path)
+
+
+def test_manifest_ignores_an_unreadable_file(tmp_path):
+    (tmp_path / MANIFEST_FILENAME).write_text("{not json")
+    assert ExtractionManifest(str(tmp_path), {}).entries == {}
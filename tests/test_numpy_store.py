@@ -0,0 +1,148 @@
+"""
+Tests for the in-process NumPy vector store: log replay, compaction,
+top-k search and payload filters.
+"""
+
+import json
+import os
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from src.database.numpy_store import NumpyVectorStore, _LOG_FILENAME
+
+
+def make_documents(ids, tag=""):
+    return [
+        {"id": point_id, "text": f"chunk {point_id}{tag}",
+         "metadata": {"chapter": f"Chapter {point_id % 3}", "chunk_index": point_id}}
+        for point_id in ids
+    ]
+
+
+def open_store(path, vector_size=8):
+    return NumpyVectorStore(path=path, collection_name="test", vector_size=vector_size)
+
+
+def snapshot(store):
+    return store._ids, store._payloads, np.asarray(store._vectors[:len(store._ids)])
+
+
+def test_reopen_replays_inserts_and_deletes(tmp_path):
+    rng = np.random.default_rng(0)
+    store = open_store(str(tmp_path))
+    store.insert_documents(make_documents(range(10)), rng.normal(size=(10, 8)))
+    store.insert_documents(make_documents([3, 4], " (edited)"), rng.normal(size=(2, 8)))
+    store.delete_documents([0, 7, 42])
+    
+    reopened = open_store(str(tmp_path))
+    ids, payloads, vectors = snapshot(reopened)
+    expected_ids, expected_payloads, expected_vectors = snapshot(store)
+    
+    assert ids == expected_ids
+    assert payloads == expected_payloads
+    np.testing.assert_allclose(vectors, expected_vectors)
+    assert reopened.get_document(3).payload["text"] == "chunk 3 (edited)"
+    assert reopened.get_document(0) is None
+
+
+def test_random_operations_match_an_in_memory_store(tmp_path):
+    random.seed(1)
+    rng = np.random.default_rng(1)
+    disk = open_store(str(tmp_path))
+    memory = open_store(None)
+    
+    for step in range(200):
+        if random.random() < 0.6:
+            ids = [random.randrange(2000) for _ in range(random.randint(1, 40))]
+            vectors = rng.normal(size=(len(ids), 8))
+            documents = make_documents(ids, f" v{step}")
+            assert disk.insert_documents(documents, vectors)
+            assert memory.insert_documents(documents, vectors)
+        else:
+            ids = [random.randrange(2000) for _ in range(random.randint(1, 30))]
+            disk.delete_documents(ids)
+            memory.delete_documents(ids)
+    
+    reopened = open_store(str(tmp_path))
+    ids, payloads, vectors = snapshot(reopened)
+    expected_ids, expected_payloads, expected_vectors = snapshot(memory)
+    assert ids == expected_ids
+    assert payloads == expected_payloads
+    np.testing.assert_allclose(vectors, expected_vectors, rtol=1e-6)
+
+
+def test_log_is_compacted(tmp_path):
+    rng = np.random.default_rng(2)
+    store = open_store(str(tmp_path))
+    for _ in range(40):
+        store.insert_documents(make_documents(range(100)), rng.normal(size=(100, 8)))
+    
+    with open(os.path.join(str(tmp_path), "test", _LOG_FILENAME), encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        entries = sum(1 for _ in f)
+    
+    # 4000 upserts of 100 points: compaction keeps the log near the live size
+    assert header == {"vector_size": 8}
+    assert entries < 2 * 100 + 1024 + 100
+    assert open_store(str(tmp_path)).count_documents() == 100
+
+
+def test_search_returns_exact_top_k():
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(50, 8))
+    store = open_store(None)
+    store.insert_documents(make_documents(range(50)), vectors)
+    
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    query = rng.normal(size=8)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+    
+    results = store.search_documents(query, limit=5)
+    assert [point.id for point in results] == list(expected)
+    assert [point.score for point in results] == sorted((point.score for point in results), reverse=True)
+    assert store.search_documents(vectors[7], limit=1)[0].id == 7
+
+
+def test_search_batch_matches_single_searches():
+    rng = np.random.default_rng(4)
+    store = open_store(None)
+    store.insert_documents(make_documents(range(30)), rng.normal(size=(30, 8)))
+    queries = rng.normal(size=(4, 8))
+    
+    batch = store.search_batch(queries, limit=[1, 2, 3, 4])
+    assert [[point.id for point in points] for points in batch] == [
+        [point.id for point in store.search_documents(query, limit=limit)]
+        for query, limit in zip(queries, [1, 2, 3, 4])
+    ]
+
+
+def test_filters_on_indexed_fields():
+    rng = np.random.default_rng(5)
+    store = open_store(None)
+    store.insert_documents(make_documents(range(30)), rng.normal(size=(30, 8)))
+    query = rng.normal(size=8)
+    
+    chapter = store.search_documents(query, limit=30, filter={
+        "must": [{"key": "metadata.chapter", "match": {"value": "Chapter 1"}}]
+    })
+    assert sorted(point.id for point in chapter) == list(range(1, 30, 3))
+    
+    ranged = store.search_documents(query, limit=30, filter={
+        "must": [{"key": "metadata.chunk_index", "range": {"gte": 10, "lt": 15}}],
+        "must_not": [{"key": "metadata.chapter", "match": {"value": "Chapter 0"}}]
+    })
+    assert sorted(point.id for point in ranged) == [10, 11, 13, 14]
+
+
+def test_invalid_searches_raise():
+    store = open_store(None)
+    store.insert_documents(make_documents(range(3)), np.eye(3, 8))
+    
+    with pytest.raises(ValueError):
+        store.search_documents(np.ones(8), filter={"must": [{"key": "metadata.unindexed", "match": {"value": 1}}]})
+    with pytest.raises(ValueError):
+        store.search_batch(np.ones((2, 8)), limit=[1])
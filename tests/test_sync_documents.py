@@ -0,0 +1,115 @@
+"""
+Tests for incremental ingest: stable point IDs and content hashes, and
+sync_documents only re-embedding what changed.
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("qdrant_client")
+
+from src.scripts import process_improved_data
+from src.scripts.process_improved_data import content_hash, point_id, sync_documents
+from src.database.numpy_store import NumpyVectorStore
+
+
+class RecordingEmbeddingModel:
+    """Deterministic embeddings; texts containing 'OOM' fail like an out-of-memory row."""
+    
+    def __init__(self):
+        self.embedded = []
+    
+    def embed_texts(self, texts, return_failed=False):
+        self.embedded.extend(texts)
+        vectors = np.array([[len(text), text.count("a") + 1, 1.0, 0.5] for text in texts], dtype=np.float32)
+        failed = [row for row, text in enumerate(texts) if "OOM" in text]
+        vectors[failed] = 0
+        return (vectors, failed) if return_failed else vectors
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = RecordingEmbeddingModel()
+    monkeypatch.setattr(process_improved_data, "get_embedding_model", lambda: model)
+    return model
+
+
+def improved_file(name, sections):
+    return {"file": name, "data": {
+        "metadata": {"chapter_number": name.split("_")[1]},
+        "sections": [{"title": title, "type": "heading", "content": content} for title, content in sections]
+    }}
+
+
+def corpus():
+    return [
+        improved_file("Chapter_1_improved.json", [("Motion", ["A ball rolls."]), ("Speed", ["Speed is distance over time."])]),
+        improved_file("Chapter_2_improved.json", [("Sound", ["Sound is a wave."])]),
+    ]
+
+
+def sync(store, data):
+    return sync_documents(data, store, store.get_payload_values("metadata.content_hash"), batch_size=2)
+
+
+def test_point_ids_are_stable_across_runs():
+    # Changing the namespace would orphan every stored point
+    assert point_id("Chapter_3_improved.json_s4_chunk_1") == "98d4f1bb-be2e-5544-9096-0ab3f73d5175"
+    assert point_id("a") == point_id("a") != point_id("b")
+
+
+def test_content_hash_tracks_text_and_metadata_but_not_key_order():
+    meta = {"chapter": "Chapter 1", "section": "Motion", "chunk": 0}
+    reordered = {"chunk": 0, "section": "Motion", "chapter": "Chapter 1"}
+    assert content_hash("text", meta) == content_hash("text", reordered)
+    assert content_hash("text", meta) != content_hash("text!", meta)
+    assert content_hash("text", meta) != content_hash("text", {**meta, "chunk": 1})
+
+
+def test_second_sync_embeds_nothing(model):
+    store = NumpyVectorStore(path=None, collection_name="sync", vector_size=4)
+    first = sync(store, corpus())
+    ids = sorted(store._ids)
+    
+    model.embedded.clear()
+    second = sync(store, corpus())
+    assert first["upserted"] == 3 and second == {"upserted": 0, "unchanged": 3, "skipped": 0, "deleted": 0}
+    assert model.embedded == []
+    assert sorted(store._ids) == ids
+
+
+def test_sync_upserts_edits_and_deletes_vanished_chunks(model):
+    store = NumpyVectorStore(path=None, collection_name="sync", vector_size=4)
+    sync(store, corpus())
+    
+    edited = corpus()[:1]
+    edited[0]["data"]["sections"][1]["content"] = ["Speed is how fast something moves."]
+    model.embedded.clear()
+    counts = sync(store, edited)
+    
+    assert counts == {"upserted": 1, "unchanged": 1, "skipped": 0, "deleted": 1}
+    assert model.embedded == ["Speed Speed is how fast something moves."]
+    assert store.count_documents() == 2
+
+
+def test_chunks_that_fail_to_embed_are_retried(model):
+    store = NumpyVectorStore(path=None, collection_name="sync", vector_size=4)
+    data = corpus() + [improved_file("Chapter_3_improved.json", [("Light", ["OOM on this one"])])]
+    
+    assert sync(store, data)["skipped"] == 1
+    assert store.count_documents() == 3
+    
+    model.embedded.clear()
+    assert sync(store, data) == {"upserted": 0, "unchanged": 3, "skipped": 1, "deleted": 0}
+    assert model.embedded == ["Light OOM on this one"]
+
+
+def test_upload_errors_fail_the_sync_instead_of_hanging(model):
+    class BrokenStore:
+        def insert_documents(self, documents, embeddings):
+            raise OSError("disk full")
+    
+    many = [improved_file(f"Chapter_{i}_improved.json", [("Title", [f"text {i}"])]) for i in range(20)]
+    assert sync_documents(many, BrokenStore(), {}, batch_size=1, queue_size=1) is None